@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the data layer: DataManager, the strict CSV importer,
+StatisticsService and backup, on a synthetic ledger from generate_ledger.py.
+
+Every benchmark is run `--repeat` times and the best wall time is kept. Results are
+written as JSON; with `--baseline` each benchmark is compared against a stored result
+file and the run exits with status 1 if any benchmark is more than `--threshold`
+(fraction, default 0.2 = 20%) slower.
+
+Usage:
+    python benchmarks/run_benchmarks.py --records 100000 --out results.json
+    python benchmarks/run_benchmarks.py --records 100000 --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from generate_ledger import generate_records, populate, write_csv
+from data.backup_importer import import_csv_strict
+from data.data_manager import DataManager
+from services.statistics_service import StatisticsService
+from utils.result_cache import ResultCache
+
+
+def _timed(fn: Callable[[], int], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict:
+    """Best-of-`repeat` wall time of fn(); fn returns the number of operations it did."""
+    best = None
+    ops = 0
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        ops = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return {"seconds": round(best, 6), "ops": ops, "ops_per_sec": round(ops / best, 1) if best else None}
+
+
+def run_suite(records: int = 100000, seed: int = 0, repeat: int = 3, workdir: Optional[str] = None,
+              single_inserts: int = 2000, pages: int = 50, page_size: int = 100,
+              import_rows: int = 20000) -> Dict:
+    """Build a ledger of `records` records in `workdir` (a temp dir if None) and time each benchmark."""
+    own_dir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="account_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    results: Dict[str, Dict] = {}
+    try:
+        # --- inserts: one transaction per record vs. chunked bulk load ---
+        single_db = os.path.join(workdir, "single.db")
+
+        def reset_single():
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(single_db + suffix):
+                    os.remove(single_db + suffix)
+
+        def save_one_by_one():
+            dm = DataManager(single_db)
+            try:
+                n = 0
+                for rec in generate_records(single_inserts, seed=seed, id_prefix="single"):
+                    ok, msg = dm.save_record(rec)
+                    if not ok:
+                        raise RuntimeError(msg)
+                    n += 1
+                return n
+            finally:
+                dm.close()
+        results["save_record"] = _timed(save_one_by_one, repeat, setup=reset_single)
+
+        db_path = os.path.join(workdir, "ledger.db")
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        dm = DataManager(db_path)
+        try:
+            t0 = time.perf_counter()
+            saved = populate(dm, generate_records(records, seed=seed))
+            elapsed = time.perf_counter() - t0
+            results["save_records_bulk"] = {"seconds": round(elapsed, 6), "ops": saved,
+                                            "ops_per_sec": round(saved / elapsed, 1) if elapsed else None}
+
+            # --- paging: OFFSET vs. keyset, the first `pages` pages newest first ---
+            def offset_pages():
+                n = 0
+                for p in range(pages):
+                    n += len(dm.query_records(limit=page_size, offset=p * page_size))
+                return n
+            results["query_records_offset"] = _timed(offset_pages, repeat)
+
+            def keyset_pages():
+                n, token = 0, None
+                for _ in range(pages):
+                    page, token = dm.query_records_page(limit=page_size, after=token)
+                    n += len(page)
+                    if token is None:
+                        break
+                return n
+            results["query_records_page"] = _timed(keyset_pages, repeat)
+
+            # --- statistics, uncached so every call reaches SQLite ---
+            stats = StatisticsService(dm, cache=ResultCache(0))
+            for name, call in (
+                ("stats_total_by_type", lambda: stats.total_by_type()),
+                ("stats_by_category", lambda: stats.by_category()),
+                ("stats_timeseries_day", lambda: stats.timeseries("day")),
+                ("stats_timeseries_month", lambda: stats.timeseries("month")),
+                ("stats_timeseries_year", lambda: stats.timeseries("year")),
+                ("stats_total_by_type_range", lambda: stats.total_by_type(start="2021-01-01", end="2021-12-31")),
+            ):
+                results[name] = _timed(lambda call=call: len(call()), repeat)
+
+            # --- backup ---
+            backup_path = os.path.join(workdir, "backup", "ledger.db")
+
+            def do_backup():
+                ok, msg = dm.backup(backup_path)
+                if not ok:
+                    raise RuntimeError(msg)
+                return 1
+            results["backup"] = _timed(do_backup, repeat)
+        finally:
+            dm.close()
+
+        # --- strict import: half the rows duplicate existing records, half are new ---
+        csv_path = os.path.join(workdir, "import.csv")
+        half = import_rows // 2
+        dupes = (r for r in generate_records(min(half, records), seed=seed))
+        fresh = generate_records(import_rows - min(half, records), seed=seed + 1, id_prefix="import")
+        write_csv(csv_path, _chain_new_ids(dupes, fresh))
+        import_db = os.path.join(workdir, "import.db")
+
+        def reset_import():
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(import_db + suffix):
+                    os.remove(import_db + suffix)
+            shutil.copy2(db_path, import_db)
+
+        def do_import():
+            idm = DataManager(import_db)
+            try:
+                report = import_csv_strict(csv_path, idm)
+            finally:
+                idm.close()
+            if report["errors"]:
+                raise RuntimeError(f"import errors: {report['errors'][:3]}")
+            return report["imported"] + report["skipped"]
+        results["import_csv_strict"] = _timed(do_import, repeat, setup=reset_import)
+    finally:
+        if own_dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "records": records,
+            "seed": seed,
+            "repeat": repeat,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def _chain_new_ids(dupes, fresh):
+    # duplicates get new ids: the importer must catch them by content, not by primary key
+    for i, r in enumerate(dupes):
+        r.id = f"dup_{i:08d}"
+        yield r
+    yield from fresh
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.2) -> List[Dict]:
+    """
+    Benchmarks whose time grew by more than `threshold` (fraction) over the baseline.
+    Benchmarks missing from either side are ignored.
+    """
+    regressions = []
+    base_results = baseline.get("results", {})
+    for name, cur in current.get("results", {}).items():
+        base = base_results.get(name)
+        if not base or not base.get("seconds"):
+            continue
+        ratio = cur["seconds"] / base["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append({"name": name, "baseline": base["seconds"], "current": cur["seconds"],
+                                "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the data-layer benchmark suite")
+    parser.add_argument("--records", type=int, default=100000, help="ledger size (up to 10M)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", help="keep generated databases/CSV here (default: temp dir, removed)")
+    parser.add_argument("--import-rows", type=int, default=20000)
+    parser.add_argument("--out", help="write results JSON to this file")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs. baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    current = run_suite(records=args.records, seed=args.seed, repeat=args.repeat,
+                        workdir=args.workdir, import_rows=args.import_rows)
+
+    for name, r in current["results"].items():
+        print(f"{name:28s} {r['seconds']:10.4f}s  {r['ops']:>10}  ops/s={r['ops_per_sec']}")
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(current, fh, ensure_ascii=False, indent=2)
+        print(f"results -> {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        regressions = compare(current, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['name']}: {r['baseline']:.4f}s -> {r['current']:.4f}s (x{r['ratio']})")
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
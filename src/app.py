@@ -6,9 +6,10 @@ from core.coordinator import Coordinator
 from ui.main_window import MainWindow
 
 
-def create_app(db_path: str = "data/app.db"):
-    dm = DataManager(db_path=db_path)
-    coord = Coordinator(data_manager=dm)
+def create_app(db_path: str = "data/app.db", write_behind: bool = False):
+    # concurrent: UI worker threads read through their own pooled connections
+    dm = DataManager(db_path=db_path, concurrent=True)
+    coord = Coordinator(data_manager=dm, write_behind=write_behind)
     main_window = MainWindow(coordinator=coord)
     return {
         "data_manager": dm,
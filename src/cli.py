@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Headless command-line interface (no Qt import, safe for cron jobs).
+
+Run: python src/cli.py [--db data/app.db] <command> [options]
+
+Commands (each prints one JSON document to stdout):
+  import CSV        strict-dedup CSV import (backup_importer.import_csv_strict)
+  export OUT_CSV    stream records (with category names) to a CSV file
+  stats             totals by type / category and a timeseries
+  query             one keyset page of records; pass the returned token to continue
+  backup DEST       online backup of the database to DEST (optionally compressed)
+  restore SRC       replace the database with a backup (plain, gzip or xz)
+  migrate           apply pending migrations
+  rollup {check,rebuild}
+                    verify or rebuild the daily_rollup summary table
+Exit status is 0 on success, 1 when the command reports a failure.
+"""
+import argparse
+import csv
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Optional
+
+from core.coordinator import Coordinator
+from data.backup_importer import import_csv_strict
+from data.data_manager import DataManager
+from data.migrations import apply_migrations
+from services.statistics_service import StatisticsService
+
+EXPORT_FIELDS = ["id", "type", "amount", "date", "category_id", "category_name", "remark", "created_at"]
+
+
+def _add_filters(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--start", help="inclusive lower bound on record date (ISO)")
+    p.add_argument("--end", help="inclusive upper bound on record date (ISO)")
+    p.add_argument("--category", dest="category_id", help="category id")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Headless accounting ledger tools")
+    parser.add_argument("--db", default="data/app.db", help="database path (default: data/app.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="import a CSV with strict deduplication")
+    p.add_argument("csv_path")
+    p.add_argument("--delimiter", default=",")
+    p.add_argument("--amount-tol", type=float, default=0.01)
+    p.add_argument("--chunk-size", type=int, default=1000)
+
+    p = sub.add_parser("export", help="export records to CSV")
+    p.add_argument("out_path")
+    _add_filters(p)
+
+    p = sub.add_parser("stats", help="aggregate statistics")
+    p.add_argument("--period", choices=["day", "month", "year"], default="month")
+    _add_filters(p)
+
+    p = sub.add_parser("query", help="one page of records (keyset pagination)")
+    p.add_argument("--limit", type=int, default=100)
+    p.add_argument("--after-date", help="token date from the previous page")
+    p.add_argument("--after-id", help="token id from the previous page")
+    p.add_argument("--asc", action="store_true", help="oldest first (default: newest first)")
+    _add_filters(p)
+
+    p = sub.add_parser("backup", help="back up the database")
+    p.add_argument("dest")
+    p.add_argument("--compress", choices=["gzip", "xz"])
+
+    p = sub.add_parser("restore", help="restore the database from a backup")
+    p.add_argument("src")
+    p.add_argument("--no-keep-current", dest="keep_current", action="store_false",
+                   help="don't back up the current database first")
+
+    sub.add_parser("migrate", help="apply pending migrations")
+
+    p = sub.add_parser("rollup", help="check or rebuild the daily_rollup table")
+    p.add_argument("action", choices=["check", "rebuild"])
+    return parser
+
+
+def _print_migration_progress(version: str, rows_done: int, rows_per_sec: float) -> None:
+    # stdout carries the JSON result; progress of data migrations goes to stderr
+    print(f"{version}: {rows_done} rows ({rows_per_sec:.0f} rows/s)", file=sys.stderr)
+
+
+def _cmd_import(dm: DataManager, args) -> dict:
+    report = import_csv_strict(args.csv_path, dm, delimiter=args.delimiter,
+                               amount_tol=args.amount_tol, chunk_size=args.chunk_size)
+    return {"ok": True, **report}
+
+
+def _cmd_export(dm: DataManager, args) -> dict:
+    out = Path(args.out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with out.open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(EXPORT_FIELDS)
+        for v in dm.iter_record_views(start=args.start, end=args.end, category_id=args.category_id):
+            writer.writerow([v.id, v.type, v.amount, v.date, v.category_id or "", v.category_name or "",
+                             v.remark or "", v.created_at or ""])
+            n += 1
+    return {"ok": True, "exported": n, "path": str(out)}
+
+
+def _cmd_stats(dm: DataManager, args) -> dict:
+    stats = StatisticsService(dm)
+    filters = dict(start=args.start, end=args.end, category_id=args.category_id)
+    return {
+        "ok": True,
+        "total_by_type": stats.total_by_type(**filters),
+        # JSON object keys must be strings: uncategorized records are reported under ""
+        "by_category": {k or "": v for k, v in stats.by_category(**filters).items()},
+        "timeseries": {"period": args.period, "data": stats.timeseries(period=args.period, **filters)},
+    }
+
+
+def _cmd_query(dm: DataManager, args) -> dict:
+    after = None
+    if args.after_date is not None or args.after_id is not None:
+        if args.after_date is None or args.after_id is None:
+            return {"ok": False, "message": "--after-date and --after-id must be given together"}
+        after = (args.after_date, args.after_id)
+    coord = Coordinator(dm)
+    records, token = coord.list_records_page(limit=args.limit, after=after, descending=not args.asc,
+                                             start=args.start, end=args.end, category_id=args.category_id)
+    return {
+        "ok": True,
+        "records": [asdict(r) for r in records],
+        "next": {"after_date": token[0], "after_id": token[1]} if token else None,
+    }
+
+
+def _cmd_backup(dm: DataManager, args) -> dict:
+    ok, msg = dm.backup(args.dest, compress=args.compress)
+    return {"ok": ok, "message": msg, "path": args.dest}
+
+
+def _cmd_restore(dm: DataManager, args) -> dict:
+    ok, msg = dm.restore(args.src, keep_current=args.keep_current)
+    return {"ok": ok, "message": msg}
+
+
+def _cmd_rollup(dm: DataManager, args) -> dict:
+    if args.action == "rebuild":
+        ok, msg = dm.rebuild_daily_rollup()
+        return {"ok": ok, "message": msg}
+    problems = dm.check_daily_rollup()
+    return {"ok": not problems, "mismatches": problems}
+
+
+_COMMANDS = {
+    "import": _cmd_import,
+    "export": _cmd_export,
+    "stats": _cmd_stats,
+    "query": _cmd_query,
+    "backup": _cmd_backup,
+    "restore": _cmd_restore,
+    "rollup": _cmd_rollup,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "migrate":
+            migrations_dir = Path(__file__).resolve().parent / "db" / "migrations"
+            result = {"ok": True, "applied": apply_migrations(args.db, str(migrations_dir),
+                                                              progress=_print_migration_progress)}
+        else:
+            dm = DataManager(args.db)
+            try:
+                result = _COMMANDS[args.command](dm, args)
+            finally:
+                dm.close()
+    except Exception as e:
+        result = {"ok": False, "message": f"{type(e).__name__}: {e}"}
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2, default=str)
+    sys.stdout.write("\n")
+    return 0 if result.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,16 +5,31 @@ Responsibilities:
 - Provide methods for UI to list categories and recent records.
 - Validate and save new records via DataManager.
 - Return standardized (ok, message) tuples for UI to present.
+- Optionally group-commit record creation through a write-behind queue.
 """
-from typing import List, Optional, Tuple
-from data.data_manager import DataManager
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+from data.data_manager import DataManager, PageToken
+from core.write_behind import WriteBehindQueue
 from models.account_record import AccountRecord
 from models.category import Category
+from models.record_view import RecordView
+from services.statistics_service import StatisticsService
 
 
 class Coordinator:
-    def __init__(self, data_manager: DataManager):
+    def __init__(self, data_manager: DataManager, write_behind: bool = False,
+                 max_batch: int = 200, max_delay_ms: int = 50):
+        """
+        write_behind: queue record inserts and let a background thread commit them in
+        batches of up to `max_batch` records or every `max_delay_ms`. Call close()
+        (or at least flush()) before closing the DataManager.
+        """
         self.dm = data_manager
+        self.stats = StatisticsService(data_manager)
+        self.write_queue: Optional[WriteBehindQueue] = None
+        if write_behind:
+            self.write_queue = WriteBehindQueue(data_manager, max_batch=max_batch, max_delay_ms=max_delay_ms)
 
     def get_categories(self) -> List[Category]:
         """Return list of categories (Category dataclass)."""
@@ -25,18 +40,82 @@ class Coordinator:
         Create a new record.
         Returns (ok, message). message is empty on success or contains error.
         """
-        # Basic validation already in AccountRecord.validate; but check category existence if provided
-        if rec.category_id:
-            cat = self.dm.get_category(rec.category_id)
-            if cat is None:
-                return False, f"分类不存在: {rec.category_id}"
+        if self.write_queue is not None:
+            return self.create_record_async(rec).result()
+        ok, msg = self._check_category(rec)
+        if not ok:
+            return ok, msg
         ok, msg = self.dm.save_record(rec)
         if not ok:
             return False, f"保存失败: {msg}"
         return True, ""
 
+    def _check_category(self, rec: AccountRecord) -> Tuple[bool, str]:
+        # Basic validation already in AccountRecord.validate; but check category existence if provided
+        if rec.category_id and not self.dm.has_category(rec.category_id):
+            return False, f"分类不存在: {rec.category_id}"
+        return True, ""
+
+    def create_record_async(self, rec: AccountRecord,
+                            callback: Optional[Callable[[Tuple[bool, str]], None]] = None) -> "Future[Tuple[bool, str]]":
+        """
+        Create a record without waiting for the commit in write-behind mode.
+        Returns a Future resolving to the same (ok, message) as create_record; `callback`,
+        if given, receives that tuple (on the writer thread in write-behind mode).
+        Without write-behind the record is saved synchronously and the Future is already done.
+        """
+        if self.write_queue is not None:
+            ok, msg = self._check_category(rec)
+            if ok:
+                return self.write_queue.submit(rec, callback)
+            result = (ok, msg)
+        else:
+            result = self.create_record(rec)
+        fut: "Future[Tuple[bool, str]]" = Future()
+        if callback is not None:
+            fut.add_done_callback(lambda f: callback(f.result()))
+        fut.set_result(result)
+        return fut
+
+    def list_record_views_page(self, limit: int = 100, after: Optional[PageToken] = None,
+                               descending: bool = True, sort_key: str = "date",
+                               start: Optional[str] = None, end: Optional[str] = None,
+                               category_id: Optional[str] = None) -> Tuple[List[RecordView], Optional[PageToken]]:
+        """Like list_records_page, but rows already carry their category name/type (one joined query)."""
+        return self.dm.query_record_views_page(start=start, end=end, category_id=category_id, limit=limit,
+                                               after=after, descending=descending, sort_key=sort_key)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every accepted write-behind record is committed (no-op otherwise)."""
+        if self.write_queue is None:
+            return True
+        return self.write_queue.flush(timeout)
+
+    def close(self) -> None:
+        """Flush and stop the write-behind writer; accepted writes are never dropped."""
+        if self.write_queue is not None:
+            self.write_queue.close()
+
+    def get_statistics_summary(self) -> dict:
+        """Dashboard summary: totals by type and by category (served from the statistics cache when unchanged)."""
+        return {
+            "total_by_type": self.stats.total_by_type(),
+            "by_category": self.stats.by_category(),
+        }
+
     def list_recent_records(self, limit: int = 100) -> List[AccountRecord]:
         """Return recent records; wrapper around DataManager.query_records."""
         # Query last `limit` records by date desc
         # DataManager.query_records supports limit/offset/order_by
-        return self.dm.query_records(limit=limit, offset=0, order_by="date DESC")
\ No newline at end of file
+        return self.dm.query_records(limit=limit, offset=0, order_by="date DESC")
+
+    def list_records_page(self, limit: int = 100, after: Optional[PageToken] = None,
+                          descending: bool = True, sort_key: str = "date",
+                          start: Optional[str] = None, end: Optional[str] = None,
+                          category_id: Optional[str] = None) -> Tuple[List[AccountRecord], Optional[PageToken]]:
+        """
+        Page through records by (sort_key, id), optionally filtered. Pass the returned
+        token as `after` to get the next page; the token is None once the last page is reached.
+        """
+        return self.dm.query_records_page(start=start, end=end, category_id=category_id, limit=limit,
+                                          after=after, descending=descending, sort_key=sort_key)
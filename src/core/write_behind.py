@@ -0,0 +1,113 @@
+"""
+Write-behind queue: group-commits record inserts on a background thread.
+
+Callers submit records and get a Future resolving to the same (ok, message) tuple
+Coordinator.create_record returns. The writer thread drains the queue into one
+DataManager.save_records call (one transaction) every `max_delay_ms` or as soon as
+`max_batch` records are waiting, whichever comes first.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+from data.data_manager import DataManager
+from models.account_record import AccountRecord
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    def __init__(self, data_manager: DataManager, max_batch: int = 200, max_delay_ms: int = 50, maxsize: int = 10000):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.dm = data_manager
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._closed = False
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, rec: AccountRecord,
+               callback: Optional[Callable[[Tuple[bool, str]], None]] = None) -> "Future[Tuple[bool, str]]":
+        """
+        Queue a record for insertion. Blocks while the queue is full (back-pressure).
+        `callback` is invoked with (ok, message) on the writer thread once the batch commits.
+        """
+        fut: "Future[Tuple[bool, str]]" = Future()
+        if callback is not None:
+            fut.add_done_callback(lambda f: callback(f.result()))
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("write-behind queue is closed")
+            self._queue.put((rec, fut))
+        return fut
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every record submitted so far has been written. Returns False on timeout."""
+        marker: "Future[Tuple[bool, str]]" = Future()
+        with self._submit_lock:
+            closed = self._closed
+            if not closed:
+                self._queue.put((None, marker))
+        if closed:
+            # a marker would land behind _STOP and never be answered; everything accepted
+            # before close() is written before the thread exits
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        try:
+            marker.result(timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting writes, write everything already accepted, and stop the thread."""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: List[tuple]) -> None:
+        entries = [(rec, fut) for rec, fut in batch if rec is not None]
+        markers = [fut for rec, fut in batch if rec is None]
+        if entries:
+            try:
+                result = self.dm.save_records([rec for rec, _ in entries], chunk_size=len(entries))
+                failed = {i: reason for i, _, reason in result.errors}
+                for i, (_, fut) in enumerate(entries):
+                    if i in failed:
+                        fut.set_result((False, f"保存失败: {failed[i]}"))
+                    else:
+                        fut.set_result((True, ""))
+            except Exception as e:
+                for _, fut in entries:
+                    if not fut.done():
+                        fut.set_result((False, f"保存失败: {e}"))
+        for m in markers:
+            m.set_result((True, ""))
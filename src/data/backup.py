@@ -0,0 +1,200 @@
+"""
+Online backups through the SQLite backup API, with optional compression and rotation.
+
+Unlike copying the database file, the backup API copies pages through SQLite, so the
+copy is always a consistent database (WAL contents included) even while other
+connections keep writing. Pages are copied `pages` at a time and the source lock is
+released between steps, so writers are never blocked for the whole backup.
+
+- online_backup(source, dest_path, pages=256, sleep=0.0, progress=None, compress=None)
+- prune_backups(backups_dir, pattern(s), keep=10)
+- copy_for_restore(backup_path, dest_path): (decompress and) load a backup into a new file
+- check_backup(path, known_versions): problems that make a backup unsafe to restore
+
+Run: python src/data/backup.py <db_path> <dest_path> [gzip|xz]
+"""
+import gzip
+import lzma
+import os
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Union
+
+# compress -> (opener, file suffix)
+COMPRESSORS = {
+    "gzip": (gzip.open, ".gz"),
+    "xz": (lzma.open, ".xz"),
+}
+
+# leading bytes of compressed backups -> compression name
+_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"\xfd7zXZ\x00": "xz",
+}
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def online_backup(source: Union[str, sqlite3.Connection], dest_path: str, pages: int = 256,
+                  sleep: float = 0.0, progress: Optional[ProgressCallback] = None,
+                  compress: Optional[str] = None) -> Path:
+    """
+    Copy the database `source` (a path or an open connection) to `dest_path`.
+
+    pages: pages copied per step; sleep: seconds to pause between steps so writers get
+    the database; progress(copied_pages, total_pages) is called after every step.
+    compress: None, "gzip" or "xz" -- the backup API needs a database file to write to,
+    so the copy is first written uncompressed next to dest_path and then compressed
+    into it: the disk needs room for both until the uncompressed copy is removed
+    (dest_path is used as given, add the suffix yourself).
+
+    When `source` is a path, the backup reads from one snapshot if the database is in WAL
+    mode; otherwise SQLite restarts the copy whenever another connection commits,
+    which keeps it consistent. The destination only appears once it is complete.
+    Returns the destination path.
+    """
+    if pages < 1:
+        raise ValueError("pages must be >= 1")
+    if compress is not None and compress not in COMPRESSORS:
+        raise ValueError(f"unsupported compression: {compress}")
+    dest = Path(dest_path)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + ".partial")
+    raw = tmp.with_name(tmp.name + ".db") if compress else tmp
+    own = isinstance(source, (str, os.PathLike))
+    if own and not Path(source).is_file():
+        # sqlite3.connect would silently create an empty database
+        raise FileNotFoundError(f"database not found: {source}")
+    src = sqlite3.connect(str(source)) if own else source
+
+    def on_step(status: int, remaining: int, total: int) -> None:
+        if progress is not None:
+            progress(total - remaining, total)
+        if sleep > 0 and remaining > 0:
+            time.sleep(sleep)
+
+    try:
+        if own and src.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+            # an open read transaction pins one WAL snapshot: no restarts, writers unaffected
+            src.execute("BEGIN")
+            src.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        dst = sqlite3.connect(str(raw))
+        try:
+            src.backup(dst, pages=pages, progress=on_step)
+        finally:
+            dst.close()
+        if compress:
+            opener, _ = COMPRESSORS[compress]
+            with open(raw, "rb") as fin, opener(tmp, "wb") as fout:
+                shutil.copyfileobj(fin, fout, 1024 * 1024)
+            raw.unlink()
+        os.replace(tmp, dest)
+        return dest
+    finally:
+        if own:
+            src.close()
+        for leftover in (raw, tmp):
+            if leftover.exists():
+                leftover.unlink()
+
+
+def detect_compression(path: Union[str, Path]) -> Optional[str]:
+    """"gzip" / "xz" from the file's magic bytes, None for a plain database file."""
+    with open(path, "rb") as fh:
+        head = fh.read(6)
+    for magic, name in _MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def copy_for_restore(backup_path: Union[str, Path], dest_path: Union[str, Path], pages: int = 256,
+                     progress: Optional[ProgressCallback] = None) -> Path:
+    """
+    Load a backup (plain, gzip or xz -- detected from its content) into a new database
+    file at dest_path through the backup API. Put dest_path next to the live database
+    so it can later be renamed over it atomically.
+    """
+    src = Path(backup_path)
+    if not src.is_file():
+        raise FileNotFoundError(f"backup not found: {backup_path}")
+    compress = detect_compression(src)
+    if compress is None:
+        return online_backup(str(src), str(dest_path), pages=pages, progress=progress)
+    raw = Path(str(dest_path) + ".decompressed")
+    try:
+        opener, _ = COMPRESSORS[compress]
+        with opener(src, "rb") as fin, open(raw, "wb") as fout:
+            shutil.copyfileobj(fin, fout, 1024 * 1024)
+        return online_backup(str(raw), str(dest_path), pages=pages, progress=progress)
+    finally:
+        if raw.exists():
+            raw.unlink()
+
+
+def check_backup(path: Union[str, Path], known_versions: Iterable[str],
+                 migrations_table: str = "meta_migrations") -> List[str]:
+    """
+    Reasons not to restore the database file at `path` (empty list = fine):
+    failing PRAGMA quick_check, no migrations table, or migrations this build doesn't
+    know (a backup from a newer version of the app).
+    """
+    conn = sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        try:
+            check = [r[0] for r in conn.execute("PRAGMA quick_check").fetchall()]
+        except sqlite3.DatabaseError as e:
+            return [f"not a valid database: {e}"]
+        if check != ["ok"]:
+            return ["quick_check failed: " + "; ".join(check[:5])]
+        try:
+            versions = {r[0] for r in conn.execute(f"SELECT version FROM {migrations_table}")}
+        except sqlite3.DatabaseError:
+            return [f"no {migrations_table} table: not a backup of this application"]
+        unknown = sorted(versions - set(known_versions))
+        if unknown:
+            return [f"backup has migrations this version doesn't know: {', '.join(unknown)}"]
+        return []
+    finally:
+        conn.close()
+
+
+def _in_progress(p: Path) -> bool:
+    # online_backup's temporaries: <dest>.partial and, when compressing, <dest>.partial.db
+    return p.name.endswith(".partial") or p.name.endswith(".partial.db")
+
+
+def prune_backups(backups_dir: Union[str, Path], pattern: Union[str, Sequence[str]], keep: int = 10) -> List[Path]:
+    """
+    Delete all but the `keep` newest files in backups_dir matching the glob `pattern`
+    (or any of several globs; newest by modification time). Backups still being
+    written by online_backup are never matched. Returns the deleted paths.
+    """
+    if keep < 0:
+        raise ValueError("keep must be >= 0")
+    d = Path(backups_dir)
+    if not d.is_dir():
+        return []
+    patterns = [pattern] if isinstance(pattern, str) else list(pattern)
+    matched = {p for pat in patterns for p in d.glob(pat) if p.is_file() and not _in_progress(p)}
+    files = sorted(matched, key=lambda p: p.stat().st_mtime, reverse=True)
+    removed = []
+    for p in files[keep:]:
+        p.unlink()
+        removed.append(p)
+    return removed
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 3:
+        print("Usage: python src/data/backup.py <db_path> <dest_path> [gzip|xz]")
+        sys.exit(1)
+
+    def show(done: int, total: int) -> None:
+        print(f"\r{done}/{total} pages", end="", flush=True)
+
+    out = online_backup(sys.argv[1], sys.argv[2], progress=show, compress=sys.argv[3] if len(sys.argv) > 3 else None)
+    print(f"\nBackup written to {out}")
@@ -3,21 +3,22 @@ CSV import preview and strict deduplication importer.
 
 Functions:
 - parse_csv_preview(csv_path, n=10, delimiter=','): return list of dicts previewing CSV rows
-- import_csv_strict(csv_path, data_manager, field_map=None, date_formats=None, amount_tol=0.01)
+- import_csv_strict(csv_path, data_manager, field_map=None, date_formats=None, amount_tol=0.01, chunk_size=1000)
     -> returns report dict { imported: int, skipped: int, errors: [ ... ] }
 Notes:
 - field_map: optional mapping from CSV header -> expected field names:
     expected fields: id, type, amount, date, category_id, remark
-- Strict duplicate detection: same date (normalized ISO string), amount within amount_tol, same category_id, same remark
+- Strict duplicate detection: same date (normalized ISO string), amount within amount_tol (compared in whole cents), same category_id, same remark
 """
 from typing import List, Dict, Optional, Tuple
 import csv
 from pathlib import Path
 from datetime import datetime
-import uuid
 
 from models.account_record import AccountRecord
 from data.data_manager import DataManager
+from utils.id_gen import generate_ordered_id
+from utils.money import to_cents
 
 
 _DEFAULT_DATE_FORMATS = [
@@ -30,7 +31,8 @@ _DEFAULT_DATE_FORMATS = [
 
 
 def _generate_id() -> str:
-    return "rec_" + uuid.uuid4().hex[:12]
+    # time-ordered, so imported rows are appended to the primary-key index in order
+    return generate_ordered_id("rec")
 
 
 def _parse_date(s: str, date_formats: Optional[List[str]] = None) -> Optional[str]:
@@ -75,8 +77,9 @@ def _is_strict_duplicate(candidate: AccountRecord, existing: AccountRecord, amou
         return False
     if candidate.date != existing.date:
         return False
+    # amounts and tolerance are compared in whole cents, so the result is exact
     try:
-        if abs(float(candidate.amount) - float(existing.amount)) > amount_tol:
+        if abs(candidate.amount_cents - existing.amount_cents) > to_cents(amount_tol):
             return False
     except Exception:
         return False
@@ -89,17 +92,133 @@ def _is_strict_duplicate(candidate: AccountRecord, existing: AccountRecord, amou
     return True
 
 
+class _StrictDedupIndex:
+    """
+    Hash index answering `_is_strict_duplicate` lookups in O(1).
+
+    Records are grouped by the exact-match fields (date, type, category_id, remark)
+    and, inside a group, bucketed by amount in cents with bucket width 2 * tolerance
+    (in cents). Two amounts within the tolerance are at most half a bucket apart, so
+    checking the candidate's bucket and its two neighbours is enough. Every hit is
+    still confirmed with `_is_strict_duplicate`.
+    Amounts without a cents value (nan/inf) can't be bucketed; they are kept per group
+    and compared pairwise, which keeps the semantics identical to the linear scan.
+    """
+
+    def __init__(self, amount_tol: float = 0.01):
+        self.amount_tol = amount_tol
+        tol_cents = to_cents(amount_tol)
+        self._width = 2 * tol_cents if tol_cents > 0 else 0
+        # key -> {bucket: [records]}
+        self._groups: Dict[tuple, Dict[int, List[AccountRecord]]] = {}
+        # key -> [records whose amount can't be bucketed]
+        self._unbucketed: Dict[tuple, List[AccountRecord]] = {}
+
+    @staticmethod
+    def _key(rec: AccountRecord) -> Optional[tuple]:
+        if not rec.date:
+            return None
+        return (rec.date, rec.type or "", rec.category_id or "", rec.remark or "")
+
+    def _bucket(self, rec: AccountRecord) -> Optional[int]:
+        try:
+            cents = rec.amount_cents
+        except Exception:
+            return None
+        if self._width == 0:
+            # zero tolerance: only equal amounts can match
+            return cents
+        return cents // self._width
+
+    def add(self, rec: AccountRecord) -> None:
+        key = self._key(rec)
+        if key is None:
+            return
+        b = self._bucket(rec)
+        if b is None:
+            self._unbucketed.setdefault(key, []).append(rec)
+        else:
+            self._groups.setdefault(key, {}).setdefault(b, []).append(rec)
+
+    def remove(self, rec: AccountRecord) -> None:
+        key = self._key(rec)
+        if key is None:
+            return
+        b = self._bucket(rec)
+        bucket = self._unbucketed.get(key) if b is None else self._groups.get(key, {}).get(b)
+        if bucket:
+            for i, ex in enumerate(bucket):
+                if ex is rec:
+                    del bucket[i]
+                    break
+
+    def find_duplicate(self, rec: AccountRecord) -> Optional[AccountRecord]:
+        key = self._key(rec)
+        if key is None:
+            return None
+        group = self._groups.get(key)
+        b = self._bucket(rec)
+        if group:
+            if b is None:
+                candidates = [ex for bucket in group.values() for ex in bucket]
+            elif self._width == 0:
+                candidates = group.get(b, [])
+            else:
+                candidates = group.get(b - 1, []) + group.get(b, []) + group.get(b + 1, [])
+            for ex in candidates:
+                if _is_strict_duplicate(rec, ex, amount_tol=self.amount_tol):
+                    return ex
+        for ex in self._unbucketed.get(key, []):
+            if _is_strict_duplicate(rec, ex, amount_tol=self.amount_tol):
+                return ex
+        return None
+
+
+def _get_field(raw_row: Dict[str, str], field_map: Optional[Dict[str, str]], name: str) -> str:
+    if field_map and name in field_map:
+        return raw_row.get(field_map[name], "").strip()
+    return raw_row.get(name, "").strip() if raw_row.get(name) is not None else ""
+
+
+def _csv_date_span(csv_path: Path,
+                   field_map: Optional[Dict[str, str]],
+                   date_formats: Optional[List[str]],
+                   delimiter: str) -> Optional[Tuple[str, str]]:
+    """
+    Pre-pass over the CSV: return (min, max) of the normalized row dates, or None if no row has a valid date.
+    """
+    lo = hi = None
+    with csv_path.open("r", encoding="utf-8-sig", newline="") as fh:
+        for raw_row in csv.DictReader(fh, delimiter=delimiter):
+            try:
+                d = _parse_date(_get_field(raw_row, field_map, "date") or _get_field(raw_row, field_map, "datetime"), date_formats)
+            except Exception:
+                # the main pass reports this row
+                continue
+            if d is None:
+                continue
+            if lo is None or d < lo:
+                lo = d
+            if hi is None or d > hi:
+                hi = d
+    if lo is None:
+        return None
+    return lo, hi
+
+
 def import_csv_strict(csv_path: str,
                       data_manager: DataManager,
                       field_map: Optional[Dict[str, str]] = None,
                       date_formats: Optional[List[str]] = None,
                       delimiter: str = ",",
-                      amount_tol: float = 0.01) -> Dict:
+                      amount_tol: float = 0.01,
+                      chunk_size: int = 1000) -> Dict:
     """
     Import CSV with STRICT deduplication.
 
     field_map: mapping from CSV header -> one of ['id','type','amount','date','category_id','remark']
                if None, headers are assumed to match expected names.
+    chunk_size: accepted rows are written through DataManager.save_records, one transaction per chunk.
     Returns a report: { imported: int, skipped: int, errors: [ {row_num, reason, row} ] }
     """
     p = Path(csv_path)
@@ -108,20 +227,41 @@ def import_csv_strict(csv_path: str,
 
     report = {"imported": 0, "skipped": 0, "errors": []}
 
-    # Load all existing records (could be optimized by date-range scan)
-    try:
-        existing_all = data_manager.query_records(limit=1000000, offset=0)
-    except Exception:
-        existing_all = []
+    dedup = _StrictDedupIndex(amount_tol=amount_tol)
+    # Strict duplicates need an exact date match, so only existing records inside
+    # the CSV's normalized date span can collide; stream just that window.
+    span = _csv_date_span(p, field_map, date_formats, delimiter)
+    if span is not None:
+        try:
+            # slotted records: the whole window stays in the index for the import
+            for ex in data_manager.iter_records(start=span[0], end=span[1], compact=True):
+                dedup.add(ex)
+        except Exception:
+            pass
+
+    # rows accepted but not yet written: (row_num, raw_row, record)
+    pending: List[Tuple[int, Dict, AccountRecord]] = []
+
+    def flush():
+        if not pending:
+            return
+        result = data_manager.save_records([rec for _, _, rec in pending], chunk_size=chunk_size)
+        failed = {i: reason for i, _, reason in result.errors}
+        for i, (row_num, raw, rec) in enumerate(pending):
+            if i in failed:
+                # rows that never reached the DB must not shadow later rows
+                dedup.remove(rec)
+                report["errors"].append({"row": row_num, "reason": f"db_error: {failed[i]}", "row_data": raw})
+                continue
+            report["imported"] += 1
+        pending.clear()
 
     with p.open("r", encoding="utf-8-sig", newline="") as fh:
         reader = csv.DictReader(fh, delimiter=delimiter)
         for idx, raw_row in enumerate(reader, start=1):
             # map fields
             def get_field(name):
-                if field_map and name in field_map:
-                    return raw_row.get(field_map[name], "").strip()
-                return raw_row.get(name, "").strip() if raw_row.get(name) is not None else ""
+                return _get_field(raw_row, field_map, name)
             try:
                 rid = get_field("id") or _generate_id()
                 rtype = get_field("type") or get_field("txn_type") or ""
@@ -147,28 +287,26 @@ def import_csv_strict(csv_path: str,
                     report["errors"].append({"row": idx, "reason": "validation_failed", "row_data": raw_row})
                     continue
 
-                # strict duplicate check among existing_all
-                is_dup = False
-                for ex in existing_all:
-                    if _is_strict_duplicate(rec, ex, amount_tol=amount_tol):
-                        is_dup = True
-                        break
-                if is_dup:
+                # strict duplicate check against existing records and rows accepted so far
+                if dedup.find_duplicate(rec) is not None:
                     report["skipped"] += 1
                     continue
 
-                # persist
-                ok, msg = data_manager.save_record(rec)
-                if not ok:
-                    report["errors"].append({"row": idx, "reason": f"db_error: {msg}", "row_data": raw_row})
+                # catch unknown categories from the category cache instead of a failed insert
+                if category_id and not data_manager.has_category(category_id):
+                    report["errors"].append({"row": idx, "reason": f"db_error: unknown category {category_id}", "row_data": raw_row})
                     continue
 
-                # add to existing_all to avoid duplicates within same import session
-                existing_all.append(rec)
-                report["imported"] += 1
+                # index right away so duplicates within the same import session are caught
+                dedup.add(rec)
+                pending.append((idx, raw_row, rec))
+                if len(pending) >= chunk_size:
+                    flush()
 
             except Exception as e:
                 report["errors"].append({"row": idx, "reason": f"exception: {str(e)}", "row_data": raw_row})
                 continue
 
-    return report
\ No newline at end of file
+    flush()
+    report["errors"].sort(key=lambda e: e["row"])
+    return report
@@ -2,43 +2,246 @@
 DataManager: uses SQLiteDriver and migrations to manage schema and perform CRUD operations.
 Provides basic operations for categories and records.
 """
+import functools
+import os
 import sqlite3
-from typing import List, Optional, Tuple
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
-from datetime import datetime
-import shutil
+from datetime import datetime, timedelta
 
+from data.backup import COMPRESSORS, ProgressCallback, check_backup, copy_for_restore, online_backup, prune_backups
 from data.sqlite_driver import SQLiteDriver
-from data.migrations import apply_migrations
+from data.migrations import MigrationChecksumError, apply_migrations, list_migration_names, schema_is_current
+from data.rollup import check_daily_rollup, rebuild_daily_rollup
 from models.category import Category
-from models.account_record import AccountRecord
+from models.account_record import AccountRecord, CompactRecord
+from models.record_batch import RecordBatch
+from models.record_view import RecordView
+from utils.money import from_cents
+
+
+@dataclass
+class BulkSaveResult:
+    """
+    Outcome of DataManager.save_records.
+    errors holds (index, record_id, reason) for every row that was not saved;
+    index is the 0-based position of the row in the input iterable.
+    """
+    saved: int = 0
+    errors: List[Tuple[int, str, str]] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+
+@dataclass
+class ReassignResult:
+    """
+    Outcome of DataManager.reassign_records.
+    moved counts records whose category was rewritten (committed, even if the run was
+    cancelled or failed later); total is how many matched when the run started.
+    """
+    moved: int = 0
+    total: int = 0
+    cancelled: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.cancelled and self.error is None
+
+
+# continuation token for keyset pagination: (date, id) of the last row of a page
+# (date is the default sort key; with sort_key="amount"/"type" the first item is that column's value)
+PageToken = Tuple[Any, str]
+
+# NOT NULL columns usable as keyset sort keys (id breaks ties)
+_PAGE_SORT_KEYS = ("date", "amount", "type")
+
+
+_SELECT_RECORDS_SQL = "SELECT id, type, amount, amount_cents, date, category_id, remark, created_at FROM records"
+
+# SQL expressions allowed as GROUP BY keys in aggregate_amounts
+_GROUP_EXPRS = {
+    "type": "type",
+    "category_id": "category_id",
+    "day": "substr(date, 1, 10)",
+    "month": "substr(date, 1, 7)",
+    "year": "substr(date, 1, 4)",
+}
+
+# the same keys over daily_rollup ('' category_id means uncategorized)
+_ROLLUP_GROUP_EXPRS = {
+    "type": "type",
+    "category_id": "NULLIF(category_id, '')",
+    "day": "day",
+    "month": "substr(day, 1, 7)",
+    "year": "substr(day, 1, 4)",
+}
+
+# records joined with their category; output columns are aliased so ORDER BY id/type/date
+# resolve to the record's columns
+_SELECT_RECORD_VIEWS_SQL = (
+    "SELECT records.id AS id, records.type AS type, records.amount AS amount, "
+    "records.amount_cents AS amount_cents, records.date AS date, "
+    "records.category_id AS category_id, c.name AS category_name, c.type AS category_type, "
+    "records.remark AS remark, records.created_at AS created_at "
+    "FROM records LEFT JOIN categories AS c ON c.id = records.category_id"
+)
+
+# pre-restore backups kept per database; older ones are deleted
+PRE_RESTORE_BACKUPS_KEEP = 5
+# seconds DataManager.backup pauses between steps of `pages` pages so writers get the database
+BACKUP_STEP_SLEEP = 0.005
+
+_INSERT_RECORD_SQL = (
+    "INSERT INTO records(id, type, amount, amount_cents, date, category_id, remark, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _writes(method):
+    """Run a write method under the driver's write lock so transactions from different threads don't interleave."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.driver.write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class DataManager:
-    def __init__(self, db_path: str = "data/app.db"):
+    def __init__(self, db_path: str = "data/app.db", concurrent: bool = False,
+                 busy_timeout_ms: int = 5000, read_pool_size: int = 4,
+                 instrument: bool = False, slow_query_ms: Optional[float] = None):
+        """
+        concurrent: opt into WAL mode with a dedicated writer connection and a pool of
+        `read_pool_size` read-only connections, so reads can run on worker threads in
+        parallel with writes. busy_timeout_ms applies to every connection.
+        instrument / slow_query_ms: per-statement timing and slow-query logging in the
+        driver (see SQLiteDriver); read them back with driver.dump_stats().
+        """
         self.db_path = str(db_path)
-        # apply migrations first (creates DB if needed)
-        script_dir = Path(__file__).resolve().parents[1] / "db" / "migrations"
-        apply_migrations(self.db_path, str(script_dir))
-        self.driver = SQLiteDriver(self.db_path)
+        self.migrations_dir = str(Path(__file__).resolve().parents[1] / "db" / "migrations")
+        self.driver = SQLiteDriver(self.db_path, concurrent=concurrent,
+                                   busy_timeout_ms=busy_timeout_ms, read_pool_size=read_pool_size,
+                                   instrument=instrument, slow_query_ms=slow_query_ms)
         self.driver.connect()
+        # fast path: PRAGMA user_version already holds this build's migration fingerprint;
+        # otherwise run the migrations on the driver's connection (creates the schema if needed)
+        if not schema_is_current(self.driver.conn, self.migrations_dir):
+            with self.driver.write_lock:
+                apply_migrations(self.db_path, self.migrations_dir, conn=self.driver.conn)
+        # bumped after every successful write; result caches key on it (via current_generation)
+        self.generation = 0
+        # guards generation and the data_version check; never held across a database write
+        self._generation_lock = threading.Lock()
+        # connection whose PRAGMA data_version is watched (see current_generation) and its last value
+        self._version_conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self.current_generation()
+        # in-process category cache (id -> Category), loaded on first use and kept
+        # current by the category write methods; dropped when current_generation() sees
+        # a commit from another connection
+        self._categories: Optional[Dict[str, Category]] = None
+        self._categories_lock = threading.Lock()
+        # bumped by every cache change, so a load that raced with one isn't published
+        self._categories_version = 0
+        self.category_cache_hits = 0
+        self.category_cache_misses = 0
 
     def close(self):
+        self._close_version_conn()
         self.driver.close()
 
+    def _bump_generation(self) -> None:
+        with self._generation_lock:
+            self.generation += 1
+
+    def _close_version_conn(self) -> None:
+        with self._generation_lock:
+            if self._version_conn is not None and self._version_conn is not self.driver.conn:
+                self._version_conn.close()
+            self._version_conn = None
+            self._data_version = None
+
+    def current_generation(self) -> int:
+        """
+        generation, bumped first if another connection -- e.g. the CLI running an import or
+        restore from another process -- committed since the last call (PRAGMA data_version).
+
+        Doesn't wait for writes: in concurrent mode the version is read on a connection of
+        its own (it then also sees this DataManager's commits, which only costs an extra
+        bump); otherwise on the shared connection, whose own commits don't change it.
+        """
+        with self._generation_lock:
+            if self._version_conn is None:
+                self._version_conn = (self.driver.open_reader_connection() if self.driver.concurrent
+                                      else self.driver.conn)
+            version = self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+            changed = self._data_version is not None and version != self._data_version
+            if changed:
+                self.generation += 1
+            self._data_version = version
+            generation = self.generation
+        if changed:
+            # categories may have been added or removed elsewhere
+            self.invalidate_category_cache()
+        return generation
+
     # ---------------- Categories ----------------
+    def _category_map(self) -> Dict[str, Category]:
+        # one PRAGMA: drops the cache first if another connection committed
+        self.current_generation()
+        with self._categories_lock:
+            if self._categories is not None:
+                self.category_cache_hits += 1
+                return self._categories
+            self.category_cache_misses += 1
+            version = self._categories_version
+        rows = self.driver.query("SELECT id, name, type, is_custom FROM categories")
+        cats = {row["id"]: Category(row["id"], row["name"], row["type"], bool(row["is_custom"])) for row in rows}
+        with self._categories_lock:
+            # a category write during the load may be missing from `cats`: don't publish it
+            if self._categories_version == version:
+                self._categories = cats
+        return cats
+
+    def _cache_category(self, category_id: str, cat: Optional[Category]) -> None:
+        with self._categories_lock:
+            self._categories_version += 1
+            if self._categories is None:
+                return
+            if cat is None:
+                self._categories.pop(category_id, None)
+            else:
+                self._categories[category_id] = replace(cat)
+
+    def invalidate_category_cache(self) -> None:
+        with self._categories_lock:
+            self._categories_version += 1
+            self._categories = None
+
+    def category_cache_stats(self) -> Dict[str, int]:
+        with self._categories_lock:
+            size = len(self._categories) if self._categories is not None else 0
+            return {"hits": self.category_cache_hits, "misses": self.category_cache_misses, "size": size}
+
     def list_categories(self) -> List[Category]:
-        cur = self.driver.execute("SELECT id, name, type, is_custom FROM categories ORDER BY name")
-        rows = cur.fetchall()
-        return [Category(row["id"], row["name"], row["type"], bool(row["is_custom"])) for row in rows]
+        # copies, so callers can't modify cached entries; same order as ORDER BY name
+        return [replace(c) for c in sorted(self._category_map().values(), key=lambda c: c.name)]
 
     def get_category(self, category_id: str) -> Optional[Category]:
-        cur = self.driver.execute("SELECT id, name, type, is_custom FROM categories WHERE id = ?", (category_id,))
-        row = cur.fetchone()
-        if not row:
-            return None
-        return Category(row["id"], row["name"], row["type"], bool(row["is_custom"]))
+        cat = self._category_map().get(category_id)
+        return replace(cat) if cat is not None else None
 
+    def has_category(self, category_id: str) -> bool:
+        """O(1) existence check served from the category cache."""
+        return category_id in self._category_map()
+
+    @_writes
     def add_category(self, cat: Category) -> Tuple[bool, str]:
         try:
             self.driver.execute(
@@ -46,58 +249,153 @@ class DataManager:
                 (cat.id, cat.name, cat.type, int(cat.is_custom)),
             )
             self.driver.commit()
+            self._cache_category(cat.id, cat)
+            self._bump_generation()
             return True, ""
         except sqlite3.IntegrityError as e:
             self.driver.rollback()
             return False, str(e)
 
+    @_writes
     def update_category(self, cat: Category) -> Tuple[bool, str]:
         try:
-            self.driver.execute(
+            cur = self.driver.execute(
                 "UPDATE categories SET name = ?, type = ?, is_custom = ? WHERE id = ?",
                 (cat.name, cat.type, int(cat.is_custom), cat.id),
             )
             self.driver.commit()
+            if cur.rowcount:
+                self._cache_category(cat.id, cat)
+            self._bump_generation()
             return True, ""
         except sqlite3.DatabaseError as e:
             self.driver.rollback()
             return False, str(e)
 
-    def delete_category(self, category_id: str, strategy: str = "SET_NULL", migrate_to: Optional[str] = None) -> Tuple[bool, str]:
+    def reassign_records(self, source_ids: Iterable[str], target_id: Optional[str], chunk_size: int = 5000,
+                         progress: Optional[ProgressCallback] = None,
+                         cancel: Optional[threading.Event] = None) -> ReassignResult:
+        """
+        Move every record in the source categories to target_id (None = uncategorized).
+
+        Each source category is walked through idx_records_category in rowid order, one
+        transaction of at most `chunk_size` records at a time; the write lock is released
+        between chunks so other writes (and readers, in concurrent mode) get through.
+        progress(moved, total) is called after every committed chunk. Setting `cancel`
+        stops before the next chunk; chunks already committed stay moved.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        sources = list(dict.fromkeys(c for c in source_ids if c != target_id))
+        result = ReassignResult()
+        if not sources:
+            return result
+        marks = ",".join("?" * len(sources))
+        result.total = self.driver.execute(
+            f"SELECT COUNT(*) FROM records WHERE category_id IN ({marks})", tuple(sources)
+        ).fetchone()[0]
+        for source in sources:
+            last_rowid = 0
+            while True:
+                if cancel is not None and cancel.is_set():
+                    result.cancelled = True
+                    return result
+                with self.driver.write_lock:
+                    try:
+                        # (category_id, rowid) is the index key, so the chunk is one index range scan
+                        rows = self.driver.execute(
+                            "SELECT rowid FROM records WHERE category_id = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                            (source, last_rowid, chunk_size),
+                        ).fetchall()
+                        if not rows:
+                            break
+                        self.driver.execute("BEGIN")
+                        cur = self.driver.execute(
+                            "UPDATE records SET category_id = ? WHERE category_id = ? AND rowid > ? AND rowid <= ?",
+                            (target_id, source, last_rowid, rows[-1][0]),
+                        )
+                        self.driver.commit()
+                    except sqlite3.DatabaseError as e:
+                        self.driver.rollback()
+                        result.error = str(e)
+                        return result
+                    last_rowid = rows[-1][0]
+                    result.moved += cur.rowcount
+                    self._bump_generation()
+                if progress is not None:
+                    progress(result.moved, max(result.total, result.moved))
+        return result
+
+    def merge_categories(self, source_ids: Iterable[str], target_id: str, chunk_size: int = 5000,
+                         progress: Optional[ProgressCallback] = None,
+                         cancel: Optional[threading.Event] = None) -> Tuple[bool, str]:
+        """Move the records of all source categories into target_id in one batched pass, then delete the sources."""
+        if not self.has_category(target_id):
+            return False, f"unknown target category: {target_id}"
+        sources = [c for c in dict.fromkeys(source_ids) if c != target_id]
+        return self._reassign_and_delete(sources, target_id, chunk_size, progress, cancel)
+
+    def delete_category(self, category_id: str, strategy: str = "SET_NULL", migrate_to: Optional[str] = None,
+                        chunk_size: int = 5000, progress: Optional[ProgressCallback] = None,
+                        cancel: Optional[threading.Event] = None) -> Tuple[bool, str]:
         """
         strategy:
          - SET_NULL: set category_id to NULL for affected records
          - MOVE_TO_OTHER: set category_id to migrate_to (must be provided)
+        Records are rewritten in chunks (see reassign_records); the category itself is only
+        deleted once all of them are moved, so a cancelled delete can simply be run again.
         """
-        try:
-            if strategy == "MOVE_TO_OTHER":
-                if not migrate_to:
-                    return False, "migrate_to required for MOVE_TO_OTHER"
-                self.driver.execute("BEGIN")
-                self.driver.execute("UPDATE records SET category_id = ? WHERE category_id = ?", (migrate_to, category_id))
-                self.driver.execute("DELETE FROM categories WHERE id = ?", (category_id,))
-                self.driver.commit()
-            else:
-                # SET_NULL
+        if strategy == "MOVE_TO_OTHER":
+            if not migrate_to:
+                return False, "migrate_to required for MOVE_TO_OTHER"
+            target = migrate_to
+        else:
+            # SET_NULL
+            target = None
+        return self._reassign_and_delete([category_id], target, chunk_size, progress, cancel)
+
+    def _reassign_and_delete(self, sources: List[str], target_id: Optional[str], chunk_size: int,
+                             progress: Optional[ProgressCallback], cancel: Optional[threading.Event]) -> Tuple[bool, str]:
+        result = self.reassign_records(sources, target_id, chunk_size=chunk_size, progress=progress, cancel=cancel)
+        if result.cancelled:
+            return False, f"cancelled after moving {result.moved} of {result.total} records"
+        if result.error is not None:
+            return False, result.error
+        if not sources:
+            return True, ""
+        marks = ",".join("?" * len(sources))
+        with self.driver.write_lock:
+            try:
                 self.driver.execute("BEGIN")
-                self.driver.execute("UPDATE records SET category_id = NULL WHERE category_id = ?", (category_id,))
-                self.driver.execute("DELETE FROM categories WHERE id = ?", (category_id,))
+                # records added to a source category while the chunks ran
+                self.driver.execute(f"UPDATE records SET category_id = ? WHERE category_id IN ({marks})",
+                                    (target_id, *sources))
+                self.driver.execute(f"DELETE FROM categories WHERE id IN ({marks})", tuple(sources))
                 self.driver.commit()
-            return True, ""
-        except sqlite3.DatabaseError as e:
-            self.driver.rollback()
-            return False, str(e)
+            except sqlite3.DatabaseError as e:
+                self.driver.rollback()
+                return False, str(e)
+            for c in sources:
+                self._cache_category(c, None)
+            self._bump_generation()
+        return True, ""
 
     # ---------------- Records ----------------
+    @staticmethod
+    def _record_params(rec: AccountRecord) -> tuple:
+        # amount_cents is authoritative; the REAL column is kept equal to it for older readers
+        cents = rec.amount_cents
+        return (rec.id, rec.type, from_cents(cents), cents, rec.date, rec.category_id, rec.remark,
+                rec.created_at or datetime.utcnow().isoformat())
+
+    @_writes
     def save_record(self, rec: AccountRecord) -> Tuple[bool, str]:
         if not rec.validate():
             return False, "validation failed"
         try:
-            self.driver.execute(
-                "INSERT INTO records(id, type, amount, date, category_id, remark, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (rec.id, rec.type, float(rec.amount), rec.date, rec.category_id, rec.remark, rec.created_at or datetime.utcnow().isoformat()),
-            )
+            self.driver.execute(_INSERT_RECORD_SQL, self._record_params(rec))
             self.driver.commit()
+            self._bump_generation()
             return True, ""
         except sqlite3.IntegrityError as e:
             self.driver.rollback()
@@ -106,32 +404,96 @@ class DataManager:
             self.driver.rollback()
             return False, str(e)
 
+    def save_records(self, records: Iterable[AccountRecord], chunk_size: int = 1000) -> BulkSaveResult:
+        """
+        Bulk insert: rows are validated up front and written with executemany,
+        one transaction (and one commit) per chunk of `chunk_size` rows.
+
+        A chunk runs inside a savepoint; if executemany hits a constraint violation
+        the chunk is rolled back to the savepoint and replayed row by row so that
+        only the offending rows are reported and the rest are still saved.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        result = BulkSaveResult()
+        chunk: List[Tuple[int, AccountRecord]] = []
+        for idx, rec in enumerate(records):
+            if not rec.validate():
+                result.errors.append((idx, rec.id, "validation failed"))
+                continue
+            chunk.append((idx, rec))
+            if len(chunk) >= chunk_size:
+                self._save_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            self._save_chunk(chunk, result)
+        result.errors.sort(key=lambda e: e[0])
+        return result
+
+    @_writes
+    def _save_chunk(self, chunk: List[Tuple[int, AccountRecord]], result: BulkSaveResult) -> None:
+        params = [self._record_params(rec) for _, rec in chunk]
+        try:
+            self.driver.execute("SAVEPOINT bulk_chunk")
+            try:
+                self.driver.executemany(_INSERT_RECORD_SQL, params)
+                saved = len(chunk)
+            except sqlite3.IntegrityError:
+                self.driver.execute("ROLLBACK TO bulk_chunk")
+                saved = 0
+                for (idx, rec), p in zip(chunk, params):
+                    self.driver.execute("SAVEPOINT bulk_row")
+                    try:
+                        self.driver.execute(_INSERT_RECORD_SQL, p)
+                        saved += 1
+                    except sqlite3.IntegrityError as e:
+                        self.driver.execute("ROLLBACK TO bulk_row")
+                        result.errors.append((idx, rec.id, str(e)))
+                    self.driver.execute("RELEASE bulk_row")
+            self.driver.execute("RELEASE bulk_chunk")
+            self.driver.commit()
+            result.saved += saved
+            if saved:
+                self._bump_generation()
+        except sqlite3.DatabaseError as e:
+            self.driver.rollback()
+            reported = {i for i, _, _ in result.errors}
+            for idx, rec in chunk:
+                if idx not in reported:
+                    result.errors.append((idx, rec.id, str(e)))
+
+    @_writes
     def update_record(self, rec: AccountRecord) -> Tuple[bool, str]:
         if not rec.validate():
             return False, "validation failed"
         try:
+            cents = rec.amount_cents
             self.driver.execute(
-                "UPDATE records SET type = ?, amount = ?, date = ?, category_id = ?, remark = ? WHERE id = ?",
-                (rec.type, float(rec.amount), rec.date, rec.category_id, rec.remark, rec.id),
+                "UPDATE records SET type = ?, amount = ?, amount_cents = ?, date = ?, category_id = ?, remark = ? WHERE id = ?",
+                (rec.type, from_cents(cents), cents, rec.date, rec.category_id, rec.remark, rec.id),
             )
             self.driver.commit()
+            self._bump_generation()
             return True, ""
         except sqlite3.DatabaseError as e:
             self.driver.rollback()
             return False, str(e)
 
+    @_writes
     def delete_record(self, record_id: str) -> Tuple[bool, str]:
         try:
             self.driver.execute("DELETE FROM records WHERE id = ?", (record_id,))
             self.driver.commit()
+            self._bump_generation()
             return True, ""
         except sqlite3.DatabaseError as e:
             self.driver.rollback()
             return False, str(e)
 
-    def query_records(self, start: Optional[str] = None, end: Optional[str] = None, category_id: Optional[str] = None,
-                      limit: int = 100, offset: int = 0, order_by: str = "date DESC") -> List[AccountRecord]:
-        sql = "SELECT id, type, amount, date, category_id, remark, created_at FROM records WHERE 1=1"
+    @staticmethod
+    def _record_filters(start: Optional[str], end: Optional[str], category_id: Optional[str]) -> Tuple[str, list]:
+        """WHERE clause (starting with "WHERE 1=1") and params shared by every record read."""
+        sql = " WHERE 1=1"
         params = []
         if start:
             sql += " AND date >= ?"
@@ -142,22 +504,363 @@ class DataManager:
         if category_id:
             sql += " AND category_id = ?"
             params.append(category_id)
+        return sql, params
+
+    def query_records(self, start: Optional[str] = None, end: Optional[str] = None, category_id: Optional[str] = None,
+                      limit: int = 100, offset: int = 0, order_by: str = "date DESC") -> List[AccountRecord]:
+        where, params = self._record_filters(start, end, category_id)
+        sql = _SELECT_RECORDS_SQL + where
         sql += f" ORDER BY {order_by} LIMIT ? OFFSET ?"
         params.extend([limit, offset])
-        cur = self.driver.execute(sql, tuple(params))
-        rows = cur.fetchall()
+        rows = self.driver.query(sql, tuple(params))
         res = []
         for r in rows:
-            res.append(AccountRecord(r["id"], r["type"], float(r["amount"]), r["date"], r["category_id"], r["remark"], r["created_at"]))
+            res.append(self._row_to_record(r))
         return res
 
+    def query_records_page(self, start: Optional[str] = None, end: Optional[str] = None, category_id: Optional[str] = None,
+                           limit: int = 100, after: Optional[PageToken] = None,
+                           descending: bool = True, sort_key: str = "date") -> Tuple[List[AccountRecord], Optional[PageToken]]:
+        """
+        Keyset (seek) pagination ordered by (sort_key, id); sort_key is "date" (default),
+        "amount" or "type".
+
+        `after` is the continuation token returned with the previous page: the (sort value, id)
+        of its last row. For date order the next page starts right after it via
+        idx_records_date, so the cost per page does not grow with depth like OFFSET does.
+        Returns (records, next_token); next_token is None when there are no more rows.
+        """
+        rows, token = self._query_page_rows(_SELECT_RECORDS_SQL, start, end, category_id, limit, after, descending, sort_key)
+        return [self._row_to_record(r) for r in rows], token
+
+    def query_record_views_page(self, start: Optional[str] = None, end: Optional[str] = None,
+                                category_id: Optional[str] = None, limit: int = 100, after: Optional[PageToken] = None,
+                                descending: bool = True,
+                                sort_key: str = "date") -> Tuple[List[RecordView], Optional[PageToken]]:
+        """Same as query_records_page, but rows come joined with category name/type in the same query."""
+        rows, token = self._query_page_rows(_SELECT_RECORD_VIEWS_SQL, start, end, category_id, limit, after, descending, sort_key)
+        return [self._row_to_view(r) for r in rows], token
+
+    def _query_page_rows(self, select_sql: str, start: Optional[str], end: Optional[str], category_id: Optional[str],
+                         limit: int, after: Optional[PageToken], descending: bool,
+                         sort_key: str) -> Tuple[List[sqlite3.Row], Optional[PageToken]]:
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        if sort_key not in _PAGE_SORT_KEYS:
+            raise ValueError(f"unsupported sort_key: {sort_key}")
+        where, params = self._record_filters(start, end, category_id)
+        sql = select_sql + where
+        if after is not None:
+            op = "<" if descending else ">"
+            sql += f" AND (records.{sort_key}, records.id) {op} (?, ?)"
+            params.extend([after[0], after[1]])
+        direction = "DESC" if descending else "ASC"
+        # fetch one extra row to know whether another page exists
+        sql += f" ORDER BY records.{sort_key} {direction}, records.id {direction} LIMIT ?"
+        params.append(limit + 1)
+        rows = self.driver.query(sql, tuple(params))
+        next_token = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_token = (last[sort_key], last["id"])
+        return rows[:limit], next_token
+
+    def aggregate_amounts(self, group_by: str, start: Optional[str] = None, end: Optional[str] = None,
+                          category_id: Optional[str] = None) -> List[Tuple[Optional[str], float]]:
+        """
+        Exact SUM(amount_cents) grouped in SQL, returning [(key, total), ...]
+        with totals converted back from cents.
+        group_by: "type", "category_id", or a date bucket "day" / "month" / "year"
+        (a prefix of the ISO date string).
+
+        Whole days inside the range are summed from the daily_rollup table; only a
+        start or end bound with a time component leaves a partial day at that edge,
+        which is summed from records through idx_records_date.
+        """
+        expr = _GROUP_EXPRS.get(group_by)
+        if expr is None:
+            raise ValueError(f"unsupported group_by: {group_by}")
+        plan = self._rollup_plan(start, end)
+        if plan is None:
+            where, params = self._record_filters(start, end, category_id)
+            sql = f"SELECT {expr} AS k, SUM(amount_cents) AS total_cents FROM records{where} GROUP BY k ORDER BY k"
+            rows = self.driver.query(sql, tuple(params))
+            return [(r["k"], from_cents(r["total_cents"])) for r in rows]
+        day_from, day_before, edges = plan
+        totals = self._aggregate_from_rollup(group_by, day_from, day_before, category_id)
+        for edge_sql, edge_params in edges:
+            sql = f"SELECT {expr} AS k, SUM(amount_cents) AS total_cents FROM records WHERE {edge_sql}"
+            params = list(edge_params)
+            if category_id:
+                sql += " AND category_id = ?"
+                params.append(category_id)
+            for r in self.driver.query(sql + " GROUP BY k", tuple(params)):
+                totals[r["k"]] = totals.get(r["k"], 0) + r["total_cents"]
+        # same order as ORDER BY k: NULL first
+        return [(k, from_cents(totals[k])) for k in sorted(totals, key=lambda k: (k is not None, k))]
+
+    @staticmethod
+    def _day_prefix(bound: str) -> Optional[str]:
+        day = bound[:10]
+        try:
+            datetime.strptime(day, "%Y-%m-%d")
+        except ValueError:
+            return None
+        return day
+
+    @classmethod
+    def _rollup_plan(cls, start: Optional[str], end: Optional[str]):
+        """
+        Split a date range into whole days for daily_rollup and partial edge days for records:
+        (day_from, day_before, [(records WHERE sql, params), ...]) -- rollup days are
+        day_from <= day < day_before (None = open) -- or None when the rollup can't help.
+        Every record date of a day starts with that 'YYYY-MM-DD', so comparing dates as
+        strings against a day boundary splits records exactly like the rollup splits days.
+        """
+        day_from = day_before = None
+        edges = []
+        if start:
+            day = cls._day_prefix(start)
+            if day is None:
+                return None
+            if start == day:
+                day_from = day
+            else:
+                # the start day is cut by a time: rollup from the next day, records for the rest
+                day_from = (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+                edges.append(("date >= ? AND date < ?", (start, day_from)))
+        if end:
+            day = cls._day_prefix(end)
+            if day is None:
+                return None
+            # `date <= end` can cut the end day anywhere, so that day always comes from records
+            day_before = day
+            edges.append(("date >= ? AND date <= ?", (day, end)))
+        if day_from is not None and day_before is not None and day_from >= day_before:
+            # the range is within one or two days: the records index serves it directly
+            return None
+        return day_from, day_before, edges
+
+    def _aggregate_from_rollup(self, group_by: str, day_from: Optional[str], day_before: Optional[str],
+                               category_id: Optional[str]) -> Dict[Optional[str], int]:
+        expr = _ROLLUP_GROUP_EXPRS[group_by]
+        sql = f"SELECT {expr} AS k, SUM(total_cents) AS total_cents FROM daily_rollup WHERE 1=1"
+        params = []
+        if day_from:
+            sql += " AND day >= ?"
+            params.append(day_from)
+        if day_before:
+            sql += " AND day < ?"
+            params.append(day_before)
+        if category_id:
+            sql += " AND category_id = ?"
+            params.append(category_id)
+        sql += " GROUP BY k"
+        rows = self.driver.query(sql, tuple(params))
+        return {r["k"]: r["total_cents"] for r in rows}
+
+    @_writes
+    def rebuild_daily_rollup(self) -> Tuple[bool, str]:
+        """Recompute the daily_rollup summary table from records (for existing / repaired databases)."""
+        try:
+            n = rebuild_daily_rollup(self.driver.conn)
+            self._bump_generation()
+            return True, f"{n} rollup rows"
+        except sqlite3.DatabaseError as e:
+            return False, str(e)
+
+    def check_daily_rollup(self) -> List[dict]:
+        """Mismatches between daily_rollup and records; empty when consistent."""
+        with self.driver.reader() as conn:
+            return check_daily_rollup(conn)
+
+    @staticmethod
+    def _row_amount(r: sqlite3.Row) -> float:
+        cents = r["amount_cents"]
+        return from_cents(cents) if cents is not None else float(r["amount"])
+
+    @staticmethod
+    def _row_to_record(r: sqlite3.Row) -> AccountRecord:
+        return AccountRecord(r["id"], r["type"], DataManager._row_amount(r), r["date"], r["category_id"], r["remark"], r["created_at"])
+
+    @staticmethod
+    def _row_to_compact(r: sqlite3.Row) -> CompactRecord:
+        return CompactRecord(r["id"], r["type"], DataManager._row_amount(r), r["date"], r["category_id"], r["remark"], r["created_at"])
+
+    @staticmethod
+    def _row_to_view(r: sqlite3.Row) -> RecordView:
+        return RecordView(r["id"], r["type"], DataManager._row_amount(r), r["date"], r["category_id"],
+                          r["category_name"], r["category_type"], r["remark"], r["created_at"])
+
+    def iter_record_batches(self, start: Optional[str] = None, end: Optional[str] = None, category_id: Optional[str] = None,
+                            order_by: str = "date", batch_size: int = 500,
+                            compact: bool = False) -> Iterator[List[AccountRecord]]:
+        """
+        Stream matching records as lists of at most `batch_size`, pulled with cursor.fetchmany.
+        Takes the same filters as query_records but has no limit, so memory stays bounded by
+        one batch however large the result is. This is the primitive for full-ledger scans.
+        compact=True yields slotted CompactRecords instead, for callers that keep them.
+
+        The cursor is closed when iteration finishes, fails, or the consumer stops early
+        (break / generator.close() / garbage collection).
+        """
+        convert = self._row_to_compact if compact else self._row_to_record
+        yield from self._iter_rows(_SELECT_RECORDS_SQL, convert, start, end, category_id, order_by, batch_size)
+
+    def iter_record_columns(self, start: Optional[str] = None, end: Optional[str] = None, category_id: Optional[str] = None,
+                            order_by: str = "date", batch_size: int = 5000) -> Iterator[RecordBatch]:
+        """
+        Stream matching records as columnar RecordBatches of at most `batch_size` rows:
+        no object per record, for statistics and exports over large ranges.
+        """
+        yield from self._iter_rows(_SELECT_RECORDS_SQL, RecordBatch.from_rows, start, end, category_id, order_by,
+                                   batch_size, per_row=False)
+
+    def iter_record_views(self, start: Optional[str] = None, end: Optional[str] = None, category_id: Optional[str] = None,
+                          order_by: str = "date", batch_size: int = 500) -> Iterator[RecordView]:
+        """
+        Stream display-ready rows (records LEFT JOIN categories) for exports and reports:
+        one query for the whole scan instead of a category lookup per record.
+        """
+        batches = self._iter_rows(_SELECT_RECORD_VIEWS_SQL, self._row_to_view, start, end, category_id, order_by, batch_size)
+        try:
+            for batch in batches:
+                yield from batch
+        finally:
+            batches.close()
+
+    def _iter_rows(self, select_sql: str, convert, start: Optional[str], end: Optional[str],
+                   category_id: Optional[str], order_by: str, batch_size: int, per_row: bool = True) -> Iterator:
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        where, params = self._record_filters(start, end, category_id)
+        sql = select_sql + where + f" ORDER BY {order_by}"
+        # in concurrent mode the pooled reader stays checked out until the generator ends
+        with self.driver.reader() as conn:
+            cur = self.driver.execute_on(conn, sql, tuple(params))
+            try:
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield [convert(r) for r in rows] if per_row else convert(rows)
+            finally:
+                cur.close()
+
+    def iter_records(self, start: Optional[str] = None, end: Optional[str] = None, category_id: Optional[str] = None,
+                     order_by: str = "date", batch_size: int = 500, compact: bool = False) -> Iterator[AccountRecord]:
+        """Record-by-record view over iter_record_batches."""
+        batches = self.iter_record_batches(start=start, end=end, category_id=category_id,
+                                           order_by=order_by, batch_size=batch_size, compact=compact)
+        try:
+            for batch in batches:
+                yield from batch
+        finally:
+            batches.close()
+
     # ---------------- Backup / Restore helper ----------------
-    def backup(self, backup_path: str) -> Tuple[bool, str]:
+    def backup(self, backup_path: str, compress: Optional[str] = None, progress: Optional[ProgressCallback] = None,
+               pages: int = 256, sleep: float = BACKUP_STEP_SLEEP) -> Tuple[bool, str]:
+        """
+        Online, consistent copy of the database (see data/backup.py); safe while other
+        threads keep writing, which get the database between steps (sleep=0 copies
+        without pausing). compress: None, "gzip" or "xz".
+        """
         try:
-            src = Path(self.db_path)
-            dst = Path(backup_path)
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(src, dst)
+            online_backup(self.db_path, backup_path, pages=pages, sleep=sleep, progress=progress, compress=compress)
             return True, ""
         except Exception as e:
-            return False, str(e)
\ No newline at end of file
+            return False, str(e)
+
+    def backup_rotating(self, backups_dir: Optional[str] = None, keep: int = 10, compress: Optional[str] = None,
+                        progress: Optional[ProgressCallback] = None) -> Tuple[bool, str]:
+        """
+        Write <backups_dir>/<dbname>_backup_<YYYYmmddHHMMSSffffff>.db[.gz|.xz] (default backups_dir:
+        <db_parent>/backups) and delete all but the `keep` newest of them.
+        Returns (True, backup path) or (False, error).
+        """
+        db = Path(self.db_path)
+        target_dir = Path(backups_dir) if backups_dir else db.parent / "backups"
+        suffix = COMPRESSORS[compress][1] if compress in COMPRESSORS else ""
+        ts = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+        path = target_dir / f"{db.stem}_backup_{ts}.db{suffix}"
+        n = 1
+        while path.exists():
+            # coarse clocks can repeat a timestamp; never overwrite an earlier backup
+            path = target_dir / f"{db.stem}_backup_{ts}_{n}.db{suffix}"
+            n += 1
+        ok, msg = self.backup(str(path), compress=compress, progress=progress)
+        if not ok:
+            return False, msg
+        try:
+            # finished names only: plain, gzip and xz backups count towards `keep` together
+            prune_backups(target_dir, [f"{db.stem}_backup_*.db{s}" for s in ("", ".gz", ".xz")], keep=keep)
+        except OSError as e:
+            return False, f"backup written to {path}, pruning failed: {e}"
+        return True, str(path)
+
+    def restore(self, backup_path: str, keep_current: bool = True, timeout: float = 30.0,
+                progress: Optional[ProgressCallback] = None) -> Tuple[bool, str]:
+        """
+        Replace the database with a backup (plain, gzip or xz) while this DataManager stays open.
+
+        The backup is loaded through the backup API into <db>.restore next to the live file,
+        checked (quick_check, no migrations newer than this build) and migrated up to the
+        current schema. Only then are connections paused (waiting up to `timeout` seconds
+        for running statements) for steps that don't depend on the database size: the WAL
+        is checkpointed and truncated, with keep_current the live file is renamed to
+        backups/<db>_pre_restore_<ts>.db (so it holds every write up to the swap; only the
+        newest PRE_RESTORE_BACKUPS_KEEP are kept), the staged file is renamed into place,
+        connections are reopened and caches invalidated.
+        """
+        db = Path(self.db_path)
+        staging = db.with_name(db.name + ".restore")
+        try:
+            copy_for_restore(backup_path, staging, progress=progress)
+            problems = check_backup(staging, list_migration_names(self.migrations_dir))
+            if problems:
+                return False, "; ".join(problems)
+            apply_migrations(str(staging), self.migrations_dir, pre_backup=False)
+            backups_dir = db.parent / "backups"
+            kept = None
+            if keep_current:
+                backups_dir.mkdir(parents=True, exist_ok=True)
+                ts = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+                kept = backups_dir / f"{db.stem}_pre_restore_{ts}.db"
+            with self.driver.exclusive(timeout=timeout):
+                if self.driver.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+                    # fold the WAL into the old file and empty it, so nothing of it can be
+                    # replayed into the new one; fails instead if another connection still reads
+                    busy = self.driver.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+                    if busy:
+                        raise TimeoutError("another connection is still reading the database")
+                self._close_version_conn()
+                self.driver.close()
+                try:
+                    # renames on one filesystem: the pause doesn't grow with the database
+                    if kept is not None:
+                        os.replace(db, kept)
+                    try:
+                        os.replace(staging, db)
+                    except OSError:
+                        if kept is not None:
+                            os.replace(kept, db)
+                        raise
+                finally:
+                    self.driver.connect()
+            self.invalidate_category_cache()
+            self._bump_generation()
+            if kept is not None:
+                try:
+                    prune_backups(backups_dir, f"{db.stem}_pre_restore_*.db", keep=PRE_RESTORE_BACKUPS_KEEP)
+                except OSError as e:
+                    return True, f"restored; pruning old pre-restore backups failed: {e}"
+            return True, ""
+        except TimeoutError as e:
+            return False, f"database busy: {e}"
+        except (OSError, sqlite3.DatabaseError, MigrationChecksumError, ValueError) as e:
+            return False, str(e)
+        finally:
+            for leftover in (staging, Path(str(staging) + "-wal"), Path(str(staging) + "-shm")):
+                if leftover.exists():
+                    leftover.unlink()
@@ -2,20 +2,118 @@
 Migration runner: applies SQL files in migrations directory in order and records applied versions.
 
 This variant will try fallback locations if the provided migrations_dir does not exist.
+
+Besides .sql scripts the directory can hold Python data migrations (NNN_name.py) for
+rewrites of large tables. Instead of one long statement they walk the table in key
+order, one transaction per batch, and the batch's writes are committed together with a
+progress cursor in meta_migrations -- an interrupted migration resumes after the last
+committed batch on the next start. A data migration module defines:
+
+    TABLE = "records"              # table to walk
+    COLUMNS = ("amount",)          # columns passed to migrate_batch after the key
+    KEY = "rowid"                  # optional, unique column to walk by (default rowid)
+    WHERE = "amount_cents IS NULL" # optional filter
+    BATCH_SIZE = 5000              # optional
+    def setup(conn): ...           # optional, runs once before the first batch
+    def migrate_batch(conn, rows): # rows: [(key, *COLUMNS)]; don't commit
+
+Every applied migration's content checksum is stored in meta_migrations, and once all
+migrations are applied a fingerprint of the whole set (names + checksums) is written to
+PRAGMA user_version. schema_is_current() compares that header field against the
+fingerprint of the migrations directory (computed once per process), which lets
+DataManager skip the runner entirely on a normal start.
 """
 from pathlib import Path
 from datetime import datetime
-import shutil
+import hashlib
+import logging
 import sqlite3
-from typing import List, Optional
+import sys
+import threading
+import time
+import types
+from typing import Callable, Dict, List, Optional, Tuple
+
+if __name__ == "__main__":
+    # run as a script: make the src/ packages importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data.backup import online_backup, prune_backups
 
 MIGRATIONS_TABLE = "meta_migrations"
+# pre-migration backups kept per database; older ones are deleted
+PRE_MIGRATION_BACKUPS_KEEP = 5
+# rows per transaction for data migrations that don't set BATCH_SIZE
+DEFAULT_BATCH_SIZE = 5000
+
+# meta_migrations.status; NULL (databases from before data migrations) means done
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+
+# progress(version, rows_done, rows_per_sec), called after every committed batch
+MigrationProgress = Callable[[str, int, float], None]
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationChecksumError(RuntimeError):
+    """An already-applied migration file was edited afterwards."""
+
+
+# resolved migrations dir -> fingerprint, filled on first use in this process
+_fingerprints: Dict[str, int] = {}
+_fingerprints_lock = threading.Lock()
+
+
+def _checksum(p: Path) -> str:
+    # line endings are normalized so a CRLF checkout doesn't look like an edit
+    return hashlib.sha256(p.read_bytes().replace(b"\r\n", b"\n")).hexdigest()
+
+
+def _fingerprint(entries: List[Tuple[str, str]]) -> int:
+    h = hashlib.sha256()
+    for name, checksum in entries:
+        h.update(f"{name}\0{checksum}\n".encode("utf-8"))
+    # user_version is a signed 32-bit integer; 0 means "never set"
+    return (int.from_bytes(h.digest()[:4], "big") & 0x7FFFFFFF) or 1
+
+
+def _scan(migrations_dir: Path) -> List[Tuple[Path, str]]:
+    entries = [(p, _checksum(p)) for p in _list_migration_files(migrations_dir)]
+    with _fingerprints_lock:
+        _fingerprints[str(migrations_dir.resolve())] = _fingerprint([(p.name, c) for p, c in entries])
+    return entries
+
+
+def migrations_fingerprint(migrations_dir: str) -> int:
+    """Fingerprint of the migration set in migrations_dir; the directory is only read once per process."""
+    key = str(Path(migrations_dir).resolve())
+    with _fingerprints_lock:
+        fp = _fingerprints.get(key)
+    if fp is None:
+        _scan(Path(migrations_dir))
+        with _fingerprints_lock:
+            fp = _fingerprints[key]
+    return fp
+
+
+def schema_is_current(conn: sqlite3.Connection, migrations_dir: str) -> bool:
+    """True if the database was fully migrated with exactly this migration set (one PRAGMA read)."""
+    if not Path(migrations_dir).is_dir():
+        return False
+    return conn.execute("PRAGMA user_version").fetchone()[0] == migrations_fingerprint(migrations_dir)
+
+
+def list_migration_names(migrations_dir: str) -> List[str]:
+    """File names of the migrations in migrations_dir (the versions meta_migrations records)."""
+    return [p.name for p in _list_migration_files(Path(migrations_dir))]
 
 
-def _list_sql_files(migrations_dir: Path) -> List[Path]:
+def _list_migration_files(migrations_dir: Path) -> List[Path]:
     if not migrations_dir.exists():
         return []
-    files = [p for p in migrations_dir.iterdir() if p.is_file() and p.suffix.lower() == ".sql"]
+    files = [p for p in migrations_dir.iterdir()
+             if p.is_file() and p.suffix.lower() in (".sql", ".py") and not p.name.startswith("_")]
     # sort by filename so prefixed numbers work (000_, 001_, ...)
     return sorted(files, key=lambda p: p.name)
 
@@ -44,14 +142,23 @@ def _find_fallback_migrations_dir(requested: Path) -> Optional[Path]:
     return None
 
 
-def apply_migrations(db_path: str, migrations_dir: str) -> List[str]:
+def apply_migrations(db_path: str, migrations_dir: str, pre_backup: bool = True,
+                     conn: Optional[sqlite3.Connection] = None,
+                     progress: Optional[MigrationProgress] = None) -> List[str]:
     """
     Apply pending migrations from migrations_dir to the SQLite DB at db_path.
 
-    - migrations_dir: path containing .sql files (named so sorting by filename gives order)
-    - If DB file exists and there are pending migrations, a timestamped backup is made next to the DB:
-        <db_parent>/backups/<dbname>_pre_migration_<YYYYmmddHHMMSS>.db
-    - Records applied migration filenames in the meta_migrations table.
+    - migrations_dir: path containing .sql / .py files (named so sorting by filename gives order)
+    - conn: run on this open connection to db_path instead of opening (and closing) a new one.
+    - progress(version, rows_done, rows_per_sec) is called after every batch of a data migration;
+      a data migration interrupted earlier is resumed from its stored cursor.
+    - If the DB already has migrations applied and there are pending ones, a timestamped backup is made next to the DB:
+        <db_parent>/backups/<dbname>_pre_migration_<YYYYmmddHHMMSSffffff>.db
+      (online backup through the SQLite backup API; only the newest PRE_MIGRATION_BACKUPS_KEEP are kept)
+      pre_backup=False skips it (e.g. for a scratch copy that is about to be swapped in).
+    - Records applied migration filenames and content checksums in the meta_migrations table;
+      raises MigrationChecksumError if an applied migration's file has changed since.
+    - Sets PRAGMA user_version to the migration-set fingerprint once everything is applied.
     - Returns a list of applied migration filenames (empty list if nothing applied).
     """
     db_path = Path(db_path)
@@ -71,10 +178,9 @@ def apply_migrations(db_path: str, migrations_dir: str) -> List[str]:
     # ensure parent dir exists for DB
     db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    should_backup = db_path.exists()
-
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(str(db_path))
     conn.execute("PRAGMA foreign_keys = ON;")
     try:
         # ensure migration table exists
@@ -84,43 +190,160 @@ def apply_migrations(db_path: str, migrations_dir: str) -> List[str]:
                 applied_at TEXT NOT NULL
             );"""
         )
+        columns = {r[1] for r in conn.execute(f"PRAGMA table_info({MIGRATIONS_TABLE})").fetchall()}
+        # progress_key has no declared type: it holds whatever the migration's KEY column holds
+        for column, decl in (("checksum", "TEXT"), ("status", "TEXT"), ("progress_key", ""),
+                             ("rows_done", "INTEGER NOT NULL DEFAULT 0")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {MIGRATIONS_TABLE} ADD COLUMN {column} {decl}")
         conn.commit()
 
-        applied = {row["version"] for row in conn.execute(f"SELECT version FROM {MIGRATIONS_TABLE}").fetchall()}
+        meta = conn.execute(f"SELECT version, checksum, status FROM {MIGRATIONS_TABLE}").fetchall()
+        applied = {r[0]: r[1] for r in meta}
+        done = {r[0] for r in meta if r[2] != STATUS_RUNNING}
 
-        sql_files = _list_sql_files(migrations_dir_path)
-        pending = [p for p in sql_files if p.name not in applied]
+        entries = _scan(migrations_dir_path)
+        for p, checksum in entries:
+            if p.name not in applied:
+                continue
+            if applied[p.name] is None:
+                # applied before checksums were recorded: trust the current file
+                conn.execute(f"UPDATE {MIGRATIONS_TABLE} SET checksum = ? WHERE version = ?", (checksum, p.name))
+            elif applied[p.name] != checksum:
+                raise MigrationChecksumError(
+                    f"migration {p.name} was modified after it was applied to {db_path}; "
+                    f"add a new migration instead of editing an applied one"
+                )
+        conn.commit()
+        # includes data migrations that were interrupted (status running)
+        pending = [(p, checksum) for p, checksum in entries if p.name not in done]
 
         if not pending:
+            _mark_current(conn, entries, done)
             return []
 
-        # backup if needed
-        if should_backup:
+        # backup if needed (a database without any applied migration has nothing to lose)
+        if pre_backup and done:
             backups_dir = db_path.parent / "backups"
             backups_dir.mkdir(parents=True, exist_ok=True)
-            ts = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+            ts = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
             backup_path = backups_dir / f"{db_path.stem}_pre_migration_{ts}.db"
-            shutil.copy2(db_path, backup_path)
+            online_backup(str(db_path), str(backup_path))
+            prune_backups(backups_dir, f"{db_path.stem}_pre_migration_*.db", keep=PRE_MIGRATION_BACKUPS_KEEP)
 
         applied_names = []
-        for p in pending:
-            sql = p.read_text(encoding="utf-8")
-            # use executescript so the .sql can contain multiple statements
-            conn.executescript(sql)
-            conn.execute(
-                f"INSERT INTO {MIGRATIONS_TABLE} (version, applied_at) VALUES (?, ?)",
-                (p.name, datetime.utcnow().isoformat()),
-            )
-            conn.commit()
+        for p, checksum in pending:
+            if p.suffix.lower() == ".py":
+                _run_data_migration(conn, p, checksum, resume=p.name in applied, progress=progress)
+            else:
+                sql = p.read_text(encoding="utf-8")
+                # use executescript so the .sql can contain multiple statements
+                conn.executescript(sql)
+                conn.execute(
+                    f"INSERT INTO {MIGRATIONS_TABLE} (version, applied_at, checksum, status) VALUES (?, ?, ?, ?)",
+                    (p.name, datetime.utcnow().isoformat(), checksum, STATUS_DONE),
+                )
+                conn.commit()
             applied_names.append(p.name)
+            done.add(p.name)
 
+        _mark_current(conn, entries, done)
         return applied_names
     finally:
-        conn.close()
+        if own_conn:
+            conn.close()
+
+
+def _mark_current(conn: sqlite3.Connection, entries: List[Tuple[Path, str]], done: set) -> None:
+    # only a database holding exactly this migration set gets the fingerprint; one with
+    # migrations from a newer build keeps going through the runner
+    if done != {p.name for p, _ in entries}:
+        return
+    conn.execute(f"PRAGMA user_version = {_fingerprint([(p.name, c) for p, c in entries])}")
+    conn.commit()
+
+
+def _load_data_migration(p: Path) -> types.ModuleType:
+    # compiled from source directly: no import machinery, no __pycache__ in the migrations dir
+    module = types.ModuleType(f"migration_{p.stem}")
+    module.__file__ = str(p)
+    exec(compile(p.read_text(encoding="utf-8"), str(p), "exec"), module.__dict__)
+    for attr in ("TABLE", "COLUMNS", "migrate_batch"):
+        if not hasattr(module, attr):
+            raise ValueError(f"data migration {p.name} does not define {attr}")
+    return module
+
+
+def _run_data_migration(conn: sqlite3.Connection, p: Path, checksum: str, resume: bool,
+                        progress: Optional[MigrationProgress] = None) -> int:
+    """
+    Run the data migration in file p batch by batch. Every batch's writes and the new
+    cursor are committed in one transaction, so after a crash the next run continues
+    right after the last committed batch. Returns the rows processed by this run.
+    """
+    m = _load_data_migration(p)
+    key = getattr(m, "KEY", "rowid")
+    batch_size = getattr(m, "BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    where = getattr(m, "WHERE", None)
+    select = f"SELECT {key}, {', '.join(m.COLUMNS)} FROM {m.TABLE}"
+    first_sql = select + (f" WHERE ({where})" if where else "") + f" ORDER BY {key} LIMIT ?"
+    next_sql = select + f" WHERE {key} > ?" + (f" AND ({where})" if where else "") + f" ORDER BY {key} LIMIT ?"
+
+    if resume:
+        cursor, total = conn.execute(
+            f"SELECT progress_key, rows_done FROM {MIGRATIONS_TABLE} WHERE version = ?", (p.name,)
+        ).fetchone()
+        logger.info("resuming data migration %s after %s=%r (%d rows done)", p.name, key, cursor, total)
+    else:
+        cursor, total = None, 0
+        if hasattr(m, "setup"):
+            m.setup(conn)
+        conn.execute(
+            f"INSERT INTO {MIGRATIONS_TABLE} (version, applied_at, checksum, status, rows_done) VALUES (?, ?, ?, ?, 0)",
+            (p.name, datetime.utcnow().isoformat(), checksum, STATUS_RUNNING),
+        )
+        conn.commit()
+
+    started = time.perf_counter()
+    processed = 0
+    while True:
+        if cursor is None:
+            rows = conn.execute(first_sql, (batch_size,)).fetchall()
+        else:
+            rows = conn.execute(next_sql, (cursor, batch_size)).fetchall()
+        if not rows:
+            break
+        try:
+            m.migrate_batch(conn, rows)
+            cursor = rows[-1][0]
+            processed += len(rows)
+            total += len(rows)
+            conn.execute(
+                f"UPDATE {MIGRATIONS_TABLE} SET progress_key = ?, rows_done = ? WHERE version = ?",
+                (cursor, total, p.name),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if progress is not None:
+            elapsed = time.perf_counter() - started
+            progress(p.name, total, processed / elapsed if elapsed > 0 else 0.0)
+        if len(rows) < batch_size:
+            break
+
+    elapsed = time.perf_counter() - started
+    conn.execute(
+        f"UPDATE {MIGRATIONS_TABLE} SET status = ?, applied_at = ? WHERE version = ?",
+        (STATUS_DONE, datetime.utcnow().isoformat(), p.name),
+    )
+    conn.commit()
+    logger.info("data migration %s: %d rows in %.2fs (%.0f rows/s)", p.name, processed, elapsed,
+                processed / elapsed if elapsed > 0 else 0.0)
+    return processed
 
 
 if __name__ == "__main__":
-    import sys
     if len(sys.argv) < 3:
         print("Usage: python src/data/migrations.py <db_path> <migrations_dir>")
         print("Example: python src/data/migrations.py data/app.db src/db/migrations")
@@ -0,0 +1,118 @@
+"""
+Per-statement timing statistics collected by SQLiteDriver when instrumentation is on.
+
+Statements are grouped by their normalized text (literals replaced by ?, whitespace
+collapsed), so "... WHERE id = 'a'" and "... WHERE id = 'b'" share one entry. Each
+entry keeps call count, total/min/max wall time, rows and a fixed-bucket histogram.
+"""
+import json
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
+
+# histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+HISTOGRAM_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    s = _STRING_RE.sub("?", sql)
+    s = _NUMBER_RE.sub("?", s)
+    s = _SPACE_RE.sub(" ", s).strip().rstrip(";").strip()
+    return _IN_LIST_RE.sub("(?, ...)", s)
+
+
+class _StatementStats:
+    __slots__ = ("calls", "total_ms", "min_ms", "max_ms", "rows", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.min_ms = float("inf")
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def add(self, ms: float, rows: Optional[int]) -> None:
+        self.calls += 1
+        self.total_ms += ms
+        self.min_ms = min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+        if rows is not None and rows > 0:
+            self.rows += rows
+        for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b}ms" for b in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "min_ms": round(self.min_ms, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "histogram": {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class QueryStats:
+    """Thread-safe aggregate of statement timings plus a bounded log of slow statements."""
+
+    def __init__(self, slow_query_ms: Optional[float] = None, max_slow_entries: int = 100):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._statements: Dict[str, _StatementStats] = {}
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=max_slow_entries)
+
+    def is_slow(self, ms: float) -> bool:
+        return self.slow_query_ms is not None and ms >= self.slow_query_ms
+
+    def record(self, sql: str, ms: float, rows: Optional[int] = None) -> None:
+        key = normalize_sql(sql)
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is None:
+                entry = self._statements[key] = _StatementStats()
+            entry.add(ms, rows)
+
+    def record_slow(self, sql: str, ms: float, plan: List[str]) -> None:
+        with self._lock:
+            self._slow.append({
+                "sql": normalize_sql(sql),
+                "ms": round(ms, 3),
+                "plan": plan,
+                "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            })
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._slow.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Aggregated stats, statements ordered by total time (largest first)."""
+        with self._lock:
+            statements = [dict(sql=sql, **s.to_dict()) for sql, s in self._statements.items()]
+            slow = list(self._slow)
+        statements.sort(key=lambda s: s["total_ms"], reverse=True)
+        return {"slow_query_ms": self.slow_query_ms, "statements": statements, "slow_queries": slow}
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """snapshot() as JSON; also written to `path` if given."""
+        text = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        if path:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(text)
+        return text
@@ -0,0 +1,91 @@
+"""
+daily_rollup maintenance: rebuild from records and consistency check.
+
+The daily_rollup table (migrations 003/004) is kept current by triggers on records;
+these helpers exist for databases whose rollup is missing or suspected stale.
+
+Run: python src/data/rollup.py <db_path> [rebuild|check]
+"""
+import sqlite3
+from typing import Dict, List
+
+ROLLUP_TABLE = "daily_rollup"
+
+# same cents expression as the triggers: rows not backfilled yet use the rounded REAL amount
+_BASE_GROUPS_SQL = (
+    "SELECT substr(date, 1, 10) AS day, type, COALESCE(category_id, '') AS category_id, "
+    "SUM(COALESCE(amount_cents, CAST(ROUND(amount * 100) AS INTEGER))) AS total_cents, COUNT(*) AS count "
+    "FROM records GROUP BY substr(date, 1, 10), type, COALESCE(category_id, '')"
+)
+
+
+def rebuild_daily_rollup(conn: sqlite3.Connection) -> int:
+    """
+    Recompute daily_rollup from records in one transaction.
+    Returns the number of rollup rows written.
+    """
+    try:
+        conn.execute("SAVEPOINT rollup_rebuild")
+        conn.execute(f"DELETE FROM {ROLLUP_TABLE}")
+        cur = conn.execute(
+            f"INSERT INTO {ROLLUP_TABLE} (day, type, category_id, total_cents, count) "
+            f"SELECT day, type, category_id, total_cents, count FROM ({_BASE_GROUPS_SQL})"
+        )
+        n = cur.rowcount
+        conn.execute("RELEASE rollup_rebuild")
+        conn.commit()
+        return n
+    except sqlite3.DatabaseError:
+        conn.rollback()
+        raise
+
+
+def check_daily_rollup(conn: sqlite3.Connection) -> List[Dict]:
+    """
+    Compare daily_rollup against a fresh aggregation of records (exact: totals are cents).
+    Returns one dict per mismatching (day, type, category_id); empty list means consistent.
+    A missing side is reported with total 0 and count 0.
+    """
+    expected = {(r[0], r[1], r[2]): (r[3], r[4]) for r in conn.execute(_BASE_GROUPS_SQL)}
+    actual = {
+        (r[0], r[1], r[2]): (r[3], r[4])
+        for r in conn.execute(f"SELECT day, type, category_id, total_cents, count FROM {ROLLUP_TABLE}")
+    }
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        exp_total, exp_count = expected.get(key, (0, 0))
+        act_total, act_count = actual.get(key, (0, 0))
+        if exp_count != act_count or exp_total != act_total:
+            mismatches.append({
+                "day": key[0],
+                "type": key[1],
+                "category_id": key[2] or None,
+                "expected_total": exp_total / 100,
+                "expected_count": exp_count,
+                "total": act_total / 100,
+                "count": act_count,
+            })
+    return mismatches
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python src/data/rollup.py <db_path> [rebuild|check]")
+        sys.exit(1)
+    action = sys.argv[2] if len(sys.argv) > 2 else "check"
+    conn = sqlite3.connect(sys.argv[1])
+    try:
+        if action == "rebuild":
+            print(f"Rebuilt {ROLLUP_TABLE}: {rebuild_daily_rollup(conn)} rows")
+        else:
+            problems = check_daily_rollup(conn)
+            if not problems:
+                print(f"{ROLLUP_TABLE} is consistent with records.")
+            else:
+                print(f"{len(problems)} mismatching {ROLLUP_TABLE} rows:")
+                for p in problems:
+                    print(" -", p)
+                sys.exit(2)
+    finally:
+        conn.close()
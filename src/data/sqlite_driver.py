@@ -1,49 +1,245 @@
 """
 Lightweight sqlite wrapper with basic transaction helpers.
+
+By default a single connection serves reads and writes. With concurrent=True the
+database is switched to WAL journal mode and reads go through a bounded pool of
+read-only connections, so long reads (statistics, exports) don't block the
+writer and can run from worker threads in parallel with it.
+
+With instrument=True (or a slow_query_ms threshold) every statement that goes through
+the driver is timed into a QueryStats (see data/query_stats.py); statements slower than
+the threshold are logged as warnings on the "data.sqlite_driver" logger together with
+their EXPLAIN QUERY PLAN output.
 """
+import logging
+import queue
 import sqlite3
-from typing import Any, List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
 from pathlib import Path
 
+from data.query_stats import QueryStats
+
+logger = logging.getLogger(__name__)
+
+# statements EXPLAIN QUERY PLAN can describe
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
 
 class SQLiteDriver:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, concurrent: bool = False, busy_timeout_ms: int = 5000, read_pool_size: int = 4,
+                 instrument: bool = False, slow_query_ms: Optional[float] = None):
         self.db_path = str(db_path)
         self.conn: Optional[sqlite3.Connection] = None
+        self.concurrent = concurrent
+        self.busy_timeout_ms = busy_timeout_ms
+        self.read_pool_size = read_pool_size
+        if concurrent and (self.db_path == ":memory:" or self.db_path.startswith("file:")):
+            raise ValueError("concurrent mode needs a plain database file path")
+        if read_pool_size < 1:
+            raise ValueError("read_pool_size must be >= 1")
+        # serializes transactions on the single writer connection across threads
+        self.write_lock = threading.RLock()
+        self._idle_readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all_readers: List[sqlite3.Connection] = []
+        self._reader_slots = threading.BoundedSemaphore(read_pool_size)
+        self._pool_lock = threading.Lock()
+        self.stats: Optional[QueryStats] = None
+        if instrument or slow_query_ms is not None:
+            self.enable_instrumentation(slow_query_ms)
 
     def connect(self):
         if self.conn:
             return
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+        self.conn = sqlite3.connect(
+            self.db_path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+        )
         self.conn.row_factory = sqlite3.Row
         # enable foreign keys
         self.conn.execute("PRAGMA foreign_keys = ON;")
+        self.conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)};")
+        if self.concurrent:
+            self.conn.execute("PRAGMA journal_mode = WAL;")
+            # WAL is durable at commit boundaries with NORMAL; FULL would fsync every commit
+            self.conn.execute("PRAGMA synchronous = NORMAL;")
 
     def close(self):
+        with self._pool_lock:
+            for c in self._all_readers:
+                c.close()
+            self._all_readers.clear()
+            self._idle_readers = queue.LifoQueue()
         if self.conn:
             self.conn.close()
             self.conn = None
 
+    def _open_reader(self) -> sqlite3.Connection:
+        uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        c = sqlite3.connect(
+            uri,
+            uri=True,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+        )
+        c.row_factory = sqlite3.Row
+        c.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)};")
+        return c
+
+    def open_reader_connection(self) -> sqlite3.Connection:
+        """A new read-only connection outside the pool (plain file path only); the caller closes it."""
+        return self._open_reader()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Check out a connection for reading. In concurrent mode this is one of at most
+        read_pool_size read-only connections (blocks while all are in use); otherwise
+        it is the shared connection.
+        """
+        if not self.conn:
+            raise RuntimeError("DB not connected")
+        if not self.concurrent:
+            yield self.conn
+            return
+        self._reader_slots.acquire()
+        try:
+            try:
+                c = self._idle_readers.get_nowait()
+            except queue.Empty:
+                c = self._open_reader()
+                with self._pool_lock:
+                    self._all_readers.append(c)
+            try:
+                yield c
+            finally:
+                if c.in_transaction:
+                    c.rollback()
+                self._idle_readers.put(c)
+        finally:
+            self._reader_slots.release()
+
+    # ---------------- instrumentation ----------------
+    def enable_instrumentation(self, slow_query_ms: Optional[float] = None) -> QueryStats:
+        """Start timing statements (keeps existing stats if already on, updating the threshold)."""
+        if self.stats is None:
+            self.stats = QueryStats(slow_query_ms=slow_query_ms)
+        else:
+            self.stats.slow_query_ms = slow_query_ms
+        return self.stats
+
+    def disable_instrumentation(self) -> None:
+        self.stats = None
+
+    def dump_stats(self, path: Optional[str] = None) -> Optional[str]:
+        """Aggregated statement stats as JSON (None when instrumentation is off)."""
+        return self.stats.dump(path) if self.stats is not None else None
+
+    def _timed(self, conn: sqlite3.Connection, sql: str, plan_params: Any, run: Callable[[], Any],
+               count_rows: Callable[[Any], Optional[int]]):
+        stats = self.stats
+        if stats is None:
+            return run()
+        t0 = time.perf_counter()
+        result = run()
+        ms = (time.perf_counter() - t0) * 1000.0
+        stats.record(sql, ms, count_rows(result))
+        if stats.is_slow(ms):
+            plan = self._explain(conn, sql, plan_params)
+            stats.record_slow(sql, ms, plan)
+            logger.warning("slow query (%.1f ms): %s\n%s", ms, " ".join(sql.split()),
+                           "\n".join(plan) or "(no query plan)")
+        return result
+
+    @staticmethod
+    def _explain(conn: sqlite3.Connection, sql: str, params: Any) -> List[str]:
+        words = sql.lstrip().split(None, 1)
+        if not words or words[0].upper() not in _EXPLAINABLE or params is None:
+            return []
+        try:
+            rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        except sqlite3.Error as e:
+            return [f"(EXPLAIN QUERY PLAN failed: {e})"]
+        # rows are (id, parent, notused, detail); indent children under their parent
+        depth = {0: -1}
+        lines = []
+        for r in rows:
+            d = depth.get(r[1], -1) + 1
+            depth[r[0]] = d
+            lines.append("  " * d + str(r[3]))
+        return lines
+
+    @staticmethod
+    def _rowcount(cur: sqlite3.Cursor) -> Optional[int]:
+        return cur.rowcount if cur.rowcount >= 0 else None
+
+    @contextmanager
+    def exclusive(self, timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold the write lock and every read-pool slot, so no statement runs on this
+        driver's connections until the block exits (e.g. to close and swap the file).
+        Raises TimeoutError if they aren't all free within `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def remaining() -> float:
+            return -1 if deadline is None else max(0.0, deadline - time.monotonic())
+
+        if not self.write_lock.acquire(timeout=remaining()):
+            raise TimeoutError("a write is still in progress")
+        taken = 0
+        try:
+            if self.concurrent:
+                for _ in range(self.read_pool_size):
+                    wait = remaining()
+                    if not self._reader_slots.acquire(timeout=None if wait == -1 else wait):
+                        raise TimeoutError("read connections are still in use")
+                    taken += 1
+            yield
+        finally:
+            for _ in range(taken):
+                self._reader_slots.release()
+            self.write_lock.release()
+
+    def query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """Run a read statement and return all rows (through the read pool in concurrent mode)."""
+        with self.reader() as c:
+            return self._timed(c, sql, params, lambda: c.execute(sql, params).fetchall(), len)
+
+    def execute_on(self, conn: sqlite3.Connection, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Execute on a connection checked out with reader() (timed like every other statement)."""
+        return self._timed(conn, sql, params, lambda: conn.execute(sql, params), self._rowcount)
+
     def execute(self, sql: str, params: tuple = ()):
         if not self.conn:
             raise RuntimeError("DB not connected")
         cur = self.conn.cursor()
-        cur.execute(sql, params)
+        self._timed(self.conn, sql, params, lambda: cur.execute(sql, params), self._rowcount)
         return cur
 
     def executemany(self, sql: str, seq_of_params: List[tuple]):
         if not self.conn:
             raise RuntimeError("DB not connected")
         cur = self.conn.cursor()
-        cur.executemany(sql, seq_of_params)
+        if self.stats is None:
+            cur.executemany(sql, seq_of_params)
+            return cur
+        seq_of_params = list(seq_of_params)
+        self._timed(self.conn, sql, seq_of_params[0] if seq_of_params else None,
+                    lambda: cur.executemany(sql, seq_of_params), self._rowcount)
         return cur
 
     def executescript(self, sql_script: str):
         if not self.conn:
             raise RuntimeError("DB not connected")
         cur = self.conn.cursor()
-        cur.executescript(sql_script)
+        self._timed(self.conn, sql_script, None, lambda: cur.executescript(sql_script), lambda _: None)
         return cur
 
     def commit(self):
@@ -52,4 +248,4 @@ class SQLiteDriver:
 
     def rollback(self):
         if self.conn:
-            self.conn.rollback()
\ No newline at end of file
+            self.conn.rollback()
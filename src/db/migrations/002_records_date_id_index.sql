@@ -0,0 +1,5 @@
+-- migration 002_records_date_id_index.sql
+-- Widen idx_records_date to (date, id) so keyset pagination on (date, id)
+-- can seek directly to the continuation point in both directions.
+DROP INDEX IF EXISTS idx_records_date;
+CREATE INDEX IF NOT EXISTS idx_records_date ON records(date, id);
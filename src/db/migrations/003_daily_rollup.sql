@@ -0,0 +1,44 @@
+-- migration 003_daily_rollup.sql
+-- Per-day summary of records, kept current by triggers on records.
+-- category_id uses '' for uncategorized rows so it can be part of the primary key.
+CREATE TABLE IF NOT EXISTS daily_rollup (
+  day TEXT NOT NULL,          -- substr(records.date, 1, 10)
+  type TEXT NOT NULL,
+  category_id TEXT NOT NULL DEFAULT '',
+  total REAL NOT NULL DEFAULT 0,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, type, category_id)
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_records_rollup_insert AFTER INSERT ON records
+BEGIN
+  INSERT INTO daily_rollup (day, type, category_id, total, count)
+  VALUES (substr(NEW.date, 1, 10), NEW.type, COALESCE(NEW.category_id, ''), NEW.amount, 1)
+  ON CONFLICT (day, type, category_id) DO UPDATE SET total = total + excluded.total, count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_records_rollup_delete AFTER DELETE ON records
+BEGIN
+  UPDATE daily_rollup SET total = total - OLD.amount, count = count - 1
+  WHERE day = substr(OLD.date, 1, 10) AND type = OLD.type AND category_id = COALESCE(OLD.category_id, '');
+  DELETE FROM daily_rollup
+  WHERE day = substr(OLD.date, 1, 10) AND type = OLD.type AND category_id = COALESCE(OLD.category_id, '') AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_records_rollup_update AFTER UPDATE OF type, amount, date, category_id ON records
+BEGIN
+  UPDATE daily_rollup SET total = total - OLD.amount, count = count - 1
+  WHERE day = substr(OLD.date, 1, 10) AND type = OLD.type AND category_id = COALESCE(OLD.category_id, '');
+  DELETE FROM daily_rollup
+  WHERE day = substr(OLD.date, 1, 10) AND type = OLD.type AND category_id = COALESCE(OLD.category_id, '') AND count <= 0;
+  INSERT INTO daily_rollup (day, type, category_id, total, count)
+  VALUES (substr(NEW.date, 1, 10), NEW.type, COALESCE(NEW.category_id, ''), NEW.amount, 1)
+  ON CONFLICT (day, type, category_id) DO UPDATE SET total = total + excluded.total, count = count + 1;
+END;
+
+-- backfill for databases that already have records
+DELETE FROM daily_rollup;
+INSERT INTO daily_rollup (day, type, category_id, total, count)
+SELECT substr(date, 1, 10), type, COALESCE(category_id, ''), SUM(amount), COUNT(*)
+FROM records
+GROUP BY substr(date, 1, 10), type, COALESCE(category_id, '');
@@ -0,0 +1,60 @@
+-- migration 004_amount_cents.sql
+-- Exact amounts: records.amount_cents holds the amount in integer cents next to the
+-- legacy REAL column, and daily_rollup sums cents instead of floats.
+-- Existing records are backfilled in chunks by data.migrations.backfill_amount_cents
+-- right after this script; the partial index below finds the rows still missing cents.
+ALTER TABLE records ADD COLUMN amount_cents INTEGER;
+
+CREATE INDEX IF NOT EXISTS idx_records_amount_cents_pending ON records(id) WHERE amount_cents IS NULL;
+
+DROP TRIGGER IF EXISTS trg_records_rollup_insert;
+DROP TRIGGER IF EXISTS trg_records_rollup_delete;
+DROP TRIGGER IF EXISTS trg_records_rollup_update;
+DROP TABLE IF EXISTS daily_rollup;
+
+CREATE TABLE daily_rollup (
+  day TEXT NOT NULL,          -- substr(records.date, 1, 10)
+  type TEXT NOT NULL,
+  category_id TEXT NOT NULL DEFAULT '',
+  total_cents INTEGER NOT NULL DEFAULT 0,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, type, category_id)
+);
+
+-- rows not backfilled yet fall back to the rounded REAL amount; the backfill's
+-- UPDATE OF amount_cents then moves the rollup to the exact value
+CREATE TRIGGER trg_records_rollup_insert AFTER INSERT ON records
+BEGIN
+  INSERT INTO daily_rollup (day, type, category_id, total_cents, count)
+  VALUES (substr(NEW.date, 1, 10), NEW.type, COALESCE(NEW.category_id, ''),
+          COALESCE(NEW.amount_cents, CAST(ROUND(NEW.amount * 100) AS INTEGER)), 1)
+  ON CONFLICT (day, type, category_id) DO UPDATE SET total_cents = total_cents + excluded.total_cents, count = count + 1;
+END;
+
+CREATE TRIGGER trg_records_rollup_delete AFTER DELETE ON records
+BEGIN
+  UPDATE daily_rollup
+  SET total_cents = total_cents - COALESCE(OLD.amount_cents, CAST(ROUND(OLD.amount * 100) AS INTEGER)), count = count - 1
+  WHERE day = substr(OLD.date, 1, 10) AND type = OLD.type AND category_id = COALESCE(OLD.category_id, '');
+  DELETE FROM daily_rollup
+  WHERE day = substr(OLD.date, 1, 10) AND type = OLD.type AND category_id = COALESCE(OLD.category_id, '') AND count <= 0;
+END;
+
+CREATE TRIGGER trg_records_rollup_update AFTER UPDATE OF type, amount, amount_cents, date, category_id ON records
+BEGIN
+  UPDATE daily_rollup
+  SET total_cents = total_cents - COALESCE(OLD.amount_cents, CAST(ROUND(OLD.amount * 100) AS INTEGER)), count = count - 1
+  WHERE day = substr(OLD.date, 1, 10) AND type = OLD.type AND category_id = COALESCE(OLD.category_id, '');
+  DELETE FROM daily_rollup
+  WHERE day = substr(OLD.date, 1, 10) AND type = OLD.type AND category_id = COALESCE(OLD.category_id, '') AND count <= 0;
+  INSERT INTO daily_rollup (day, type, category_id, total_cents, count)
+  VALUES (substr(NEW.date, 1, 10), NEW.type, COALESCE(NEW.category_id, ''),
+          COALESCE(NEW.amount_cents, CAST(ROUND(NEW.amount * 100) AS INTEGER)), 1)
+  ON CONFLICT (day, type, category_id) DO UPDATE SET total_cents = total_cents + excluded.total_cents, count = count + 1;
+END;
+
+INSERT INTO daily_rollup (day, type, category_id, total_cents, count)
+SELECT substr(date, 1, 10), type, COALESCE(category_id, ''),
+       SUM(COALESCE(amount_cents, CAST(ROUND(amount * 100) AS INTEGER))), COUNT(*)
+FROM records
+GROUP BY substr(date, 1, 10), type, COALESCE(category_id, '');
@@ -0,0 +1,30 @@
+"""
+migration 005_backfill_amount_cents.py
+Fill records.amount_cents (added by 004) for rows written before it, in batches.
+Walks the rows still missing cents by id through idx_records_amount_cents_pending and
+converts with utils.money.to_cents, the same rounding new writes use; the rollup
+triggers move daily_rollup to the exact values as rows are updated.
+"""
+import logging
+
+from utils.money import to_cents
+
+TABLE = "records"
+KEY = "id"
+COLUMNS = ("amount",)
+WHERE = "amount_cents IS NULL"
+BATCH_SIZE = 5000
+
+logger = logging.getLogger("data.migrations")
+
+
+def migrate_batch(conn, rows):
+    params = []
+    for id_, amount in rows:
+        try:
+            cents = to_cents(amount)
+        except (TypeError, ValueError):
+            logger.warning("records %s: amount %r is not a finite number, stored as 0 cents", id_, amount)
+            cents = 0
+        params.append((cents, id_))
+    conn.executemany("UPDATE records SET amount_cents = ? WHERE id = ?", params)
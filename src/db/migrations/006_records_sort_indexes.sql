@@ -0,0 +1,5 @@
+-- migration 006_records_sort_indexes.sql
+-- Indexes for the other keyset sort keys of DataManager.query_records_page
+-- (type / amount, id breaks ties), so those pages seek instead of sorting the table.
+CREATE INDEX IF NOT EXISTS idx_records_type_id ON records(type, id);
+CREATE INDEX IF NOT EXISTS idx_records_amount_id ON records(amount, id);
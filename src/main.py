@@ -16,7 +16,8 @@ def main():
     try:
         app.exec()
     finally:
-        # close DB connection gracefully
+        # write out any queued (write-behind) records, then close DB connection gracefully
+        container["coordinator"].close()
         container["data_manager"].close()
 
 if __name__ == "__main__":
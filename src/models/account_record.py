@@ -1,6 +1,22 @@
 from dataclasses import dataclass
 from typing import Optional
 
+from utils.money import to_cents
+
+
+def _validate_fields(type_: str, amount, date: str) -> bool:
+    if type_ not in ("INCOME", "EXPENDITURE"):
+        return False
+    try:
+        if to_cents(amount) <= 0:
+            return False
+    except Exception:
+        return False
+    if not isinstance(date, str) or not date:
+        return False
+    return True
+
+
 @dataclass
 class AccountRecord:
     id: str
@@ -11,16 +27,58 @@ class AccountRecord:
     remark: Optional[str] = None
     created_at: Optional[str] = None
 
+    @property
+    def amount_cents(self) -> int:
+        """Exact amount in integer cents (what the database stores and sums)."""
+        return to_cents(self.amount)
+
     def validate(self) -> bool:
-        """Basic validation: type and amount"""
-        if self.type not in ("INCOME", "EXPENDITURE"):
-            return False
-        try:
-            a = float(self.amount)
-            if a <= 0:
-                return False
-        except Exception:
-            return False
-        if not isinstance(self.date, str) or not self.date:
-            return False
-        return True
\ No newline at end of file
+        """Basic validation: type and amount (finite, at least one cent)"""
+        return _validate_fields(self.type, self.amount, self.date)
+
+class CompactRecord:
+    """
+    AccountRecord with __slots__ instead of a per-instance __dict__, for code that holds
+    many records at once. Same fields, amount_cents and validate(); convert with
+    to_record() / from_record() where an AccountRecord is expected.
+    (Hand-written because dataclass(slots=True) needs Python 3.10.)
+    """
+    __slots__ = ("id", "type", "amount", "date", "category_id", "remark", "created_at")
+
+    def __init__(self, id: str, type: str, amount: float, date: str, category_id: Optional[str] = None,
+                 remark: Optional[str] = None, created_at: Optional[str] = None):
+        self.id = id
+        self.type = type
+        self.amount = amount
+        self.date = date
+        self.category_id = category_id
+        self.remark = remark
+        self.created_at = created_at
+
+    @property
+    def amount_cents(self) -> int:
+        return to_cents(self.amount)
+
+    def validate(self) -> bool:
+        return _validate_fields(self.type, self.amount, self.date)
+
+    def _fields(self) -> tuple:
+        return (self.id, self.type, self.amount, self.date, self.category_id, self.remark, self.created_at)
+
+    def to_record(self) -> AccountRecord:
+        return AccountRecord(*self._fields())
+
+    @classmethod
+    def from_record(cls, rec: AccountRecord) -> "CompactRecord":
+        return cls(rec.id, rec.type, rec.amount, rec.date, rec.category_id, rec.remark, rec.created_at)
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None  # mutable, like the dataclass
+
+    def __repr__(self) -> str:
+        return ("CompactRecord(id={!r}, type={!r}, amount={!r}, date={!r}, category_id={!r}, remark={!r}, "
+                "created_at={!r})".format(*self._fields()))
@@ -0,0 +1,164 @@
+"""
+RecordBatch: columnar block of records.
+
+Columns are parallel sequences (ids, types, amount_cents, dates, category_ids, remarks,
+created_at). Amounts are exact integer cents in an array('q') (8 bytes per row, no
+float objects); types and category ids are interned so every row shares the same few
+string objects. Rows are only materialized on demand: batch[i] is a two-slot RecordRow
+view that reads through to the columns, and aggregations run over the columns directly.
+"""
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from models.account_record import AccountRecord
+from utils.money import from_cents, to_cents
+
+# group keys understood by RecordBatch.sum_cents_by; date buckets are ISO prefixes
+_DATE_PREFIX = {"day": 10, "month": 7, "year": 4}
+
+
+def _intern(s: Optional[str]) -> Optional[str]:
+    return sys.intern(s) if s is not None else None
+
+
+class RecordRow:
+    """Lazy view of one row of a RecordBatch; nothing is copied until to_record()."""
+    __slots__ = ("_batch", "_i")
+
+    def __init__(self, batch: "RecordBatch", i: int):
+        self._batch = batch
+        self._i = i
+
+    @property
+    def id(self) -> str:
+        return self._batch.ids[self._i]
+
+    @property
+    def type(self) -> str:
+        return self._batch.types[self._i]
+
+    @property
+    def amount_cents(self) -> int:
+        return self._batch.amount_cents[self._i]
+
+    @property
+    def amount(self) -> float:
+        return from_cents(self._batch.amount_cents[self._i])
+
+    @property
+    def date(self) -> str:
+        return self._batch.dates[self._i]
+
+    @property
+    def category_id(self) -> Optional[str]:
+        return self._batch.category_ids[self._i]
+
+    @property
+    def remark(self) -> Optional[str]:
+        return self._batch.remarks[self._i]
+
+    @property
+    def created_at(self) -> Optional[str]:
+        return self._batch.created_at[self._i]
+
+    def to_record(self) -> AccountRecord:
+        return self._batch.record_at(self._i)
+
+    def __repr__(self) -> str:
+        return f"RecordRow({self._i} of {len(self._batch)}: id={self.id!r})"
+
+
+class RecordBatch:
+    __slots__ = ("ids", "types", "amount_cents", "dates", "category_ids", "remarks", "created_at")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.types: List[str] = []
+        self.amount_cents = array("q")
+        self.dates: List[str] = []
+        self.category_ids: List[Optional[str]] = []
+        self.remarks: List[Optional[str]] = []
+        self.created_at: List[Optional[str]] = []
+
+    def append(self, id: str, type: str, amount_cents: int, date: str, category_id: Optional[str] = None,
+               remark: Optional[str] = None, created_at: Optional[str] = None) -> None:
+        self.ids.append(id)
+        self.types.append(sys.intern(type))
+        self.amount_cents.append(amount_cents)
+        self.dates.append(date)
+        self.category_ids.append(_intern(category_id))
+        self.remarks.append(remark)
+        self.created_at.append(created_at)
+
+    @classmethod
+    def from_records(cls, records: Iterable) -> "RecordBatch":
+        """Build from AccountRecord-like objects (anything with the record attributes)."""
+        batch = cls()
+        for r in records:
+            batch.append(r.id, r.type, to_cents(r.amount), r.date, r.category_id, r.remark, r.created_at)
+        return batch
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "RecordBatch":
+        """
+        Build from DB rows laid out as (id, type, amount, amount_cents, date, category_id,
+        remark, created_at), i.e. DataManager's record SELECT; read by position.
+        """
+        batch = cls()
+        intern = sys.intern
+        ids, types, cents, dates = batch.ids, batch.types, batch.amount_cents, batch.dates
+        cats, remarks, created = batch.category_ids, batch.remarks, batch.created_at
+        for r in rows:
+            ids.append(r[0])
+            types.append(intern(r[1]))
+            cents.append(r[3] if r[3] is not None else to_cents(r[2]))
+            dates.append(r[4])
+            cats.append(intern(r[5]) if r[5] is not None else None)
+            remarks.append(r[6])
+            created.append(r[7])
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> RecordRow:
+        n = len(self.ids)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("RecordBatch index out of range")
+        return RecordRow(self, i)
+
+    def __iter__(self) -> Iterator[RecordRow]:
+        for i in range(len(self.ids)):
+            yield RecordRow(self, i)
+
+    def record_at(self, i: int) -> AccountRecord:
+        return AccountRecord(self.ids[i], self.types[i], from_cents(self.amount_cents[i]), self.dates[i],
+                             self.category_ids[i], self.remarks[i], self.created_at[i])
+
+    def to_records(self) -> List[AccountRecord]:
+        return [self.record_at(i) for i in range(len(self.ids))]
+
+    def total_cents(self) -> int:
+        return sum(self.amount_cents)
+
+    def sum_cents_by(self, group_by: str) -> Dict[Optional[str], int]:
+        """
+        Column-wise SUM(amount_cents) grouped by "type", "category_id", or a date bucket
+        "day" / "month" / "year" -- the same keys as DataManager.aggregate_amounts.
+        """
+        if group_by == "type":
+            keys: Iterable = self.types
+        elif group_by == "category_id":
+            keys = self.category_ids
+        elif group_by in _DATE_PREFIX:
+            n = _DATE_PREFIX[group_by]
+            keys = (d[:n] for d in self.dates)
+        else:
+            raise ValueError(f"unsupported group_by: {group_by}")
+        totals: Dict[Optional[str], int] = {}
+        for k, c in zip(keys, self.amount_cents):
+            totals[k] = totals.get(k, 0) + c
+        return totals
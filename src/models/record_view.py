@@ -0,0 +1,23 @@
+from typing import NamedTuple, Optional
+
+from models.account_record import AccountRecord
+
+
+class RecordView(NamedTuple):
+    """
+    Read-only, display-ready record row: the record plus its category's name and type
+    (None for uncategorized records or dangling category ids).
+    A NamedTuple so list screens and exports don't pay for a per-row __dict__.
+    """
+    id: str
+    type: str
+    amount: float
+    date: str
+    category_id: Optional[str]
+    category_name: Optional[str]
+    category_type: Optional[str]
+    remark: Optional[str]
+    created_at: Optional[str]
+
+    def to_record(self) -> AccountRecord:
+        return AccountRecord(self.id, self.type, self.amount, self.date, self.category_id, self.remark, self.created_at)
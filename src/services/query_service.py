@@ -1,16 +1,41 @@
-from typing import List, Optional
+import copy
+from typing import List, Optional, Tuple
 from models.account_record import AccountRecord
-from data.data_manager import DataManager
+from data.data_manager import DataManager, PageToken
+from utils.result_cache import ResultCache
 
 class QueryService:
-    def __init__(self, data_manager: DataManager):
+    def __init__(self, data_manager: DataManager, cache: Optional[ResultCache] = None):
         self.dm = data_manager
+        # results are cached per (method, args, DataManager.current_generation()); ResultCache(0) disables it
+        self.cache = cache if cache is not None else ResultCache()
+
+    def _cached(self, method: str, args: tuple, compute):
+        key = ("QueryService." + method, args, self.dm.current_generation())
+        return self.cache.get_or_compute(key, compute)
+
+    @staticmethod
+    def _copy_records(records: List[AccountRecord]) -> List[AccountRecord]:
+        # records are mutable; never hand out the cached instances
+        return [copy.copy(r) for r in records]
 
     def query_by_date(self, start_iso: str, end_iso: str) -> List[AccountRecord]:
-        return self.dm.query_records(start=start_iso, end=end_iso)
+        return self._copy_records(self._cached("query_by_date", (start_iso, end_iso),
+                                               lambda: self.dm.query_records(start=start_iso, end=end_iso)))
 
     def query_by_category(self, category_id: str) -> List[AccountRecord]:
-        return self.dm.query_records(category_id=category_id)
+        return self._copy_records(self._cached("query_by_category", (category_id,),
+                                               lambda: self.dm.query_records(category_id=category_id)))
+
+    def query_page(self, start_iso: Optional[str] = None, end_iso: Optional[str] = None,
+                   category_id: Optional[str] = None, limit: int = 100, after: Optional[PageToken] = None,
+                   descending: bool = True, sort_key: str = "date") -> Tuple[List[AccountRecord], Optional[PageToken]]:
+        """Keyset-paginated query; returns (records, next_token)."""
+        records, token = self._cached(
+            "query_page", (start_iso, end_iso, category_id, limit, after, descending, sort_key),
+            lambda: self.dm.query_records_page(start=start_iso, end=end_iso, category_id=category_id,
+                                               limit=limit, after=after, descending=descending, sort_key=sort_key))
+        return self._copy_records(records), token
 
     def sort_records(self, records: List[AccountRecord], descending: bool = True) -> List[AccountRecord]:
-        return sorted(records, key=lambda r: r.date, reverse=descending)
\ No newline at end of file
+        return sorted(records, key=lambda r: r.date, reverse=descending)
@@ -1,40 +1,43 @@
-from typing import Dict, List
+from typing import Dict, Optional
 from data.data_manager import DataManager
-from models.account_record import AccountRecord
-from collections import defaultdict
-from datetime import datetime
+from utils.result_cache import ResultCache
 
 class StatisticsService:
-    def __init__(self, data_manager: DataManager):
+    """
+    Aggregations are pushed down to SQLite (GROUP BY), so each statistic is a single
+    query over the whole ledger (or the given date range / category) that returns a
+    handful of rows, instead of summing materialized records in Python.
+
+    Results are cached per (method, args, DataManager.current_generation()); pass `cache`
+    to share or size the cache (ResultCache(0) disables it).
+    """
+    def __init__(self, data_manager: DataManager, cache: Optional[ResultCache] = None):
         self.dm = data_manager
+        self.cache = cache if cache is not None else ResultCache()
+
+    def _cached(self, method: str, args: tuple, compute):
+        key = ("StatisticsService." + method, args, self.dm.current_generation())
+        # hand out copies so callers can't modify a cached result
+        return dict(self.cache.get_or_compute(key, compute))
 
-    def total_by_type(self) -> Dict[str, float]:
-        # 简单实现：从 DB 读取并汇总
-        rows = self.dm.query_records()
-        totals = {"INCOME": 0.0, "EXPENDITURE": 0.0}
-        for r in rows:
-            totals.setdefault(r.type, 0.0)
-            totals[r.type] += float(r.amount)
-        return totals
+    def total_by_type(self, start: Optional[str] = None, end: Optional[str] = None,
+                      category_id: Optional[str] = None) -> Dict[str, float]:
+        def compute():
+            totals = {"INCOME": 0.0, "EXPENDITURE": 0.0}
+            for k, total in self.dm.aggregate_amounts("type", start=start, end=end, category_id=category_id):
+                totals[k] = total
+            return totals
+        return self._cached("total_by_type", (start, end, category_id), compute)
 
-    def by_category(self) -> Dict[str, float]:
-        rows = self.dm.query_records()
-        agg = defaultdict(float)
-        for r in rows:
-            agg[r.category_id] += float(r.amount)
-        return dict(agg)
+    def by_category(self, start: Optional[str] = None, end: Optional[str] = None,
+                    category_id: Optional[str] = None) -> Dict[Optional[str], float]:
+        return self._cached("by_category", (start, end, category_id),
+                            lambda: dict(self.dm.aggregate_amounts("category_id", start=start, end=end, category_id=category_id)))
 
-    def timeseries(self, period: str = "day") -> Dict[str, float]:
-        # 返回按 day/month/year 聚合的数据，简单示例
-        rows = self.dm.query_records()
-        agg = defaultdict(float)
-        for r in rows:
-            dt = datetime.fromisoformat(r.date)
-            if period == "day":
-                key = dt.strftime("%Y-%m-%d")
-            elif period == "month":
-                key = dt.strftime("%Y-%m")
-            else:
-                key = dt.strftime("%Y")
-            agg[key] += float(r.amount)
-        return dict(agg)
\ No newline at end of file
+    def timeseries(self, period: str = "day", start: Optional[str] = None, end: Optional[str] = None,
+                   category_id: Optional[str] = None) -> Dict[str, float]:
+        # 返回按 day/month/year 聚合的数据；未知 period 按 year 处理
+        if period not in ("day", "month"):
+            period = "year"
+        return self._cached("timeseries", (period, start, end, category_id),
+                            lambda: dict(self.dm.aggregate_amounts(period, start=start, end=end, category_id=category_id)))
@@ -0,0 +1,99 @@
+"""
+AsyncRunner: run Coordinator calls on a QThreadPool and deliver results on the GUI thread.
+
+Every request is submitted under a key (e.g. "records", "stats"). A newer request with
+the same key supersedes the older one: if the older one hasn't started it is taken off
+the pool, and if it is already running its result is dropped when it arrives, so a
+stale result can never overwrite a newer one.
+
+Workers share the Coordinator's DataManager; open it with concurrent=True so each
+worker reads through its own pooled read-only connection while writes are serialized
+on the writer connection.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class _TaskSignals(QObject):
+    # key, ticket, ok, payload (result or error message)
+    done = Signal(str, int, bool, object)
+
+
+class _Task(QRunnable):
+    def __init__(self, key: str, ticket: int, fn: Callable, args: tuple, kwargs: dict):
+        super().__init__()
+        self.key = key
+        self.ticket = ticket
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        # created on the submitting (GUI) thread, so emits from the worker are queued to it
+        self.signals = _TaskSignals()
+
+    def run(self) -> None:
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.done.emit(self.key, self.ticket, False, str(e))
+            return
+        self.signals.done.emit(self.key, self.ticket, True, result)
+
+
+class AsyncRunner(QObject):
+    def __init__(self, pool: Optional[QThreadPool] = None, parent=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._latest: Dict[str, int] = {}
+        # key -> (task, on_result, on_error) for the newest request of each key
+        self._pending: Dict[str, Tuple[_Task, Optional[Callable], Optional[Callable]]] = {}
+        # (key, ticket) -> task for every task on the pool, superseded ones included: tasks
+        # don't auto-delete, so this keeps a running task and its signals alive until done
+        self._in_flight: Dict[Tuple[str, int], _Task] = {}
+
+    def submit(self, key: str, fn: Callable, *args: Any,
+               on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[str], None]] = None, **kwargs: Any) -> int:
+        """
+        Run fn(*args, **kwargs) on the pool. on_result / on_error are called on the GUI
+        thread, and only if this is still the newest request for `key`.
+        Returns the request's ticket number.
+        """
+        self.cancel(key)
+        ticket = self._latest.get(key, 0) + 1
+        self._latest[key] = ticket
+        task = _Task(key, ticket, fn, args, kwargs)
+        task.setAutoDelete(False)
+        task.signals.done.connect(self._on_done)
+        self._pending[key] = (task, on_result, on_error)
+        self._in_flight[(key, ticket)] = task
+        self.pool.start(task)
+        return ticket
+
+    def cancel(self, key: str) -> None:
+        """Supersede the outstanding request for `key`, if any: unstarted work is dropped, running work is ignored."""
+        entry = self._pending.pop(key, None)
+        if entry is None:
+            return
+        self._latest[key] = self._latest.get(key, 0) + 1
+        task = entry[0]
+        if self.pool.tryTake(task):
+            # never started, so done will never arrive for it
+            self._in_flight.pop((key, task.ticket), None)
+
+    def is_pending(self, key: str) -> bool:
+        return key in self._pending
+
+    def _on_done(self, key: str, ticket: int, ok: bool, payload: object) -> None:
+        self._in_flight.pop((key, ticket), None)
+        if ticket != self._latest.get(key):
+            return  # superseded
+        entry = self._pending.pop(key, None)
+        if entry is None:
+            return
+        _, on_result, on_error = entry
+        if ok:
+            if on_result is not None:
+                on_result(payload)
+        elif on_error is not None:
+            on_error(str(payload))
@@ -1,9 +1,12 @@
 """
-MainWindow: minimal app window containing controls to add a record and view recent records.
+MainWindow: minimal app window containing controls to add a record and view records.
 """
-from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QHBoxLayout
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QPushButton, QTableView, QHBoxLayout
 from core.coordinator import Coordinator
+from ui.async_runner import AsyncRunner
 from ui.record_dialog import RecordDialog
+from ui.record_table_model import RecordTableModel
 
 
 class MainWindow(QMainWindow):
@@ -11,9 +14,10 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.coord = coordinator
         self.setWindowTitle("记账程序 - 最小界面")
+        # DB calls run on a thread pool; results come back on the GUI thread
+        self.runner = AsyncRunner(parent=self)
+        # enabling sorting in _init_ui loads the first page (date, newest first)
         self._init_ui()
-        # show initial data
-        self.refresh_records()
 
     def _init_ui(self):
         central = QWidget()
@@ -26,33 +30,35 @@ class MainWindow(QMainWindow):
         h.addWidget(btn_add)
         h.addWidget(btn_refresh)
         v.addLayout(h)
-        # table for recent records
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels(["类型", "金额", "日期", "分类", "备注"])
+        # records table: model pages rows in from the DB as the view scrolls
+        self.model = RecordTableModel(self.coord, runner=self.runner, parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        header = self.table.horizontalHeader()
+        header.setSortIndicator(2, Qt.DescendingOrder)
+        self._sort_indicator = (2, Qt.DescendingOrder)
+        self.table.setSortingEnabled(True)
+        header.sortIndicatorChanged.connect(self._on_sort_indicator_changed)
         v.addWidget(self.table)
         central.setLayout(v)
         self.setCentralWidget(central)
 
+    def _on_sort_indicator_changed(self, column, order):
+        if self.model.is_sortable(column):
+            self._sort_indicator = (column, order)
+            return
+        # the model ignores this column; put the indicator back without re-sorting
+        header = self.table.horizontalHeader()
+        header.blockSignals(True)
+        header.setSortIndicator(*self._sort_indicator)
+        header.blockSignals(False)
+
     def open_add_dialog(self):
-        dlg = RecordDialog(self.coord, parent=self)
+        dlg = RecordDialog(self.coord, runner=self.runner, parent=self)
         if dlg.exec():
             # if dialog accepted, refresh list
             self.refresh_records()
 
     def refresh_records(self):
-        records = self.coord.list_recent_records(limit=100)
-        self.table.setRowCount(0)
-        for r in records:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            self.table.setItem(row, 0, QTableWidgetItem(r.type))
-            self.table.setItem(row, 1, QTableWidgetItem(f"{float(r.amount):.2f}"))
-            self.table.setItem(row, 2, QTableWidgetItem(r.date))
-            # look up category name (may be None)
-            cat_name = ""
-            if r.category_id:
-                cat = self.coord.dm.get_category(r.category_id)
-                if cat:
-                    cat_name = cat.name
-            self.table.setItem(row, 3, QTableWidgetItem(cat_name))
-            self.table.setItem(row, 4, QTableWidgetItem(r.remark or ""))
\ No newline at end of file
+        self.model.refresh()
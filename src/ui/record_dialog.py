@@ -10,18 +10,23 @@ Fields:
 """
 from PySide6.QtWidgets import QDialog, QFormLayout, QComboBox, QDoubleSpinBox, QDateEdit, QLineEdit, QPushButton, QMessageBox
 from PySide6.QtCore import Qt
+from typing import Optional
 from core.coordinator import Coordinator
 from models.account_record import AccountRecord
-from utils.id_gen import generate_id
+from utils.id_gen import generate_ordered_id
+from ui.async_runner import AsyncRunner
 from datetime import datetime
 
 
 class RecordDialog(QDialog):
-    def __init__(self, coordinator: Coordinator, parent=None):
+    def __init__(self, coordinator: Coordinator, runner: Optional[AsyncRunner] = None, parent=None):
         super().__init__(parent)
         self.coord = coordinator
+        self.runner = runner
         self.setWindowTitle("新增记录")
         self.setModal(True)
+        # True while a save runs on the pool; the dialog can't be closed until it reports back
+        self._saving = False
         self._init_ui()
 
     def _init_ui(self):
@@ -50,8 +55,10 @@ class RecordDialog(QDialog):
         # buttons
         btn_save = QPushButton("保存")
         btn_save.clicked.connect(self._on_save)
+        self.btn_save = btn_save
         btn_cancel = QPushButton("取消")
         btn_cancel.clicked.connect(self.reject)
+        self.btn_cancel = btn_cancel
         form.addRow(btn_save, btn_cancel)
         self.setLayout(form)
 
@@ -79,16 +86,36 @@ class RecordDialog(QDialog):
         cat_id = self.cat_cb.currentData()
         remark = self.remark.text().strip() or None
         rec = AccountRecord(
-            id=generate_id("rec"),
+            id=generate_ordered_id("rec"),
             type=rtype,
             amount=amount,
             date=date_iso,
             category_id=cat_id,
             remark=remark,
         )
-        ok, msg = self.coord.create_record(rec)
+        if self.runner is not None:
+            # 在线程池中保存，避免阻塞界面；完成前禁用保存/取消按钮：
+            # 已提交的保存无法撤回，关闭对话框会让主窗口错过刷新
+            self._saving = True
+            self.btn_save.setEnabled(False)
+            self.btn_cancel.setEnabled(False)
+            self.runner.submit("record_dialog.save", self.coord.create_record, rec,
+                               on_result=self._on_saved, on_error=lambda m: self._on_saved((False, m)))
+            return
+        self._on_saved(self.coord.create_record(rec))
+
+    def _on_saved(self, result):
+        ok, msg = result
+        self._saving = False
+        self.btn_save.setEnabled(True)
+        self.btn_cancel.setEnabled(True)
         if ok:
             QMessageBox.information(self, "保存成功", "记录已保存。")
             self.accept()
         else:
-            QMessageBox.warning(self, "保存失败", f"无法保存记录：{msg}")
\ No newline at end of file
+            QMessageBox.warning(self, "保存失败", f"无法保存记录：{msg}")
+    def reject(self):
+        # Esc / window close also land here; wait for the running save instead
+        if self._saving:
+            return
+        super().reject()
@@ -0,0 +1,138 @@
+"""
+RecordTableModel: lazily paged table model for the records list.
+
+Rows are fetched page by page with keyset pagination (Coordinator.list_record_views_page,
+already joined with category names) as the view scrolls (canFetchMore / fetchMore), so
+no widget items are created per row and only pages the user actually reached are loaded. Sorting and filtering are
+pushed down to SQL: changing either resets the model and starts paging again.
+
+With an AsyncRunner the page queries run on the thread pool; a refresh supersedes any
+page still in flight, so rows from an older sort/filter never land in the model.
+"""
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from core.coordinator import Coordinator
+from data.data_manager import PageToken
+from models.record_view import RecordView
+from ui.async_runner import AsyncRunner
+
+
+class RecordTableModel(QAbstractTableModel):
+    HEADERS = ["类型", "金额", "日期", "分类", "备注"]
+    # column -> keyset sort key, each backed by a (key, id) index; other columns are not sortable
+    SORT_KEYS = {0: "type", 1: "amount", 2: "date"}
+
+    RUNNER_KEY = "records.page"
+
+    def __init__(self, coordinator: Coordinator, page_size: int = 200,
+                 runner: Optional[AsyncRunner] = None, parent=None):
+        super().__init__(parent)
+        self.coord = coordinator
+        self.page_size = page_size
+        self.runner = runner
+        self._rows: List[RecordView] = []
+        self._next: Optional[PageToken] = None
+        self._has_more = False
+        self._sort_key = "date"
+        self._descending = True
+        self._filters: Dict[str, Optional[str]] = {"start": None, "end": None, "category_id": None}
+
+    # ---------------- Qt model interface ----------------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        r = self._rows[index.row()]
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return r.type
+            if col == 1:
+                return f"{float(r.amount):.2f}"
+            if col == 2:
+                return r.date
+            if col == 3:
+                return r.category_name or ""
+            if col == 4:
+                return r.remark or ""
+        if role == Qt.TextAlignmentRole and col == 1:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if self.runner is not None and self.runner.is_pending(self.RUNNER_KEY):
+            return False
+        return not parent.isValid() and self._has_more
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if not self.canFetchMore(parent):
+            return
+        if self.runner is None:
+            self._append_page(self._fetch_page(self._next))
+        else:
+            self.runner.submit(self.RUNNER_KEY, self.coord.list_record_views_page,
+                               on_result=self._append_page, **self._page_args(self._next))
+
+    def _append_page(self, result) -> None:
+        page, token = result
+        if page:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self._rows.extend(page)
+            self.endInsertRows()
+        self._next = token
+        self._has_more = token is not None
+
+    def is_sortable(self, column: int) -> bool:
+        return column in self.SORT_KEYS
+
+    def sort(self, column, order=Qt.AscendingOrder) -> None:
+        key = self.SORT_KEYS.get(column)
+        if key is None:
+            return
+        self._sort_key = key
+        self._descending = order == Qt.DescendingOrder
+        self.refresh()
+
+    # ---------------- API for the window ----------------
+    def set_filter(self, start: Optional[str] = None, end: Optional[str] = None,
+                   category_id: Optional[str] = None) -> None:
+        self._filters = {"start": start, "end": end, "category_id": category_id}
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Drop loaded rows and load the first page for the current sort and filter."""
+        if self.runner is None:
+            self._reset_rows(self._fetch_page(None))
+        else:
+            self.runner.submit(self.RUNNER_KEY, self.coord.list_record_views_page,
+                               on_result=self._reset_rows, **self._page_args(None))
+
+    def _reset_rows(self, result) -> None:
+        self.beginResetModel()
+        self._rows, self._next = result
+        self._has_more = self._next is not None
+        self.endResetModel()
+
+    def record_at(self, row: int) -> Optional[RecordView]:
+        return self._rows[row] if 0 <= row < len(self._rows) else None
+
+    def _page_args(self, after: Optional[PageToken]) -> dict:
+        # snapshot sort/filter now; a worker must not read them while the GUI changes them
+        return dict(limit=self.page_size, after=after, descending=self._descending,
+                    sort_key=self._sort_key, **self._filters)
+
+    def _fetch_page(self, after: Optional[PageToken]):
+        return self.coord.list_record_views_page(**self._page_args(after))
@@ -1,19 +1,37 @@
 """
 统计视图骨架：从 coordinator 获取统计并渲染（可用 matplotlib/pyqtgraph）
 """
+from typing import Optional
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
 from core.coordinator import Coordinator
+from ui.async_runner import AsyncRunner
 
 class StatsView(QWidget):
-    def __init__(self, coordinator: Coordinator, parent=None):
+    def __init__(self, coordinator: Coordinator, runner: Optional[AsyncRunner] = None, parent=None):
         super().__init__(parent)
         self.coord = coordinator
+        self.runner = runner
         self.setWindowTitle("统计")
         self._init_ui()
+        self.refresh()
 
     def _init_ui(self):
         v = QVBoxLayout()
-        summary = self.coord.get_statistics_summary()
-        v.addWidget(QLabel(f"总计: {summary['total_by_type']}"))
+        self.total_label = QLabel("加载中…")
+        v.addWidget(self.total_label)
         # TODO: 用图表库绘制饼图/时间序列
-        self.setLayout(v)
\ No newline at end of file
+        self.setLayout(v)
+
+    def refresh(self):
+        # 有 runner 时在线程池中计算，较新的刷新会取代尚未返回的旧请求
+        if self.runner is None:
+            self._show_summary(self.coord.get_statistics_summary())
+        else:
+            self.runner.submit("stats.summary", self.coord.get_statistics_summary,
+                               on_result=self._show_summary, on_error=self._show_error)
+
+    def _show_summary(self, summary):
+        self.total_label.setText(f"总计: {summary['total_by_type']}")
+
+    def _show_error(self, msg):
+        self.total_label.setText(f"统计失败: {msg}")
@@ -1,4 +1,62 @@
+import os
+import threading
+import time
 import uuid
 
 def generate_id(prefix: str = "") -> str:
-    return f"{prefix}_{uuid.uuid4().hex[:8]}"
\ No newline at end of file
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+# ---------------- time-ordered ids ----------------
+# ULID layout: 48-bit millisecond timestamp + 80 random bits, 26 Crockford base32 chars.
+# The alphabet is in ASCII order, so string order == time order: new records append at
+# the right edge of the primary-key B-tree and ORDER BY id DESC is newest first.
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_ULID_LEN = 26
+_RANDOM_BITS = 80
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+
+def _encode(value: int) -> str:
+    out = []
+    for _ in range(_ULID_LEN):
+        value, r = divmod(value, 32)
+        out.append(_CROCKFORD[r])
+    return "".join(reversed(out))
+
+
+def new_ulid() -> str:
+    """
+    Monotonic ULID: strictly increasing within this process, even for ids generated in
+    the same millisecond (the random part is incremented) or if the clock steps back.
+    """
+    global _last_ms, _last_random
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            rand = int.from_bytes(os.urandom(_RANDOM_BITS // 8), "big")
+        else:
+            ms = _last_ms
+            rand = _last_random + 1
+            if rand >> _RANDOM_BITS:
+                # random part exhausted within one millisecond: move to the next one
+                ms += 1
+                rand = int.from_bytes(os.urandom(_RANDOM_BITS // 8), "big") >> 1
+        _last_ms, _last_random = ms, rand
+    return _encode((ms << _RANDOM_BITS) | rand)
+
+
+def generate_ordered_id(prefix: str = "") -> str:
+    """Like generate_id, but time-ordered and collision-resistant: `{prefix}_{ULID}`."""
+    return f"{prefix}_{new_ulid()}"
+
+
+def ordered_id_timestamp_ms(id_: str) -> int:
+    """Creation time (Unix ms) encoded in an id from generate_ordered_id / new_ulid."""
+    value = 0
+    for ch in id_[-_ULID_LEN:][:10]:
+        value = value * 32 + _CROCKFORD.index(ch)
+    return value
@@ -0,0 +1,53 @@
+"""
+Fixed-point money helpers: amounts are stored and summed as integer cents (minor units).
+
+Floats only appear at the edges (UI input, CSV text, values handed back to callers);
+converting cents back with from_cents gives the float closest to the exact decimal
+amount, so sums of cents never drift.
+"""
+import math
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Union
+
+CENTS_PER_UNIT = 100
+
+Amount = Union[int, float, str, Decimal]
+
+
+def to_cents(amount: Amount) -> int:
+    """
+    Round an amount to whole cents, halves away from zero (12.345 -> 1235).
+    Raises ValueError for nan / inf or anything that isn't a number.
+    """
+    if isinstance(amount, bool):
+        raise ValueError(f"not an amount: {amount!r}")
+    if isinstance(amount, int):
+        return amount * CENTS_PER_UNIT
+    if isinstance(amount, float):
+        if not math.isfinite(amount):
+            raise ValueError(f"not a finite amount: {amount!r}")
+        # fast path: amounts that already have at most two decimals (the normal case)
+        scaled = amount * CENTS_PER_UNIT
+        nearest = round(scaled)
+        if abs(scaled - nearest) < 1e-6:
+            return int(nearest)
+        # repr() is the shortest decimal that round-trips, i.e. what the user typed
+        amount = repr(amount)
+    try:
+        d = Decimal(str(amount).strip())
+    except InvalidOperation:
+        raise ValueError(f"not an amount: {amount!r}") from None
+    if not d.is_finite():
+        raise ValueError(f"not a finite amount: {amount!r}")
+    return int((d * CENTS_PER_UNIT).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> float:
+    return cents / CENTS_PER_UNIT
+
+
+def format_cents(cents: int) -> str:
+    """Exact decimal text for an amount in cents, e.g. 123456 -> "1234.56"."""
+    sign = "-" if cents < 0 else ""
+    units, rest = divmod(abs(cents), CENTS_PER_UNIT)
+    return f"{sign}{units}.{rest:02d}"
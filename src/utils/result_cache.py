@@ -0,0 +1,46 @@
+"""
+Small thread-safe LRU cache for service results.
+
+Keys are (method, args, generation): callers include DataManager.current_generation() so an
+entry can never be served after a write (from this process or, through PRAGMA
+data_version, any other), and stale entries simply age out.
+"""
+from collections import OrderedDict
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class ResultCache:
+    def __init__(self, maxsize: int = 128):
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        self.maxsize = maxsize  # 0 disables caching
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        # compute outside the lock; a concurrent miss on the same key just computes twice
+        value = compute()
+        if self.maxsize:
+            with self._lock:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
@@ -0,0 +1,172 @@
+"""
+Tests for online backups (data/backup.py) and backup rotation.
+"""
+import gzip
+import lzma
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+import data.data_manager as data_manager
+from data.backup import online_backup, prune_backups
+from data.data_manager import DataManager
+from data.migrations import PRE_MIGRATION_BACKUPS_KEEP, apply_migrations
+from models.account_record import AccountRecord
+
+MIGRATIONS = Path(__file__).resolve().parents[1] / "src" / "db" / "migrations"
+
+
+def _recs(prefix, n):
+    return [AccountRecord(id=f"{prefix}{i}", type="EXPENDITURE", amount=1.0 + i % 50, date="2025-10-01",
+                          remark="x" * 200) for i in range(n)]
+
+
+def _count(path):
+    conn = sqlite3.connect(str(path))
+    try:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        return conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_backup_is_consistent_while_writes_continue(tmp_path):
+    dm = DataManager(str(tmp_path / "live.db"), concurrent=True)
+    try:
+        dm.save_records(_recs("a", 3000))
+        stop = threading.Event()
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                dm.save_record(_recs(f"w{i}_", 1)[0])
+                i += 1
+        t = threading.Thread(target=writer)
+        t.start()
+        steps = []
+        try:
+            ok, msg = dm.backup(str(tmp_path / "out" / "copy.db"), pages=4, sleep=0.001,
+                                progress=lambda done, total: steps.append((done, total)))
+        finally:
+            stop.set()
+            t.join()
+        assert ok, msg
+        # WAL snapshot: one pass, no restarts, ends complete
+        assert [d for d, _ in steps] == sorted(d for d, _ in steps)
+        assert steps[-1][0] == steps[-1][1]
+        assert 3000 <= _count(tmp_path / "out" / "copy.db") <= len(list(dm.iter_records()))
+    finally:
+        dm.close()
+
+
+@pytest.mark.parametrize("compress,opener", [("gzip", gzip.open), ("xz", lzma.open)])
+def test_compressed_backup_round_trip(tmp_path, compress, opener):
+    dm = DataManager(str(tmp_path / "c.db"))
+    try:
+        dm.save_records(_recs("r", 100))
+        dest = tmp_path / f"c.db.{compress}"
+        ok, _ = dm.backup(str(dest), compress=compress)
+        assert ok and not list(tmp_path.glob("*.partial*"))
+    finally:
+        dm.close()
+    restored = tmp_path / "restored.db"
+    with opener(dest, "rb") as fin, open(restored, "wb") as fout:
+        shutil.copyfileobj(fin, fout)
+    assert _count(restored) == 100
+
+
+def test_backup_rotating_prunes_old_files(tmp_path):
+    dm = DataManager(str(tmp_path / "rot.db"))
+    try:
+        backups = tmp_path / "backups"
+        backups.mkdir()
+        for i in range(4):
+            old = backups / f"rot_backup_2020010100000{i}.db.gz"
+            old.write_bytes(b"")
+            os.utime(old, (1_000_000 + i, 1_000_000 + i))
+        (backups / "unrelated.db").write_bytes(b"")
+        ok, path = dm.backup_rotating(keep=2, compress="gzip")
+        assert ok and path.endswith(".db.gz")
+        assert sorted(p.name for p in backups.iterdir()) == sorted(
+            ["unrelated.db", "rot_backup_20200101000003.db.gz", Path(path).name])
+    finally:
+        dm.close()
+    with pytest.raises(ValueError):
+        prune_backups(backups, "*.db", keep=-1)
+
+
+def test_backup_rotating_leaves_backups_in_progress_alone(tmp_path):
+    dm = DataManager(str(tmp_path / "rot.db"))
+    try:
+        backups = tmp_path / "backups"
+        backups.mkdir()
+        old = backups / "rot_backup_20200101000000.db"
+        old.write_bytes(b"")
+        os.utime(old, (1_000_000, 1_000_000))
+        # another rotation still writing: newer than everything, must not count or be deleted
+        partials = [backups / "rot_backup_29990101000000.db.partial",
+                    backups / "rot_backup_29990101000001.db.gz.partial.db"]
+        for p in partials:
+            p.write_bytes(b"x")
+        ok, path = dm.backup_rotating(keep=2, compress="xz")
+        assert ok
+        assert sorted(p.name for p in backups.iterdir()) == sorted(
+            [old.name, Path(path).name] + [p.name for p in partials])
+        assert dm.backup_rotating(keep=1)[0]
+        assert not old.exists() and not Path(path).exists()
+        assert all(p.exists() for p in partials)
+    finally:
+        dm.close()
+
+
+def test_backup_rotating_never_overwrites_within_one_timestamp(tmp_path, monkeypatch):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return cls(2025, 10, 1, 12, 0, 0)
+    monkeypatch.setattr(data_manager, "datetime", FrozenDatetime)
+    dm = DataManager(str(tmp_path / "rot.db"))
+    try:
+        paths = [dm.backup_rotating(keep=5)[1] for _ in range(3)]
+        assert len(set(paths)) == 3
+        assert all(Path(p).is_file() for p in paths)
+    finally:
+        dm.close()
+
+
+def test_pre_migration_backups_are_online_and_rotated(tmp_path):
+    old_dir = tmp_path / "old"
+    old_dir.mkdir()
+    for p in sorted(MIGRATIONS.glob("00[0-2]_*.sql")):
+        shutil.copy(p, old_dir / p.name)
+    db = tmp_path / "app.db"
+    apply_migrations(str(db), str(old_dir))
+    backups = tmp_path / "backups"
+    backups.mkdir()
+    for i in range(PRE_MIGRATION_BACKUPS_KEEP + 2):
+        f = backups / f"app_pre_migration_2020010100000{i}.db"
+        f.write_bytes(b"")
+        os.utime(f, (1_000_000 + i, 1_000_000 + i))
+
+    assert apply_migrations(str(db), str(MIGRATIONS))
+    kept = sorted(backups.glob("app_pre_migration_*.db"), key=lambda p: p.stat().st_mtime)
+    assert len(kept) == PRE_MIGRATION_BACKUPS_KEEP
+    # the newest one is a real copy of the database before the new migrations
+    conn = sqlite3.connect(str(kept[-1]))
+    try:
+        versions = {r[0] for r in conn.execute("SELECT version FROM meta_migrations")}
+    finally:
+        conn.close()
+    assert versions == {p.name for p in old_dir.iterdir()}
+
+
+def test_online_backup_rejects_bad_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        online_backup(str(tmp_path / "x.db"), str(tmp_path / "y.db"), pages=0)
+    with pytest.raises(ValueError):
+        online_backup(str(tmp_path / "x.db"), str(tmp_path / "y.db"), compress="zip")
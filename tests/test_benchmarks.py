@@ -0,0 +1,35 @@
+"""
+Smoke tests for the benchmark generator and suite (benchmarks/).
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from generate_ledger import MAX_RECORDS, generate_records  # noqa: E402
+from run_benchmarks import compare, run_suite  # noqa: E402
+
+
+def test_generator_is_reproducible():
+    a = list(generate_records(500, seed=7))
+    b = list(generate_records(500, seed=7))
+    assert a == b
+    assert a != list(generate_records(500, seed=8))
+    assert all(r.validate() for r in a)
+    assert {r.type for r in a} == {"INCOME", "EXPENDITURE"}
+    with pytest.raises(ValueError):
+        next(generate_records(MAX_RECORDS + 1))
+
+
+def test_suite_runs_and_compares(tmp_path):
+    res = run_suite(records=300, repeat=1, workdir=str(tmp_path), single_inserts=20,
+                    pages=3, page_size=50, import_rows=100)
+    assert res["meta"]["records"] == 300
+    assert res["results"]["save_records_bulk"]["ops"] == 300
+    assert res["results"]["query_records_page"]["ops"] == 150
+    assert res["results"]["import_csv_strict"]["ops"] == 100
+    assert compare(res, res) == []
+    slower = {"results": {k: dict(v, seconds=v["seconds"] * 2) for k, v in res["results"].items()}}
+    assert {r["name"] for r in compare(slower, res, threshold=0.5)} == set(res["results"])
@@ -0,0 +1,85 @@
+"""
+Tests for batched category reassignment: chunked delete/merge, progress and cancellation.
+"""
+import threading
+
+import pytest
+
+from data.data_manager import DataManager
+from models.account_record import AccountRecord
+from models.category import Category
+
+
+@pytest.fixture(params=[False, True], ids=["single", "concurrent"])
+def dm(tmp_path, request):
+    dm = DataManager(str(tmp_path / "reassign.db"), concurrent=request.param)
+    for cid in ("cat_a", "cat_b", "cat_c"):
+        dm.add_category(Category(id=cid, name=cid, type="EXPENDITURE"))
+    recs = [AccountRecord(id=f"r{i:03d}", type="EXPENDITURE", amount=1.0, date=f"2025-10-{1 + i % 28:02d}",
+                          category_id=("cat_a", "cat_b", "cat_c")[i % 3]) for i in range(30)]
+    assert dm.save_records(recs).saved == 30
+    yield dm
+    dm.close()
+
+
+def _counts(dm):
+    rows = dm.driver.execute("SELECT category_id, COUNT(*) FROM records GROUP BY category_id").fetchall()
+    return {r[0]: r[1] for r in rows}
+
+
+def test_delete_moves_records_in_chunks(dm):
+    calls = []
+    ok, msg = dm.delete_category("cat_a", strategy="MOVE_TO_OTHER", migrate_to="cat_b", chunk_size=3,
+                                 progress=lambda done, total: calls.append((done, total)))
+    assert ok, msg
+    assert calls == [(3, 10), (6, 10), (9, 10), (10, 10)]
+    assert _counts(dm) == {"cat_b": 20, "cat_c": 10}
+    assert not dm.has_category("cat_a")
+    assert dm.check_daily_rollup() == []
+
+    assert dm.delete_category("cat_c", chunk_size=4)[0]
+    assert _counts(dm) == {None: 10, "cat_b": 20}
+
+
+def test_merge_several_categories(dm):
+    calls = []
+    ok, msg = dm.merge_categories(["cat_a", "cat_c", "cat_b"], "cat_b", chunk_size=7,
+                                  progress=lambda done, total: calls.append(done))
+    assert ok, msg
+    assert calls == [7, 10, 17, 20]
+    assert _counts(dm) == {"cat_b": 30}
+    assert not dm.has_category("cat_a") and not dm.has_category("cat_c") and dm.has_category("cat_b")
+    assert dm.check_daily_rollup() == []
+
+    assert dm.merge_categories(["cat_b"], "nope") == (False, "unknown target category: nope")
+
+
+def test_cancel_keeps_committed_chunks_and_can_resume(dm):
+    cancel = threading.Event()
+
+    def progress(done, total):
+        if done >= 4:
+            cancel.set()
+
+    ok, msg = dm.delete_category("cat_a", strategy="MOVE_TO_OTHER", migrate_to="cat_c", chunk_size=2,
+                                 progress=progress, cancel=cancel)
+    assert not ok and msg == "cancelled after moving 4 of 10 records"
+    assert _counts(dm)["cat_a"] == 6
+    assert dm.has_category("cat_a")
+    assert dm.check_daily_rollup() == []
+
+    # a new record lands in the category between the runs; the rerun picks it up
+    dm.save_record(AccountRecord(id="late", type="EXPENDITURE", amount=2.0, date="2025-10-05", category_id="cat_a"))
+    gen = dm.generation
+    assert dm.delete_category("cat_a", strategy="MOVE_TO_OTHER", migrate_to="cat_c", chunk_size=2)[0]
+    assert dm.generation > gen
+    assert _counts(dm) == {"cat_b": 10, "cat_c": 21}
+    assert not dm.has_category("cat_a")
+
+
+def test_reassign_reports_errors(dm):
+    result = dm.reassign_records(["cat_a"], "missing", chunk_size=5)
+    assert not result.ok and "FOREIGN KEY" in result.error
+    assert result.moved == 0 and _counts(dm)["cat_a"] == 10
+    with pytest.raises(ValueError):
+        dm.reassign_records(["cat_a"], "cat_b", chunk_size=0)
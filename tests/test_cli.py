@@ -0,0 +1,75 @@
+"""
+Tests for the headless CLI (src/cli.py).
+"""
+import csv
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import cli
+
+
+def _run(capsys, *argv):
+    code = cli.main(list(argv))
+    out = json.loads(capsys.readouterr().out)
+    return code, out
+
+
+def _write_csv(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=["type", "amount", "date", "category_id", "remark"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_import_stats_query_export_backup(tmp_path, capsys):
+    db = str(tmp_path / "cli.db")
+    src = tmp_path / "in.csv"
+    _write_csv(src, [
+        {"type": "EXPENDITURE", "amount": "12.5", "date": "2025-10-01", "category_id": "cat_food", "remark": "a"},
+        {"type": "EXPENDITURE", "amount": "12.5", "date": "2025-10-01", "category_id": "cat_food", "remark": "a"},
+        {"type": "INCOME", "amount": "100", "date": "2025-11-02", "category_id": "", "remark": ""},
+    ])
+
+    code, out = _run(capsys, "--db", db, "import", str(src))
+    assert code == 0 and out["imported"] == 2 and out["skipped"] == 1
+
+    code, out = _run(capsys, "--db", db, "stats", "--period", "month")
+    assert out["total_by_type"] == {"INCOME": 100.0, "EXPENDITURE": 12.5}
+    assert out["by_category"] == {"": 100.0, "cat_food": 12.5}
+    assert out["timeseries"]["data"] == {"2025-10": 12.5, "2025-11": 100.0}
+
+    code, out = _run(capsys, "--db", db, "query", "--limit", "1")
+    assert out["records"][0]["date"].startswith("2025-11-02")
+    nxt = out["next"]
+    code, out = _run(capsys, "--db", db, "query", "--limit", "1",
+                     "--after-date", nxt["after_date"], "--after-id", nxt["after_id"])
+    assert out["records"][0]["amount"] == 12.5 and out["next"] is None
+
+    dest = tmp_path / "out" / "export.csv"
+    code, out = _run(capsys, "--db", db, "export", str(dest), "--category", "cat_food")
+    assert out["exported"] == 1
+    with open(dest, encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    assert rows[0]["category_name"] == "餐饮"
+
+    code, out = _run(capsys, "--db", db, "backup", str(tmp_path / "b" / "copy.db"))
+    assert code == 0 and Path(tmp_path / "b" / "copy.db").exists()
+
+    code, out = _run(capsys, "--db", db, "rollup", "check")
+    assert code == 0 and out["mismatches"] == []
+
+
+def test_migrate_and_failure_exit_code(tmp_path, capsys):
+    db = str(tmp_path / "m.db")
+    code, out = _run(capsys, "--db", db, "migrate")
+    assert code == 0 and "000_create_tables.sql" in out["applied"]
+    code, out = _run(capsys, "--db", db, "import", str(tmp_path / "missing.csv"))
+    assert code == 1 and out["ok"] is False
+
+
+def test_cli_does_not_import_qt():
+    src = Path(cli.__file__).resolve().parent
+    code = "import sys, cli; sys.exit(any(m.split('.')[0] == 'PySide6' for m in sys.modules))"
+    assert subprocess.run([sys.executable, "-c", code], cwd=str(src)).returncode == 0
@@ -0,0 +1,62 @@
+"""
+Tests for the opt-in concurrent mode (WAL + read-connection pool).
+"""
+import threading
+import pytest
+from data.data_manager import DataManager
+from data.sqlite_driver import SQLiteDriver
+from services.statistics_service import StatisticsService
+from models.account_record import AccountRecord
+
+
+@pytest.fixture
+def dm(tmp_path):
+    dm = DataManager(str(tmp_path / "wal.db"), concurrent=True, read_pool_size=2)
+    yield dm
+    dm.close()
+
+
+def test_wal_mode_and_reads_see_committed_writes(dm):
+    assert dm.driver.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    dm.save_record(AccountRecord(id="r1", type="INCOME", amount=3.0, date="2025-10-01"))
+    assert [r.id for r in dm.query_records()] == ["r1"]
+    with dm.driver.reader() as conn:
+        # pooled connections are read-only
+        with pytest.raises(Exception):
+            conn.execute("DELETE FROM records")
+
+
+def test_reads_on_worker_threads_run_alongside_writes(dm):
+    errors = []
+
+    def writer():
+        try:
+            for i in range(200):
+                ok, msg = dm.save_record(AccountRecord(id=f"w{i}", type="EXPENDITURE", amount=1.0, date="2025-10-02"))
+                assert ok, msg
+        except Exception as e:  # pragma: no cover - surfaced below
+            errors.append(e)
+
+    def reader():
+        try:
+            stats = StatisticsService(dm)
+            for _ in range(50):
+                stats.total_by_type()
+                list(dm.iter_records(batch_size=16))
+        except Exception as e:  # pragma: no cover - surfaced below
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert StatisticsService(dm).total_by_type()["EXPENDITURE"] == 200.0
+    # never more pooled connections than read_pool_size
+    assert len(dm.driver._all_readers) <= 2
+
+
+def test_concurrent_mode_rejects_in_memory_database():
+    with pytest.raises(ValueError):
+        SQLiteDriver(":memory:", concurrent=True)
@@ -0,0 +1,96 @@
+"""
+Tests for the daily_rollup summary table: trigger maintenance, rebuild and consistency check.
+"""
+import pytest
+from data.data_manager import DataManager
+from services.statistics_service import StatisticsService
+from models.account_record import AccountRecord
+from models.category import Category
+
+
+@pytest.fixture
+def dm(tmp_path):
+    dm = DataManager(str(tmp_path / "rollup.db"))
+    dm.add_category(Category(id="cat_a", name="A", type="EXPENDITURE"))
+    dm.add_category(Category(id="cat_b", name="B", type="EXPENDITURE"))
+    yield dm
+    dm.close()
+
+
+def _rollup_rows(dm):
+    cur = dm.driver.execute("SELECT day, type, category_id, total_cents, count FROM daily_rollup ORDER BY day, type, category_id")
+    return [tuple(r) for r in cur.fetchall()]
+
+
+def test_triggers_keep_rollup_in_sync_with_crud(dm):
+    rec = AccountRecord(id="r1", type="EXPENDITURE", amount=10.0, date="2025-10-01T08:00:00", category_id="cat_a")
+    dm.save_record(rec)
+    dm.save_record(AccountRecord(id="r2", type="EXPENDITURE", amount=5.0, date="2025-10-01T20:00:00", category_id="cat_a"))
+    dm.save_record(AccountRecord(id="r3", type="INCOME", amount=7.0, date="2025-10-02"))
+    assert _rollup_rows(dm) == [
+        ("2025-10-01", "EXPENDITURE", "cat_a", 1500, 2),
+        ("2025-10-02", "INCOME", "", 700, 1),
+    ]
+
+    rec.date = "2025-10-03T08:00:00"
+    rec.category_id = "cat_b"
+    dm.update_record(rec)
+    dm.delete_record("r3")
+    dm.delete_category("cat_a", strategy="MOVE_TO_OTHER", migrate_to="cat_b")
+    assert _rollup_rows(dm) == [
+        ("2025-10-01", "EXPENDITURE", "cat_b", 500, 1),
+        ("2025-10-03", "EXPENDITURE", "cat_b", 1000, 1),
+    ]
+    assert dm.check_daily_rollup() == []
+
+
+def test_check_detects_drift_and_rebuild_repairs_it(dm):
+    dm.save_record(AccountRecord(id="r1", type="EXPENDITURE", amount=10.0, date="2025-10-01", category_id="cat_a"))
+    dm.driver.execute("UPDATE daily_rollup SET total_cents = 9900")
+    dm.driver.execute("INSERT INTO daily_rollup (day, type, category_id, total_cents, count) VALUES ('2020-01-01', 'INCOME', '', 1, 1)")
+    dm.driver.commit()
+
+    problems = dm.check_daily_rollup()
+    assert {(p["day"], p["expected_count"], p["count"]) for p in problems} == {("2025-10-01", 1, 1), ("2020-01-01", 0, 1)}
+
+    ok, _ = dm.rebuild_daily_rollup()
+    assert ok
+    assert dm.check_daily_rollup() == []
+
+
+def test_statistics_from_rollup_match_raw_records(dm):
+    for i in range(40):
+        dm.save_record(AccountRecord(id=f"s{i}", type="INCOME" if i % 3 == 0 else "EXPENDITURE", amount=float(i + 1),
+                                     date=f"2025-{i % 4 + 9:02d}-{i % 28 + 1:02d}T12:00:00",
+                                     category_id=[None, "cat_a", "cat_b"][i % 3]))
+    stats = StatisticsService(dm)
+    for group_by in ("type", "category_id", "day", "month", "year"):
+        from_rollup = dm.aggregate_amounts(group_by, start="2025-10-01", category_id="cat_a")
+        raw = dm.aggregate_amounts(group_by, start="2025-10-01", end="9999", category_id="cat_a")
+        assert from_rollup == raw
+    assert stats.by_category()[None] == sum(float(i + 1) for i in range(0, 40, 3))
+
+
+def test_bounded_ranges_use_rollup_for_whole_days(dm):
+    dates = ["2025-09-30T23:00:00", "2025-10-01", "2025-10-01T09:00:00", "2025-10-02T12:00:00",
+             "2025-10-15T08:00:00", "2025-10-31T10:00:00", "2025-10-31T23:59:59.5", "2025-11-01"]
+    for i, d in enumerate(dates):
+        dm.save_record(AccountRecord(id=f"b{i}", type="EXPENDITURE", amount=float(10 ** (i % 4)), date=d,
+                                     category_id="cat_a" if i % 2 else None))
+
+    def raw(group_by, start, end):
+        expr = {"type": "type", "category_id": "category_id", "month": "substr(date, 1, 7)"}[group_by]
+        sql = f"SELECT {expr} AS k, SUM(amount_cents) FROM records WHERE date >= ? AND date <= ? GROUP BY k ORDER BY k"
+        return [(r[0], r[1] / 100) for r in dm.driver.execute(sql, (start, end)).fetchall()]
+
+    bounds = [("2025-10-01", "2025-10-31"), ("2025-10-01", "2025-10-31T23:59:59"),
+              ("2025-10-01T05:00:00", "2025-11-01"), ("2025-09-01", "2025-10-15T08:00:00")]
+    for start, end in bounds:
+        for group_by in ("type", "category_id", "month"):
+            assert dm.aggregate_amounts(group_by, start=start, end=end) == raw(group_by, start, end)
+
+    # the days strictly inside the range are read from daily_rollup, not records
+    dm.driver.execute("UPDATE daily_rollup SET total_cents = total_cents + 100000 WHERE day = '2025-10-15'")
+    dm.driver.commit()
+    got = dict(dm.aggregate_amounts("type", start="2025-10-01", end="2025-10-31T23:59:59"))
+    assert got["EXPENDITURE"] == dict(raw("type", "2025-10-01", "2025-10-31T23:59:59"))["EXPENDITURE"] + 1000
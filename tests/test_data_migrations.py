@@ -0,0 +1,109 @@
+"""
+Tests for Python data migrations: keyed batches, progress cursor and resume after a failure.
+"""
+import sqlite3
+import textwrap
+
+import pytest
+
+from data.migrations import apply_migrations, list_migration_names, migrations_fingerprint
+
+SETUP_SQL = """
+CREATE TABLE items (id INTEGER PRIMARY KEY, value INTEGER NOT NULL, doubled INTEGER);
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 25)
+INSERT INTO items (id, value) SELECT i, i FROM n;
+"""
+
+DOUBLE_PY = textwrap.dedent('''
+    TABLE = "items"
+    KEY = "id"
+    COLUMNS = ("value",)
+    WHERE = "doubled IS NULL"
+    BATCH_SIZE = 10
+
+    def setup(conn):
+        conn.execute("CREATE TABLE IF NOT EXISTS double_runs (n INTEGER)")
+        conn.execute("INSERT INTO double_runs VALUES (1)")
+
+    def migrate_batch(conn, rows):
+        conn.executemany("UPDATE items SET doubled = ? WHERE id = ?", [(v * 2, k) for k, v in rows])
+        # tests simulate a crash by putting a row id in fail_after
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'fail_after'").fetchone():
+            if rows[-1][0] > conn.execute("SELECT id FROM fail_after").fetchone()[0]:
+                raise RuntimeError("boom")
+''')
+
+
+@pytest.fixture
+def migrations(tmp_path):
+    d = tmp_path / "migrations"
+    d.mkdir()
+    (d / "000_items.sql").write_text(SETUP_SQL, encoding="utf-8")
+    (d / "001_double.py").write_text(DOUBLE_PY, encoding="utf-8")
+    return d
+
+
+def _meta(db, version):
+    conn = sqlite3.connect(db)
+    try:
+        return conn.execute("SELECT status, progress_key, rows_done FROM meta_migrations WHERE version = ?",
+                            (version,)).fetchone()
+    finally:
+        conn.close()
+
+
+def test_data_migration_runs_in_batches(tmp_path, migrations):
+    db = str(tmp_path / "app.db")
+    calls = []
+    applied = apply_migrations(db, str(migrations), progress=lambda v, n, rate: calls.append((v, n)))
+    assert applied == ["000_items.sql", "001_double.py"]
+    assert calls == [("001_double.py", 10), ("001_double.py", 20), ("001_double.py", 25)]
+    assert _meta(db, "001_double.py") == ("done", 25, 25)
+    conn = sqlite3.connect(db)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM items WHERE doubled = value * 2").fetchone()[0] == 25
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == migrations_fingerprint(str(migrations))
+    finally:
+        conn.close()
+    assert apply_migrations(db, str(migrations)) == []
+    assert not (migrations / "__pycache__").exists()
+
+
+def test_interrupted_data_migration_resumes_after_last_batch(tmp_path, migrations):
+    db = str(tmp_path / "app.db")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE fail_after (id INTEGER)")
+    conn.execute("INSERT INTO fail_after VALUES (10)")
+    conn.commit()
+    conn.close()
+    with pytest.raises(RuntimeError, match="boom"):
+        apply_migrations(db, str(migrations))
+    # the first batch is committed, the failing second one rolled back
+    assert _meta(db, "001_double.py") == ("running", 10, 10)
+    conn = sqlite3.connect(db)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM items WHERE doubled IS NOT NULL").fetchone()[0] == 10
+        conn.execute("UPDATE items SET value = -value WHERE id <= 10")  # processed rows must not be revisited
+        conn.execute("DROP TABLE fail_after")
+        conn.commit()
+    finally:
+        conn.close()
+
+    calls = []
+    assert apply_migrations(db, str(migrations), progress=lambda v, n, rate: calls.append(n)) == ["001_double.py"]
+    assert calls == [20, 25]
+    assert _meta(db, "001_double.py") == ("done", 25, 25)
+    conn = sqlite3.connect(db)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM items WHERE doubled = value * 2").fetchone()[0] == 15
+        assert conn.execute("SELECT COUNT(*) FROM items WHERE doubled = -value * 2").fetchone()[0] == 10
+        assert conn.execute("SELECT COUNT(*) FROM double_runs").fetchone()[0] == 1  # setup ran once
+    finally:
+        conn.close()
+
+
+def test_data_migrations_are_listed_and_validated(tmp_path, migrations):
+    assert list_migration_names(str(migrations)) == ["000_items.sql", "001_double.py"]
+    (migrations / "002_broken.py").write_text("TABLE = 'items'\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="does not define COLUMNS"):
+        apply_migrations(str(tmp_path / "app.db"), str(migrations))
@@ -0,0 +1,59 @@
+"""
+Tests for time-ordered record ids (utils.id_gen).
+"""
+import threading
+import time
+
+import pytest
+
+from utils import id_gen
+from utils.id_gen import generate_ordered_id, new_ulid, ordered_id_timestamp_ms
+
+
+@pytest.fixture(autouse=True)
+def _restore_generator_state(monkeypatch):
+    # tests that fake the clock must not leave a far-future timestamp behind
+    monkeypatch.setattr(id_gen, "_last_ms", id_gen._last_ms)
+    monkeypatch.setattr(id_gen, "_last_random", id_gen._last_random)
+
+
+def test_ordered_ids_are_monotonic_and_unique_in_bulk():
+    ids = [generate_ordered_id("rec") for _ in range(20000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(i.startswith("rec_") and len(i) == 4 + 26 for i in ids)
+
+
+def test_timestamp_is_encoded_and_clock_steps_back_keep_order(monkeypatch):
+    before = int(time.time() * 1000)
+    uid = new_ulid()
+    assert before - 1 <= ordered_id_timestamp_ms("rec_" + uid) <= int(time.time() * 1000) + 1
+    monkeypatch.setattr(id_gen.time, "time_ns", lambda: 0)
+    later = new_ulid()
+    assert later > uid
+
+
+def test_random_part_overflow_moves_to_next_millisecond(monkeypatch):
+    monkeypatch.setattr(id_gen.time, "time_ns", lambda: 5_000_000_000_000 * 1_000_000)
+    first = new_ulid()
+    monkeypatch.setattr(id_gen, "_last_random", (1 << 80) - 1)
+    nxt = new_ulid()
+    assert nxt > first
+    assert ordered_id_timestamp_ms(nxt) == ordered_id_timestamp_ms(first) + 1
+
+
+def test_threads_never_collide():
+    out = []
+    lock = threading.Lock()
+
+    def work():
+        ids = [generate_ordered_id("t") for _ in range(2000)]
+        with lock:
+            out.extend(ids)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(out)) == len(out) == 16000
@@ -5,7 +5,7 @@ import sqlite3
 
 import pytest
 from data.data_manager import DataManager
-from data.backup_importer import import_csv_strict, parse_csv_preview
+from data.backup_importer import import_csv_strict, parse_csv_preview, _StrictDedupIndex, _is_strict_duplicate
 from models.category import Category
 from models.account_record import AccountRecord
 # use relative import since this test module lives inside the tests package/directory
@@ -56,4 +56,63 @@ def test_import_csv_strict(tmp_path):
         assert float(r.amount) == 50.0
         assert r.remark == "Lunch"
     finally:
-        dm.close()
\ No newline at end of file
+        dm.close()
+
+def test_import_csv_strict_chunked_reports_db_errors(tmp_path):
+    dm = DataManager(str(tmp_path / "chunk.db"))
+    try:
+        dm.save_record(AccountRecord(id="fixed_1", type="INCOME", amount=1.0, date="2025-01-01T00:00:00"))
+        csv_path = tmp_path / "chunk.csv"
+        rows = [
+            {"id": f"row_{i}", "type": "EXPENDITURE", "amount": str(i + 1), "date": "2025-10-08", "category_id": "", "remark": "r"}
+            for i in range(7)
+        ]
+        # same id as an existing record -> constraint error, other rows in its chunk still imported
+        rows.append({"id": "fixed_1", "type": "EXPENDITURE", "amount": "99", "date": "2025-10-09", "category_id": "", "remark": ""})
+        # duplicate of a row that is still pending in the current chunk
+        rows.append(dict(rows[6], id=""))
+        _write_csv(csv_path, rows, header=["id", "type", "amount", "date", "category_id", "remark"])
+        report = import_csv_strict(str(csv_path), dm, chunk_size=3)
+        assert report["imported"] == 7
+        assert report["skipped"] == 1
+        assert [e["row"] for e in report["errors"]] == [8]
+        assert report["errors"][0]["reason"].startswith("db_error")
+    finally:
+        dm.close()
+
+
+@pytest.mark.parametrize("tol", [0.01, 0.5, 0.0, -1.0])
+def test_dedup_index_matches_linear_scan(tol):
+    import random
+    rnd = random.Random(42)
+    amounts = [10.0, 10.004, 10.01, 10.015, 10.02, 9.99, 10.5, 11.0, float("inf"), float("nan")]
+    def make(i):
+        return AccountRecord(id=f"x{i}", type=rnd.choice(["INCOME", "EXPENDITURE"]), amount=rnd.choice(amounts),
+                             date=rnd.choice(["2025-10-01T00:00:00", "2025-10-02T00:00:00"]),
+                             category_id=rnd.choice([None, "", "cat_food"]), remark=rnd.choice([None, "a"]))
+    existing = [make(i) for i in range(200)]
+    index = _StrictDedupIndex(amount_tol=tol)
+    for ex in existing:
+        index.add(ex)
+    for i in range(300):
+        cand = make(1000 + i)
+        expected = any(_is_strict_duplicate(cand, ex, amount_tol=tol) for ex in existing)
+        assert (index.find_duplicate(cand) is not None) == expected
+
+
+def test_import_csv_strict_dedups_against_records_in_date_window(tmp_path):
+    dm = DataManager(str(tmp_path / "window.db"))
+    try:
+        dm.save_record(AccountRecord(id="old_1", type="EXPENDITURE", amount=50.0, date="2025-10-08T00:00:00", remark="Lunch"))
+        dm.save_record(AccountRecord(id="old_2", type="EXPENDITURE", amount=50.0, date="2024-01-01T00:00:00", remark="Lunch"))
+        csv_path = tmp_path / "window.csv"
+        rows = [
+            {"type": "EXPENDITURE", "amount": "50.00", "date": "2025-10-08", "remark": "Lunch"},
+            {"type": "EXPENDITURE", "amount": "50.00", "date": "2025/10/09", "remark": "Lunch"},
+        ]
+        _write_csv(csv_path, rows, header=["type", "amount", "date", "remark"])
+        report = import_csv_strict(str(csv_path), dm)
+        assert report["skipped"] == 1
+        assert report["imported"] == 1
+    finally:
+        dm.close()
@@ -0,0 +1,96 @@
+"""
+Tests for the migration fast path: PRAGMA user_version fingerprint and applied-migration checksums.
+"""
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import data.data_manager as data_manager
+from data.data_manager import DataManager
+from data.migrations import (MigrationChecksumError, apply_migrations, migrations_fingerprint,
+                             schema_is_current)
+
+MIGRATIONS = Path(__file__).resolve().parents[1] / "src" / "db" / "migrations"
+
+
+def test_reopen_skips_migration_runner(tmp_path, monkeypatch):
+    db = str(tmp_path / "app.db")
+    DataManager(db).close()
+
+    calls = []
+    real = data_manager.apply_migrations
+    monkeypatch.setattr(data_manager, "apply_migrations", lambda *a, **kw: calls.append(a) or real(*a, **kw))
+    dm = DataManager(db)
+    try:
+        assert calls == []
+        assert dm.list_categories()
+    finally:
+        dm.close()
+
+    conn = sqlite3.connect(db)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == migrations_fingerprint(str(MIGRATIONS))
+        assert schema_is_current(conn, str(MIGRATIONS))
+        assert all(r[0] for r in conn.execute("SELECT checksum FROM meta_migrations"))
+    finally:
+        conn.close()
+
+
+def test_new_migration_is_picked_up(tmp_path):
+    migrations = tmp_path / "migrations"
+    shutil.copytree(MIGRATIONS, migrations)
+    db = str(tmp_path / "app.db")
+    apply_migrations(db, str(migrations))
+    old = migrations_fingerprint(str(migrations))
+
+    (migrations / "999_extra.sql").write_text("CREATE TABLE extra (id INTEGER);", encoding="utf-8")
+    conn = sqlite3.connect(db)
+    try:
+        # the per-process fingerprint is refreshed by the runner, not by schema_is_current
+        assert apply_migrations(db, str(migrations)) == ["999_extra.sql"]
+        assert migrations_fingerprint(str(migrations)) != old
+        assert schema_is_current(conn, str(migrations))
+    finally:
+        conn.close()
+
+
+def test_edited_applied_migration_is_rejected(tmp_path):
+    migrations = tmp_path / "migrations"
+    shutil.copytree(MIGRATIONS, migrations)
+    db = str(tmp_path / "app.db")
+    apply_migrations(db, str(migrations))
+
+    target = migrations / "002_records_date_id_index.sql"
+    target.write_text(target.read_text(encoding="utf-8") + "\n-- edited\n", encoding="utf-8")
+    with pytest.raises(MigrationChecksumError, match="002_records_date_id_index.sql"):
+        apply_migrations(db, str(migrations))
+
+
+def test_line_ending_change_is_not_an_edit(tmp_path):
+    migrations = tmp_path / "migrations"
+    shutil.copytree(MIGRATIONS, migrations)
+    db = str(tmp_path / "app.db")
+    apply_migrations(db, str(migrations))
+
+    target = migrations / "002_records_date_id_index.sql"
+    text = target.read_bytes().replace(b"\r\n", b"\n")
+    target.write_bytes(text.replace(b"\n", b"\r\n"))
+    assert apply_migrations(db, str(migrations)) == []
+
+
+def test_checksums_backfilled_for_older_databases(tmp_path):
+    db = str(tmp_path / "app.db")
+    apply_migrations(db, str(MIGRATIONS))
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE meta_migrations SET checksum = NULL")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    try:
+        assert not schema_is_current(conn, str(MIGRATIONS))
+        assert apply_migrations(db, str(MIGRATIONS)) == []
+        assert all(r[0] for r in conn.execute("SELECT checksum FROM meta_migrations"))
+        assert schema_is_current(conn, str(MIGRATIONS))
+    finally:
+        conn.close()
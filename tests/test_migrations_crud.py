@@ -5,6 +5,7 @@ from pathlib import Path
 import pytest
 from data.migrations import apply_migrations
 from data.data_manager import DataManager
+from core.coordinator import Coordinator
 from models.category import Category
 from models.account_record import AccountRecord
 from utils_id_for_tests import gen_id_simple
@@ -69,4 +70,138 @@ def test_data_manager_crud(tmp_path):
         rows3 = dm.query_records(start="2025-10-01", end="2025-10-31")
         assert all(r.id != rec.id for r in rows3)
     finally:
-        dm.close()
\ No newline at end of file
+        dm.close()
+
+def test_save_records_bulk_reports_row_failures(tmp_path):
+    dm = DataManager(str(tmp_path / "bulk.db"))
+    try:
+        recs = [
+            AccountRecord(id=f"bulk_{i}", type="EXPENDITURE", amount=10.0 + i, date=f"2025-10-{i + 1:02d}T12:00:00")
+            for i in range(5)
+        ]
+        # invalid amount (validation) and duplicate primary key (constraint) in the same batch
+        recs.insert(2, AccountRecord(id="bulk_bad", type="EXPENDITURE", amount=-1.0, date="2025-10-01"))
+        recs.append(AccountRecord(id="bulk_1", type="INCOME", amount=5.0, date="2025-10-09"))
+        result = dm.save_records(recs, chunk_size=2)
+        assert result.saved == 5
+        assert [(i, rid) for i, rid, _ in result.errors] == [(2, "bulk_bad"), (6, "bulk_1")]
+        assert "validation" in result.errors[0][2]
+        rows = dm.query_records(start="2025-10-01", end="2025-10-31")
+        assert sorted(r.id for r in rows) == [f"bulk_{i}" for i in range(5)]
+        # the failed duplicate must not have overwritten the original row
+        assert next(r for r in rows if r.id == "bulk_1").type == "EXPENDITURE"
+    finally:
+        dm.close()
+
+
+def test_iter_records_streams_date_window(tmp_path):
+    dm = DataManager(str(tmp_path / "iter.db"))
+    try:
+        for i in range(10):
+            dm.save_record(AccountRecord(id=f"it_{i}", type="INCOME", amount=1.0, date=f"2025-10-{i + 1:02d}T00:00:00"))
+        got = [r.id for r in dm.iter_records(start="2025-10-03", end="2025-10-07T23:59:59", batch_size=2)]
+        assert got == ["it_2", "it_3", "it_4", "it_5", "it_6"]
+        # stopping early closes the cursor and leaves the connection usable
+        gen = dm.iter_records(batch_size=3)
+        assert next(gen).id == "it_0"
+        gen.close()
+        assert dm.save_record(AccountRecord(id="it_x", type="INCOME", amount=1.0, date="2025-11-01"))[0]
+    finally:
+        dm.close()
+
+
+def test_iter_record_batches_filters_and_bounds_batch_size(tmp_path):
+    dm = DataManager(str(tmp_path / "batches.db"))
+    try:
+        dm.add_category(Category(id="c_a", name="A", type="EXPENDITURE"))
+        for i in range(9):
+            dm.save_record(AccountRecord(id=f"b_{i}", type="EXPENDITURE", amount=1.0, date=f"2025-10-{i + 1:02d}",
+                                         category_id="c_a" if i % 2 == 0 else None))
+        batches = list(dm.iter_record_batches(category_id="c_a", order_by="date DESC", batch_size=2))
+        assert [len(b) for b in batches] == [2, 2, 1]
+        assert [r.id for b in batches for r in b] == ["b_8", "b_6", "b_4", "b_2", "b_0"]
+        with pytest.raises(ValueError):
+            next(dm.iter_record_batches(batch_size=0))
+    finally:
+        dm.close()
+
+
+def test_record_views_join_category_in_one_query(tmp_path):
+    dm = DataManager(str(tmp_path / "views.db"))
+    try:
+        dm.add_category(Category(id="v_cat", name="View Cat", type="EXPENDITURE"))
+        dm.save_record(AccountRecord(id="v1", type="EXPENDITURE", amount=2.5, date="2025-10-01", category_id="v_cat", remark="x"))
+        dm.save_record(AccountRecord(id="v2", type="INCOME", amount=4.0, date="2025-10-02"))
+        page, token = dm.query_record_views_page(limit=1)
+        assert [(v.id, v.category_name) for v in page] == [("v2", None)]
+        page2, token2 = dm.query_record_views_page(limit=1, after=token)
+        assert page2[0].category_name == "View Cat" and page2[0].category_type == "EXPENDITURE"
+        assert page2[0].to_record() == dm.query_records(category_id="v_cat")[0]
+        assert token2 is None
+        views = list(dm.iter_record_views(order_by="id DESC", batch_size=1))
+        assert [(v.id, v.category_name) for v in views] == [("v2", None), ("v1", "View Cat")]
+    finally:
+        dm.close()
+
+
+def test_category_cache_load_racing_a_write_is_not_published(tmp_path, monkeypatch):
+    dm = DataManager(str(tmp_path / "catrace.db"))
+    try:
+        real_query = dm.driver.query
+
+        def query_then_write(sql, params=()):
+            rows = real_query(sql, params)
+            # another thread adds a category after the load read its snapshot
+            monkeypatch.setattr(dm.driver, "query", real_query)
+            assert dm.add_category(Category(id="cc_race", name="Race", type="INCOME"))[0]
+            return rows
+        monkeypatch.setattr(dm.driver, "query", query_then_write)
+        assert not dm.has_category("cc_race")  # the stale snapshot answers this call only
+        assert dm.has_category("cc_race")
+    finally:
+        dm.close()
+
+
+def test_category_cache_sees_categories_added_by_another_connection(tmp_path):
+    db = str(tmp_path / "catext.db")
+    dm = DataManager(db)
+    try:
+        coord = Coordinator(dm)
+        assert not dm.has_category("cat_x")  # loads the cache
+        other = DataManager(db)  # e.g. the CLI in another process
+        try:
+            assert other.add_category(Category(id="cat_x", name="X", type="EXPENDITURE"))[0]
+        finally:
+            other.close()
+        rec = AccountRecord(id="ext1", type="EXPENDITURE", amount=1.0, date="2025-10-01", category_id="cat_x")
+        assert coord.create_record(rec) == (True, "")
+        assert dm.get_category("cat_x").name == "X"
+    finally:
+        dm.close()
+
+
+def test_category_cache_write_through(tmp_path):
+    dm = DataManager(str(tmp_path / "catcache.db"))
+    try:
+        dm.list_categories()
+        assert dm.category_cache_stats()["misses"] == 1
+        assert dm.has_category("cat_food")
+        assert not dm.has_category("nope")
+        assert dm.category_cache_stats()["misses"] == 1
+
+        dm.add_category(Category(id="cc1", name="Alpha", type="INCOME"))
+        assert dm.get_category("cc1").name == "Alpha"
+        dm.update_category(Category(id="cc1", name="Beta", type="INCOME"))
+        fetched = dm.get_category("cc1")
+        fetched.name = "mutated"  # callers get copies
+        assert dm.get_category("cc1").name == "Beta"
+        assert [c.id for c in dm.list_categories()] == sorted((c.id for c in dm.list_categories()),
+                                                             key=lambda i: dm.get_category(i).name)
+        dm.delete_category("cc1")
+        assert not dm.has_category("cc1")
+        # a failed insert leaves the cache untouched
+        assert not dm.add_category(Category(id="cat_food", name="dup", type="EXPENDITURE"))[0]
+        assert dm.get_category("cat_food").name != "dup"
+        assert dm.category_cache_stats()["misses"] == 1
+    finally:
+        dm.close()
@@ -0,0 +1,97 @@
+"""
+Tests for integer-cents amounts: conversion helpers, the 004 migration backfill,
+exact aggregation and cents-based strict dedup.
+"""
+import shutil
+import sqlite3
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from data.backup_importer import _is_strict_duplicate
+from data.data_manager import DataManager
+from data.migrations import apply_migrations
+from models.account_record import AccountRecord
+from services.statistics_service import StatisticsService
+from utils.money import format_cents, from_cents, to_cents
+
+MIGRATIONS = Path(__file__).resolve().parents[1] / "src" / "db" / "migrations"
+
+
+def test_to_cents_rounding_and_errors():
+    assert to_cents(12.34) == 1234
+    assert to_cents(0.1) + to_cents(0.2) == 30
+    assert to_cents(1.005) == 101  # half away from zero on the decimal value, not the binary one
+    assert to_cents("-2.675") == -268
+    assert to_cents(Decimal("3.5")) == 350
+    assert to_cents(7) == 700
+    for bad in (float("nan"), float("inf"), "abc", True):
+        with pytest.raises(ValueError):
+            to_cents(bad)
+    assert from_cents(1234) == 12.34
+    assert format_cents(-5) == "-0.05" and format_cents(123456) == "1234.56"
+
+
+def test_validate_requires_a_whole_cent():
+    assert AccountRecord(id="a", type="INCOME", amount=0.01, date="2025-01-01").validate()
+    assert not AccountRecord(id="b", type="INCOME", amount=0.004, date="2025-01-01").validate()
+    assert not AccountRecord(id="c", type="INCOME", amount=float("inf"), date="2025-01-01").validate()
+
+
+def test_migration_backfills_existing_rows_in_chunks(tmp_path):
+    old_dir = tmp_path / "old_migrations"
+    old_dir.mkdir()
+    for p in sorted(MIGRATIONS.glob("00[0-3]_*.sql")):
+        shutil.copy(p, old_dir / p.name)
+    db = tmp_path / "legacy.db"
+    apply_migrations(str(db), str(old_dir))
+    conn = sqlite3.connect(str(db))
+    conn.executemany("INSERT INTO records (id, type, amount, date) VALUES (?, 'EXPENDITURE', ?, '2025-10-01')",
+                     [(f"r{i}", 0.1) for i in range(10)] + [("big", 1.005)])
+    conn.commit()
+    conn.close()
+
+    applied = apply_migrations(str(db), str(MIGRATIONS))
+    assert applied[:2] == ["004_amount_cents.sql", "005_backfill_amount_cents.py"]
+    dm = DataManager(str(db))
+    try:
+        cents = dict(dm.driver.execute("SELECT id, amount_cents FROM records").fetchall())
+        assert cents["r0"] == 10 and cents["big"] == 101
+        assert dm.check_daily_rollup() == []
+        assert StatisticsService(dm).total_by_type()["EXPENDITURE"] == 2.01
+        # an interrupted backfill is picked up again on the next run
+        dm.driver.execute("UPDATE records SET amount_cents = NULL WHERE id IN ('r1', 'r2', 'r3')")
+        dm.driver.execute("UPDATE meta_migrations SET status = 'running', progress_key = NULL "
+                          "WHERE version = '005_backfill_amount_cents.py'")
+        dm.driver.commit()
+        assert apply_migrations(str(db), str(MIGRATIONS)) == ["005_backfill_amount_cents.py"]
+        assert dm.driver.execute("SELECT COUNT(*) FROM records WHERE amount_cents IS NULL").fetchone()[0] == 0
+        assert dm.check_daily_rollup() == []
+    finally:
+        dm.close()
+
+
+def test_sums_are_exact(tmp_path):
+    dm = DataManager(str(tmp_path / "exact.db"))
+    try:
+        dm.save_records([AccountRecord(id=f"r{i}", type="INCOME", amount=0.1, date=f"2025-10-{1 + i % 28:02d}T10:00:00")
+                         for i in range(1000)])
+        stats = StatisticsService(dm)
+        assert stats.total_by_type()["INCOME"] == 100.0
+        # a time-bounded range sums the cut edge days from records and the rest from the rollup
+        assert stats.total_by_type(start="2025-10-01T00:00:00", end="2025-10-31T23:59:59")["INCOME"] == 100.0
+        assert sum(float(r.amount) for r in dm.iter_records()) != 100.0  # what float summing used to give
+    finally:
+        dm.close()
+
+
+def test_strict_duplicate_tolerance_is_whole_cents():
+    base = dict(type="EXPENDITURE", date="2025-10-01T00:00:00", category_id=None, remark=None)
+    a = AccountRecord(id="a", amount=1.00, **base)
+    b = AccountRecord(id="b", amount=1.01, **base)
+    c = AccountRecord(id="c", amount=1.02, **base)
+    # 1.01 - 1.00 is 0.010000000000000009 as floats; in cents it is exactly the tolerance
+    assert _is_strict_duplicate(b, a, amount_tol=0.01)
+    assert not _is_strict_duplicate(c, a, amount_tol=0.01)
+    assert not _is_strict_duplicate(b, a, amount_tol=0.0)
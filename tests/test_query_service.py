@@ -327,3 +327,74 @@ class TestQueryService:
         assert result[1].id == rec2.id
         assert result[1].amount == 1000.0
         assert result[1].remark == "Monthly salary"
+    
+    # ==================== Tests for query_page() ====================
+    
+    @pytest.mark.parametrize("descending", [True, False])
+    def test_query_page_walks_all_records_with_tokens(self, setup_test_db, descending):
+        """Test keyset pagination visits every record exactly once, ties on date broken by id."""
+        dm = setup_test_db
+        ids = []
+        for i in range(7):
+            # pairs of records share a date to exercise the id tie-break
+            rec = AccountRecord(id=f"page_{i}", type="EXPENDITURE", amount=1.0 + i,
+                                date=f"2025-10-{i // 2 + 1:02d}T12:00:00", category_id="cat_food")
+            dm.save_record(rec)
+            ids.append(rec.id)
+        
+        qs = QueryService(dm)
+        seen = []
+        token = None
+        pages = 0
+        while True:
+            page, token = qs.query_page(limit=3, after=token, descending=descending)
+            seen.extend(r.id for r in page)
+            pages += 1
+            if token is None:
+                break
+        
+        assert pages == 3
+        assert seen == (ids[::-1] if descending else ids)
+    
+    def test_query_page_applies_filters(self, setup_test_db):
+        """Test query_page honours date and category filters."""
+        dm = setup_test_db
+        dm.save_record(AccountRecord(id="pf1", type="EXPENDITURE", amount=1.0, date="2025-10-01T00:00:00", category_id="cat_food"))
+        dm.save_record(AccountRecord(id="pf2", type="EXPENDITURE", amount=1.0, date="2025-10-02T00:00:00", category_id="cat_transport"))
+        dm.save_record(AccountRecord(id="pf3", type="EXPENDITURE", amount=1.0, date="2025-11-02T00:00:00", category_id="cat_food"))
+        
+        qs = QueryService(dm)
+        page, token = qs.query_page("2025-10-01T00:00:00", "2025-10-31T23:59:59", category_id="cat_food", limit=5)
+        
+        assert [r.id for r in page] == ["pf1"]
+        assert token is None
+    
+    def test_query_page_sorted_by_amount(self, setup_test_db):
+        """Test keyset pagination with amount as the sort key, ties broken by id."""
+        dm = setup_test_db
+        amounts = [5.0, 1.5, 5.0, 3.0, 10.0]
+        for i, amount in enumerate(amounts):
+            dm.save_record(AccountRecord(id=f"amt_{i}", type="EXPENDITURE", amount=amount,
+                                         date="2025-10-01T12:00:00", category_id="cat_food"))
+        
+        qs = QueryService(dm)
+        first, token = qs.query_page(limit=2, descending=False, sort_key="amount")
+        second, token2 = qs.query_page(limit=2, after=token, descending=False, sort_key="amount")
+        third, token3 = qs.query_page(limit=2, after=token2, descending=False, sort_key="amount")
+        
+        assert [r.id for r in first + second + third] == ["amt_1", "amt_3", "amt_0", "amt_2", "amt_4"]
+        assert token == (3.0, "amt_3")
+        assert token3 is None
+
+    def test_query_page_sort_keys_use_an_index(self, setup_test_db):
+        """Test every keyset sort key seeks through a (key, id) index instead of sorting."""
+        dm = setup_test_db
+        # slow_query_ms=0 logs every statement together with its query plan
+        stats = dm.driver.enable_instrumentation(slow_query_ms=0)
+        for sort_key in ("date", "amount", "type"):
+            for descending in (True, False):
+                dm.query_records_page(limit=10, after=(0, ""), descending=descending, sort_key=sort_key)
+        plans = [q["plan"] for q in stats.snapshot()["slow_queries"] if "FROM records" in q["sql"]]
+        assert len(plans) == 6
+        for plan in plans:
+            assert not any("TEMP B-TREE" in line for line in plan), plan
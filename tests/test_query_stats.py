@@ -0,0 +1,68 @@
+"""
+Tests for SQLiteDriver statement instrumentation and the slow-query log.
+"""
+import json
+import logging
+
+from data.data_manager import DataManager
+from data.query_stats import QueryStats, normalize_sql
+from models.account_record import AccountRecord
+
+
+def test_normalize_sql_groups_literals():
+    assert normalize_sql("SELECT *  FROM records\n WHERE id = 'a' AND amount > 1.5;") == \
+        "SELECT * FROM records WHERE id = ? AND amount > ?"
+    assert normalize_sql("SELECT * FROM t WHERE id IN (?, ?, ?)") == "SELECT * FROM t WHERE id IN (?, ...)"
+    # identifiers containing digits are left alone
+    assert normalize_sql("SELECT substr(date, 1, 7) FROM t1") == "SELECT substr(date, ?, ?) FROM t1"
+
+
+def test_histogram_and_snapshot_order():
+    stats = QueryStats()
+    stats.record("SELECT 1", 0.05, rows=1)
+    stats.record("SELECT 2", 20.0, rows=3)
+    stats.record("UPDATE t SET a = 1", 2000.0)
+    snap = stats.snapshot()
+    assert [s["sql"] for s in snap["statements"]] == ["UPDATE t SET a = ?", "SELECT ?"]
+    sel = snap["statements"][1]
+    assert sel["calls"] == 2 and sel["rows"] == 4
+    assert sel["histogram"] == {"<=0.1ms": 1, "<=50ms": 1}
+    assert snap["statements"][0]["histogram"] == {">1000ms": 1}
+
+
+def test_driver_records_statements_and_rows(tmp_path):
+    dm = DataManager(str(tmp_path / "i.db"), instrument=True)
+    try:
+        dm.save_records([AccountRecord(id=f"r{i}", type="INCOME", amount=1.0 + i, date="2025-10-01")
+                         for i in range(5)])
+        dm.query_records(limit=3)
+        list(dm.iter_records())
+        snap = json.loads(dm.driver.dump_stats())
+        by_sql = {s["sql"]: s for s in snap["statements"]}
+        insert = next(s for sql, s in by_sql.items() if sql.startswith("INSERT INTO records"))
+        assert insert["calls"] == 1 and insert["rows"] == 5
+        select = next(s for sql, s in by_sql.items() if sql.startswith("SELECT") and "LIMIT" in sql)
+        assert select["rows"] == 3
+        assert snap["slow_queries"] == []
+
+        dm.driver.disable_instrumentation()
+        dm.query_records()
+        assert dm.driver.dump_stats() is None
+    finally:
+        dm.close()
+
+
+def test_slow_query_log_includes_query_plan(tmp_path, caplog):
+    dm = DataManager(str(tmp_path / "s.db"), slow_query_ms=0)
+    try:
+        with caplog.at_level(logging.WARNING, logger="data.sqlite_driver"):
+            dm.query_records(start="2025-01-01")
+            dm.driver.query("SELECT * FROM records WHERE remark = ?", ("x",))
+        slow = dm.driver.stats.snapshot()["slow_queries"]
+        plans = {e["sql"]: e["plan"] for e in slow}
+        assert any("USING INDEX idx_records_date" in line
+                   for sql, plan in plans.items() if "date >= ?" in sql for line in plan)
+        assert plans["SELECT * FROM records WHERE remark = ?"] == ["SCAN records"]
+        assert "SCAN records" in caplog.text
+    finally:
+        dm.close()
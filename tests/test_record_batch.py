@@ -0,0 +1,68 @@
+"""
+Tests for CompactRecord and the columnar RecordBatch.
+"""
+import pytest
+
+from data.data_manager import DataManager
+from models.account_record import AccountRecord, CompactRecord
+from models.record_batch import RecordBatch
+
+
+def _records():
+    return [
+        AccountRecord(id="r1", type="EXPENDITURE", amount=12.5, date="2025-10-01T08:00:00", category_id="cat_food", remark="a"),
+        AccountRecord(id="r2", type="EXPENDITURE", amount=0.1, date="2025-10-02T09:00:00", category_id="cat_food"),
+        AccountRecord(id="r3", type="INCOME", amount=100.0, date="2025-11-01T10:00:00"),
+    ]
+
+
+def test_compact_record_round_trip():
+    rec = _records()[0]
+    c = CompactRecord.from_record(rec)
+    assert not hasattr(c, "__dict__")
+    assert c.validate() and c.amount_cents == 1250
+    assert c.to_record() == rec
+    assert c == CompactRecord.from_record(rec) and c != CompactRecord.from_record(_records()[1])
+    with pytest.raises(AttributeError):
+        c.extra = 1
+
+
+def test_batch_columns_views_and_sums():
+    batch = RecordBatch.from_records(_records())
+    assert len(batch) == 3
+    assert batch.amount_cents.typecode == "q" and list(batch.amount_cents) == [1250, 10, 10000]
+    # interned: every row shares one string object per category
+    assert batch.category_ids[0] is batch.category_ids[1]
+    row = batch[-1]
+    assert (row.id, row.type, row.amount, row.category_id) == ("r3", "INCOME", 100.0, None)
+    assert [r.to_record() for r in batch] == _records() == batch.to_records()
+    with pytest.raises(IndexError):
+        batch[3]
+    assert batch.total_cents() == 11260
+    assert batch.sum_cents_by("type") == {"EXPENDITURE": 1260, "INCOME": 10000}
+    assert batch.sum_cents_by("category_id") == {"cat_food": 1260, None: 10000}
+    assert batch.sum_cents_by("month") == {"2025-10": 1260, "2025-11": 10000}
+    with pytest.raises(ValueError):
+        batch.sum_cents_by("week")
+
+
+def test_data_manager_streams_columns_and_compact_records(tmp_path):
+    dm = DataManager(str(tmp_path / "cols.db"))
+    try:
+        dm.save_records(_records())
+        batches = list(dm.iter_record_columns(batch_size=2))
+        assert [len(b) for b in batches] == [2, 1]
+        assert [r.to_record() for b in batches for r in b] == [
+            AccountRecord(**{**r.__dict__, "created_at": got.created_at})
+            for r, got in zip(_records(), dm.iter_records())
+        ]
+        totals = {}
+        for b in dm.iter_record_columns():
+            for k, c in b.sum_cents_by("category_id").items():
+                totals[k] = totals.get(k, 0) + c
+        assert {k: v / 100 for k, v in totals.items()} == dict(dm.aggregate_amounts("category_id"))
+        compact = list(dm.iter_records(compact=True))
+        assert all(isinstance(c, CompactRecord) for c in compact)
+        assert [c.to_record() for c in compact] == list(dm.iter_records())
+    finally:
+        dm.close()
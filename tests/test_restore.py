@@ -0,0 +1,204 @@
+"""
+Tests for DataManager.restore: validation, migration of older backups and the live swap.
+"""
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import data.data_manager as data_manager
+from data.backup import online_backup
+from data.data_manager import DataManager
+from data.migrations import MigrationChecksumError, apply_migrations
+from models.account_record import AccountRecord
+from models.category import Category
+
+MIGRATIONS = Path(__file__).resolve().parents[1] / "src" / "db" / "migrations"
+
+
+def _rec(rid, amount=10.0):
+    return AccountRecord(id=rid, type="EXPENDITURE", amount=amount, date="2025-10-01T12:00:00")
+
+
+@pytest.mark.parametrize("concurrent,compress", [(False, None), (True, "gzip"), (True, "xz")])
+def test_restore_swaps_database_and_invalidates_caches(tmp_path, concurrent, compress):
+    dm = DataManager(str(tmp_path / "app.db"), concurrent=concurrent)
+    try:
+        dm.save_record(_rec("kept"))
+        backup = tmp_path / "snap.db"
+        assert dm.backup(str(backup), compress=compress)[0]
+        dm.save_record(_rec("lost"))
+        dm.add_category(Category(id="cat_new", name="新", type="EXPENDITURE"))
+        assert dm.has_category("cat_new")
+        gen = dm.generation
+
+        ok, msg = dm.restore(str(backup))
+        assert ok, msg
+        assert [r.id for r in dm.iter_records()] == ["kept"]
+        assert not dm.has_category("cat_new")
+        assert dm.generation > gen
+        assert dict(dm.aggregate_amounts("type")) == {"EXPENDITURE": 10.0}
+        # the replaced database was kept, and the restored one is writable
+        assert len(list((tmp_path / "backups").glob("app_pre_restore_*.db"))) == 1
+        assert dm.save_record(_rec("after"))[0]
+        assert not list(tmp_path.glob("app.db.restore*"))
+    finally:
+        dm.close()
+
+
+def test_restore_rejects_invalid_or_newer_backups(tmp_path):
+    dm = DataManager(str(tmp_path / "app.db"))
+    try:
+        dm.save_record(_rec("live"))
+        garbage = tmp_path / "garbage.db"
+        garbage.write_bytes(b"not a database" * 100)
+        ok, msg = dm.restore(str(garbage))
+        assert not ok and "not a database" in msg
+
+        newer = tmp_path / "newer.db"
+        assert dm.backup(str(newer))[0]
+        conn = sqlite3.connect(str(newer))
+        conn.execute("INSERT INTO meta_migrations (version, applied_at) VALUES ('999_future.sql', 'x')")
+        conn.commit()
+        conn.close()
+        ok, msg = dm.restore(str(newer))
+        assert not ok and "999_future.sql" in msg
+
+        ok, msg = dm.restore(str(tmp_path / "missing.db"))
+        assert not ok
+        assert [r.id for r in dm.iter_records()] == ["live"]
+        assert not (tmp_path / "backups").exists() or not list((tmp_path / "backups").glob("*pre_restore*"))
+    finally:
+        dm.close()
+
+
+def test_restore_migrates_older_backup(tmp_path):
+    old_dir = tmp_path / "old"
+    old_dir.mkdir()
+    for p in sorted(MIGRATIONS.glob("00[0-2]_*.sql")):
+        shutil.copy(p, old_dir / p.name)
+    old = tmp_path / "old.db"
+    apply_migrations(str(old), str(old_dir))
+    conn = sqlite3.connect(str(old))
+    conn.execute("INSERT INTO records (id, type, amount, date) VALUES ('o1', 'INCOME', 2.5, '2024-01-01')")
+    conn.commit()
+    conn.close()
+
+    dm = DataManager(str(tmp_path / "app.db"))
+    try:
+        ok, msg = dm.restore(str(old), keep_current=False)
+        assert ok, msg
+        assert dm.driver.execute("SELECT amount_cents FROM records WHERE id = 'o1'").fetchone()[0] == 250
+        assert dm.check_daily_rollup() == []
+    finally:
+        dm.close()
+
+
+def test_restore_times_out_while_a_reader_is_busy(tmp_path):
+    dm = DataManager(str(tmp_path / "app.db"), concurrent=True, read_pool_size=1)
+    try:
+        dm.save_records([_rec(f"r{i}") for i in range(10)])
+        backup = tmp_path / "b.db"
+        dm.backup(str(backup))
+        it = dm.iter_records(batch_size=1)
+        next(it)  # holds the only pooled reader
+        ok, msg = dm.restore(str(backup), timeout=0.2)
+        assert not ok and "busy" in msg
+        # the pre-restore backup is only taken once the connections are paused
+        assert not list((tmp_path / "backups").glob("*pre_restore*"))
+        it.close()
+        assert dm.restore(str(backup), keep_current=False)[0]
+    finally:
+        dm.close()
+
+
+def test_pre_restore_backups_are_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_manager, "PRE_RESTORE_BACKUPS_KEEP", 2)
+    dm = DataManager(str(tmp_path / "app.db"))
+    try:
+        backup = tmp_path / "b.db"
+        assert dm.backup(str(backup))[0]
+        for _ in range(3):
+            assert dm.restore(str(backup))[0]
+        assert len(list((tmp_path / "backups").glob("app_pre_restore_*.db"))) == 2
+    finally:
+        dm.close()
+
+
+def test_restore_reports_migration_errors(tmp_path, monkeypatch):
+    dm = DataManager(str(tmp_path / "app.db"))
+    try:
+        backup = tmp_path / "b.db"
+        assert dm.backup(str(backup))[0]
+
+        def fail(*args, **kwargs):
+            raise MigrationChecksumError("migration 002 was modified")
+        monkeypatch.setattr(data_manager, "apply_migrations", fail)
+        assert dm.restore(str(backup)) == (False, "migration 002 was modified")
+    finally:
+        dm.close()
+
+
+def test_restore_leaves_wal_of_other_connections_alone(tmp_path):
+    db = str(tmp_path / "app.db")
+    dm = DataManager(db, concurrent=True, busy_timeout_ms=100)
+    try:
+        dm.save_record(_rec("live"))
+        backup = tmp_path / "b.db"
+        assert dm.backup(str(backup))[0]
+        other = sqlite3.connect(db)
+        try:
+            other.execute("BEGIN")
+            other.execute("SELECT COUNT(*) FROM records").fetchone()
+            ok, msg = dm.restore(str(backup), keep_current=False)
+            assert not ok and "busy" in msg
+        finally:
+            other.close()
+        assert [r.id for r in dm.iter_records()] == ["live"]
+        assert dm.restore(str(backup), keep_current=False)[0]
+    finally:
+        dm.close()
+
+
+def test_restore_pause_does_not_copy_the_database(tmp_path, monkeypatch):
+    dm = DataManager(str(tmp_path / "app.db"), concurrent=True)
+    try:
+        dm.save_records([_rec(f"r{i}") for i in range(200)])
+        backup = tmp_path / "b.db"
+        assert dm.backup(str(backup))[0]
+        live_inode = os.stat(tmp_path / "app.db").st_ino
+
+        # a full copy of the live database would take a second here
+        def slow_backup(*args, **kwargs):
+            time.sleep(1.0)
+            return online_backup(*args, **kwargs)
+        monkeypatch.setattr(data_manager, "online_backup", slow_backup)
+
+        stop = threading.Event()
+        stalls = []
+
+        def reader():
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                dm.driver.query("SELECT COUNT(*) FROM categories")
+                stalls.append(time.perf_counter() - t0)
+                time.sleep(0.001)
+        t = threading.Thread(target=reader)
+        t.start()
+        try:
+            ok, msg = dm.restore(str(backup))
+        finally:
+            stop.set()
+            t.join()
+        assert ok, msg
+        assert max(stalls) < 0.5
+        # the replaced file itself was moved aside, not copied
+        kept = list((tmp_path / "backups").glob("app_pre_restore_*.db"))
+        assert [os.stat(p).st_ino for p in kept] == [live_inode]
+        assert len(list(dm.iter_records())) == 200
+    finally:
+        dm.close()
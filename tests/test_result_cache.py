@@ -0,0 +1,113 @@
+"""
+Tests for ResultCache and the generation-keyed caching in the services.
+"""
+import threading
+
+import pytest
+from data.data_manager import DataManager
+from services.query_service import QueryService
+from services.statistics_service import StatisticsService
+from models.account_record import AccountRecord
+from models.category import Category
+from utils.result_cache import ResultCache
+
+
+@pytest.fixture
+def dm(tmp_path):
+    dm = DataManager(str(tmp_path / "cache.db"))
+    yield dm
+    dm.close()
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: 0)  # hit, "a" becomes most recent
+    cache.get_or_compute("c", lambda: 3)  # evicts "b"
+    assert cache.get_or_compute("b", lambda: 20) == 20
+    assert cache.stats() == {"hits": 1, "misses": 4, "size": 2, "maxsize": 2}
+
+
+def test_zero_size_cache_disables_caching():
+    cache = ResultCache(maxsize=0)
+    calls = []
+    for _ in range(3):
+        cache.get_or_compute("k", lambda: calls.append(1))
+    assert len(calls) == 3
+
+
+def test_generation_bumps_only_on_successful_writes(dm):
+    g0 = dm.generation
+    dm.add_category(Category(id="c1", name="C1", type="INCOME"))
+    assert dm.generation == g0 + 1
+    assert not dm.add_category(Category(id="c1", name="dup", type="INCOME"))[0]
+    assert not dm.save_record(AccountRecord(id="bad", type="INCOME", amount=0.0, date="2025-01-01"))[0]
+    assert dm.generation == g0 + 1
+    dm.save_records([AccountRecord(id=f"r{i}", type="INCOME", amount=1.0, date="2025-01-01") for i in range(3)])
+    assert dm.generation > g0 + 1
+
+
+def test_statistics_served_from_cache_until_next_write(dm):
+    stats = StatisticsService(dm)
+    dm.save_record(AccountRecord(id="r1", type="INCOME", amount=10.0, date="2025-10-01"))
+    assert stats.total_by_type()["INCOME"] == 10.0
+    result = stats.total_by_type()
+    result["INCOME"] = -1  # callers get copies
+    assert stats.total_by_type()["INCOME"] == 10.0
+    assert stats.cache.hits == 2
+
+    dm.save_record(AccountRecord(id="r2", type="INCOME", amount=5.0, date="2025-10-02"))
+    assert stats.total_by_type()["INCOME"] == 15.0
+    assert stats.cache.misses == 2
+
+
+def test_query_results_cached_and_copied(dm):
+    qs = QueryService(dm, cache=ResultCache(maxsize=8))
+    dm.save_record(AccountRecord(id="r1", type="INCOME", amount=10.0, date="2025-10-01", remark="x"))
+    first = qs.query_by_date("2025-10-01", "2025-10-31")
+    first[0].remark = "changed"
+    second = qs.query_by_date("2025-10-01", "2025-10-31")
+    assert second[0].remark == "x"
+    assert qs.cache.stats()["hits"] == 1
+
+
+def test_commits_from_another_connection_invalidate_cache(dm, tmp_path):
+    stats = StatisticsService(dm)
+    qs = QueryService(dm)
+    assert stats.total_by_type()["INCOME"] == 0.0
+    assert qs.query_by_date("2025-01-01", "2025-12-31") == []
+
+    # e.g. the CLI importing from cron: same file, different connection
+    other = DataManager(str(tmp_path / "cache.db"))
+    try:
+        other.save_record(AccountRecord(id="ext", type="INCOME", amount=5.0, date="2025-10-01T10:00:00"))
+    finally:
+        other.close()
+
+    assert stats.total_by_type()["INCOME"] == 5.0
+    assert [r.id for r in qs.query_by_date("2025-01-01", "2025-12-31")] == ["ext"]
+    gen = dm.current_generation()
+    assert dm.current_generation() == gen  # unchanged without new commits
+
+
+def test_cached_statistics_dont_wait_for_writes(tmp_path):
+    dm = DataManager(str(tmp_path / "busy.db"), concurrent=True)
+    try:
+        stats = StatisticsService(dm)
+        dm.save_record(AccountRecord(id="r1", type="INCOME", amount=1.0, date="2025-10-01T10:00:00"))
+        assert stats.total_by_type()["INCOME"] == 1.0
+        results = []
+        # a long write in progress holds the writer's lock (and an open transaction)
+        with dm.driver.write_lock:
+            dm.driver.execute("BEGIN")
+            dm.driver.execute("INSERT INTO records (id, type, amount, amount_cents, date) "
+                              "VALUES ('w', 'INCOME', 2.0, 200, '2025-10-02')")
+            t = threading.Thread(target=lambda: results.append(stats.total_by_type()["INCOME"]))
+            t.start()
+            t.join(5)
+            assert not t.is_alive()
+            dm.driver.rollback()
+        assert results == [1.0]
+    finally:
+        dm.close()
@@ -280,3 +280,35 @@ class TestStatisticsService:
         
         assert len(result) == 1
         assert result["2025-10-01"] == 60.0
+    
+    # ==================== Tests for SQL pushdown / filters ====================
+    
+    def test_statistics_cover_more_than_one_page_of_records(self, setup_test_db):
+        """Test aggregations include every record, not just the first query_records page."""
+        dm = setup_test_db
+        for i in range(250):
+            dm.save_record(AccountRecord(id=f"many_{i}", type="EXPENDITURE", amount=2.0,
+                                         date=f"2025-{i % 12 + 1:02d}-01T10:00:00", category_id="cat_food"))
+        
+        stats = StatisticsService(dm)
+        
+        assert stats.total_by_type()["EXPENDITURE"] == 500.0
+        assert stats.by_category() == {"cat_food": 500.0}
+        assert sum(stats.timeseries(period="month").values()) == 500.0
+    
+    def test_statistics_date_and_category_filters(self, setup_test_db):
+        """Test optional date-range and category filters on each statistic."""
+        dm = setup_test_db
+        dm.save_record(AccountRecord(id="f1", type="EXPENDITURE", amount=10.0, date="2025-09-30T10:00:00", category_id="cat_food"))
+        dm.save_record(AccountRecord(id="f2", type="EXPENDITURE", amount=20.0, date="2025-10-01T10:00:00", category_id="cat_food"))
+        dm.save_record(AccountRecord(id="f3", type="EXPENDITURE", amount=40.0, date="2025-10-02T10:00:00", category_id="cat_transport"))
+        dm.save_record(AccountRecord(id="f4", type="INCOME", amount=80.0, date="2025-10-03T10:00:00"))
+        
+        stats = StatisticsService(dm)
+        
+        assert stats.total_by_type(start="2025-10-01") == {"INCOME": 80.0, "EXPENDITURE": 60.0}
+        assert stats.total_by_type(category_id="cat_food") == {"INCOME": 0.0, "EXPENDITURE": 30.0}
+        assert stats.by_category(start="2025-10-01", end="2025-10-02T23:59:59") == {"cat_food": 20.0, "cat_transport": 40.0}
+        assert stats.by_category(start="2025-10-03") == {None: 80.0}
+        assert stats.timeseries(period="day", category_id="cat_food") == {"2025-09-30": 10.0, "2025-10-01": 20.0}
+        assert stats.timeseries(period="year", end="2025-09-30T23:59:59") == {"2025": 10.0}
@@ -0,0 +1,100 @@
+"""
+Tests for the write-behind (group-commit) mode of Coordinator.
+"""
+import threading
+import pytest
+from data.data_manager import DataManager
+from core.coordinator import Coordinator
+from core.write_behind import WriteBehindQueue
+from models.account_record import AccountRecord
+
+
+@pytest.fixture
+def dm(tmp_path):
+    dm = DataManager(str(tmp_path / "wb.db"))
+    yield dm
+    dm.close()
+
+
+def _rec(i, **kw):
+    fields = dict(id=f"wb_{i}", type="EXPENDITURE", amount=1.0, date="2025-10-01T12:00:00")
+    fields.update(kw)
+    return AccountRecord(**fields)
+
+
+def test_async_writes_are_coalesced_and_resolve_with_results(dm):
+    coord = Coordinator(dm, write_behind=True, max_batch=50, max_delay_ms=200)
+    try:
+        gen_before = dm.generation
+        results = []
+        futures = [coord.create_record_async(_rec(i), callback=results.append) for i in range(100)]
+        futures.append(coord.create_record_async(_rec(0)))  # duplicate id
+        futures.append(coord.create_record_async(_rec(200, category_id="no_such_cat")))
+        assert coord.flush(timeout=5)
+        outcomes = [f.result(timeout=5) for f in futures]
+        assert outcomes[:100] == [(True, "")] * 100
+        assert outcomes[100][0] is False and outcomes[100][1].startswith("保存失败")
+        assert outcomes[101] == (False, "分类不存在: no_such_cat")
+        assert len(results) == 100
+        assert len(dm.query_records(limit=1000)) == 100
+        # far fewer commits than records
+        assert dm.generation - gen_before <= 5
+    finally:
+        coord.close()
+
+
+def test_sync_create_record_goes_through_queue(dm):
+    coord = Coordinator(dm, write_behind=True, max_delay_ms=1)
+    try:
+        assert coord.create_record(_rec(1)) == (True, "")
+        assert coord.create_record(_rec(2, amount=-1)) == (False, "保存失败: validation failed")
+    finally:
+        coord.close()
+
+
+def test_close_writes_everything_accepted(dm):
+    coord = Coordinator(dm, write_behind=True, max_batch=7, max_delay_ms=1000)
+    threads = [threading.Thread(target=lambda k=k: [coord.create_record_async(_rec(k * 100 + i)) for i in range(25)])
+               for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    coord.close()
+    assert len(dm.query_records(limit=1000)) == 100
+    with pytest.raises(RuntimeError):
+        coord.create_record_async(_rec(999))
+
+
+def test_flush_racing_close_returns(dm, monkeypatch):
+    release = threading.Event()
+    real_save = dm.save_records
+
+    def slow_save(*args, **kwargs):
+        release.wait(5)
+        return real_save(*args, **kwargs)
+    monkeypatch.setattr(dm, "save_records", slow_save)
+
+    wb = WriteBehindQueue(dm, max_batch=1, max_delay_ms=0)
+    fut = wb.submit(_rec(1))
+    closer = threading.Thread(target=wb.close)
+    closer.start()
+    while not wb._closed:
+        pass
+    flushed = []
+    flusher = threading.Thread(target=lambda: flushed.append(wb.flush(timeout=5)))
+    flusher.start()
+    release.set()
+    flusher.join(10)
+    closer.join(10)
+    assert not flusher.is_alive()
+    assert flushed == [True]
+    assert fut.result(timeout=1) == (True, "")
+
+
+def test_without_write_behind_future_is_already_done(dm):
+    coord = Coordinator(dm)
+    fut = coord.create_record_async(_rec(1))
+    assert fut.done() and fut.result() == (True, "")
+    assert coord.flush()
+    coord.close()